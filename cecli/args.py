@@ -224,6 +224,15 @@ def get_parser(default_config_files, git_root):
         default=None,
         help="Specify the edit format for the editor model (default: depends on editor model)",
     )
+    group.add_argument(
+        "--adaptive-search-replace",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help=(
+            "Try the fuzzy search/replace methods of the udiff edit format in order of their"
+            " recorded cost per success (default: False)"
+        ),
+    )
     group.add_argument(
         "--show-model-warnings",
         action=argparse.BooleanOptionalAction,
@@ -378,6 +387,24 @@ def get_parser(default_config_files, git_root):
         default=4096,
         help="The target maximum number of tokens for the generated summary. (default: 4096)",
     )
+    group.add_argument(
+        "--elide-superseded-files",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help=(
+            "Re-send a file once its change diffs outweigh it, and leave out the diffs it"
+            " supersedes (default: False)"
+        ),
+    )
+    group.add_argument(
+        "--speculative-context-compaction",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help=(
+            "Summarize chat history in the background as it nears the compaction limit, so"
+            " compaction doesn't have to wait for it (default: False)"
+        ),
+    )
 
     ##########
     group = parser.add_argument_group("Cache settings")
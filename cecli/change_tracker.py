@@ -1,17 +1,105 @@
+import difflib
+import pickle
+import tempfile
+import threading
 import time
 import uuid
+import zlib
 from collections import defaultdict
 
+# Default memory budget for the change history before older records spill to disk
+DEFAULT_MAX_MEMORY = 16 * 1024 * 1024
+
+# Marker for a delta whose target content is None
+NONE_CONTENT = ("none",)
+
+
+def make_delta(source, target):
+    """
+    Return a line based delta that turns `source` into `target`.
+
+    The delta is a tuple of ops: (start, end) copies source lines [start:end],
+    a string inserts new text.
+    """
+    if target is None:
+        return NONE_CONTENT
+    source_lines = (source or "").splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+
+    # Only diff the edited region, edits rarely touch more than a few lines
+    limit = min(len(source_lines), len(target_lines))
+    prefix = 0
+    while prefix < limit and source_lines[prefix] == target_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and source_lines[-suffix - 1] == target_lines[-suffix - 1]:
+        suffix += 1
+    source_end = len(source_lines) - suffix
+    target_end = len(target_lines) - suffix
+
+    ops = []
+    if prefix:
+        ops.append((0, prefix))
+    matcher = difflib.SequenceMatcher(
+        None, source_lines[prefix:source_end], target_lines[prefix:target_end], autojunk=False
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append((prefix + i1, prefix + i2))
+        elif j2 > j1:
+            ops.append("".join(target_lines[prefix + j1 : prefix + j2]))
+    if suffix:
+        ops.append((source_end, len(source_lines)))
+    return tuple(ops)
+
+
+def apply_delta(source, delta):
+    if delta == NONE_CONTENT:
+        return None
+    source_lines = (source or "").splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(source_lines[op[0] : op[1]])
+    return "".join(parts)
+
+
+def delta_size(delta):
+    """Approximate memory used by a delta, in bytes."""
+    if delta is None:
+        return 0
+    return sum(len(op) if isinstance(op, str) else 16 for op in delta) + 64
+
 
 class ChangeTracker:
     """
     Tracks changes made to files for the undo functionality.
     This enables granular editing operations with the ability to undo specific changes.
+
+    Only the latest content of each file is kept in full. Every change is stored as
+    reverse deltas against the content that follows it, so a long session of small
+    edits to a big file costs little memory. Once the deltas exceed `max_memory`
+    bytes, the oldest ones are spilled to a compressed on-disk journal.
+
+    All public methods hold a lock, so tools may track changes from worker threads.
     """
 
-    def __init__(self):
+    def __init__(self, max_memory=DEFAULT_MAX_MEMORY):
         self.changes = {}  # change_id -> change_info
         self.files_changed = defaultdict(list)  # file_path -> [change_ids]
+        self.max_memory = max_memory
+
+        self._heads = {}  # file_path -> content after the latest tracked change
+        self._history = defaultdict(list)  # file_path -> [change_ids], including undone ones
+        # change_id -> (delta from its new to its original content,
+        #               delta from its original to the previous change's new content or None)
+        self._deltas = {}
+        self._spilled = {}  # change_id -> (offset, length) in the journal
+        self._memory = 0
+        self._journal = None
+        self._lock = threading.RLock()
 
     def track_change(
         self, file_path, change_type, original_content, new_content, metadata=None, change_id=None
@@ -30,36 +118,73 @@ class ChangeTracker:
         Returns:
         - change_id: Unique identifier for the change
         """
-        if change_id is None:
-            generated_id = self._generate_change_id()
-            # Ensure the generated ID is treated as a string
-            current_change_id = str(generated_id)
-        else:
-            # If an ID is provided, ensure it's treated as a string key/value
-            current_change_id = str(change_id)
-
-        # Defensive check: Ensure the ID isn't literally the string 'False' or boolean False
-        # which might indicate an upstream issue or unexpected input.
-        if current_change_id == "False" or current_change_id is False:
-            # Log a warning? For now, generate a new ID to prevent storing False.
-            print(f"Warning: change_id evaluated to False for {file_path}. Generating new ID.")
-            current_change_id = self._generate_change_id()
-
-        change = {
-            # Use the confirmed string ID here
-            "id": current_change_id,
-            "file_path": file_path,
-            "type": change_type,
-            "original": original_content,
-            "new": new_content,
-            "metadata": metadata or {},
-            "timestamp": time.time(),
-        }
-
-        # Use the confirmed string ID for storage and return
-        self.changes[current_change_id] = change
-        self.files_changed[file_path].append(current_change_id)
-        return current_change_id
+        with self._lock:
+            if change_id is None:
+                generated_id = self._generate_change_id()
+                # Ensure the generated ID is treated as a string
+                current_change_id = str(generated_id)
+            else:
+                # If an ID is provided, ensure it's treated as a string key/value
+                current_change_id = str(change_id)
+
+            # Defensive check: Ensure the ID isn't literally the string 'False' or boolean False
+            # which might indicate an upstream issue or unexpected input.
+            if current_change_id == "False" or current_change_id is False:
+                # Log a warning? For now, generate a new ID to prevent storing False.
+                print(f"Warning: change_id evaluated to False for {file_path}. Generating new ID.")
+                current_change_id = self._generate_change_id()
+
+            change = {
+                # Use the confirmed string ID here
+                "id": current_change_id,
+                "file_path": file_path,
+                "type": change_type,
+                "metadata": metadata or {},
+                "timestamp": time.time(),
+            }
+
+            if current_change_id in self.changes:
+                # Re-tracking an existing ID replaces the earlier change
+                self._forget(current_change_id)
+
+            # Link the previous head of the file to this change, unless the file was
+            # modified in between, in which case a link delta records the difference
+            link = None
+            if file_path in self._heads and self._heads[file_path] != original_content:
+                link = make_delta(original_content, self._heads[file_path])
+            reverse = make_delta(new_content, original_content)
+
+            self._deltas[current_change_id] = (reverse, link)
+            self._memory += delta_size(reverse) + delta_size(link)
+            self._set_head(file_path, new_content)
+            self._history[file_path].append(current_change_id)
+
+            # Use the confirmed string ID for storage and return
+            self.changes[current_change_id] = change
+            self.files_changed[file_path].append(current_change_id)
+            self._enforce_memory_cap()
+            return current_change_id
+
+    def get_change_contents(self, change_id):
+        """
+        Reconstruct the exact (original, new) contents of a tracked change.
+
+        Walks back from the file's latest content, applying the reverse deltas of
+        every later change.
+        """
+        with self._lock:
+            change = self.changes[change_id]
+            file_path = change["file_path"]
+            content = self._heads.get(file_path)
+
+            for cid in reversed(self._history[file_path]):
+                reverse, link = self._load_deltas(cid)
+                original = apply_delta(content, reverse)
+                if cid == change_id:
+                    return original, content
+                content = apply_delta(original, link) if link is not None else original
+
+            raise KeyError(change_id)
 
     def undo_change(self, change_id):
         """
@@ -71,21 +196,27 @@ class ChangeTracker:
         Returns:
         - (success, message, change_info): Tuple with success flag, message, and change information
         """
-        if change_id not in self.changes:
-            return False, f"Change ID {change_id} not found", None
+        with self._lock:
+            if change_id not in self.changes:
+                return False, f"Change ID {change_id} not found", None
 
-        change = self.changes[change_id]
+            change = self.changes[change_id]
+            if change.get("undone"):
+                return False, f"Change ID {change_id} was already undone", None
 
-        # Mark this change as undone by removing it from the tracking dictionaries
-        self.files_changed[change["file_path"]].remove(change_id)
-        if not self.files_changed[change["file_path"]]:
-            del self.files_changed[change["file_path"]]
+            # Mark this change as undone by removing it from the tracking dictionaries
+            self.files_changed[change["file_path"]].remove(change_id)
+            if not self.files_changed[change["file_path"]]:
+                del self.files_changed[change["file_path"]]
 
-        # Keep the change in the changes dict but mark it as undone
-        change["undone"] = True
-        change["undone_at"] = time.time()
+            # Keep the change in the changes dict but mark it as undone
+            change["undone"] = True
+            change["undone_at"] = time.time()
 
-        return True, f"Undid change {change_id} in {change['file_path']}", change
+            original, new = self.get_change_contents(change_id)
+            change_info = dict(change, original=original, new=new)
+
+            return True, f"Undid change {change_id} in {change['file_path']}", change_info
 
     def get_last_change(self, file_path):
         """
@@ -97,10 +228,11 @@ class ChangeTracker:
         Returns:
         - change_id or None if no changes found
         """
-        changes = self.files_changed.get(file_path, [])
-        if not changes:
-            return None
-        return changes[-1]
+        with self._lock:
+            changes = self.files_changed.get(file_path, [])
+            if not changes:
+                return None
+            return changes[-1]
 
     def list_changes(self, file_path=None, limit=10):
         """
@@ -113,20 +245,92 @@ class ChangeTracker:
         Returns:
         - List of change dictionaries
         """
-        if file_path:
-            # Get changes only for the specified file
-            change_ids = self.files_changed.get(file_path, [])
-            changes = [self.changes[cid] for cid in change_ids if cid in self.changes]
+        with self._lock:
+            if file_path:
+                # Get changes only for the specified file
+                change_ids = self.files_changed.get(file_path, [])
+                changes = [self.changes[cid] for cid in change_ids if cid in self.changes]
+            else:
+                # Get all changes
+                changes = list(self.changes.values())
+
+            # Filter out undone changes and sort by timestamp (most recent first)
+            changes = [c for c in changes if not c.get("undone", False)]
+            changes = sorted(changes, key=lambda c: c["timestamp"], reverse=True)
+
+            # Apply limit
+            return changes[:limit]
+
+    @property
+    def memory_usage(self):
+        """Approximate bytes held in memory by the change history."""
+        return self._memory
+
+    def _set_head(self, file_path, content):
+        old = self._heads.get(file_path)
+        self._memory -= len(old) if old else 0
+        self._heads[file_path] = content
+        self._memory += len(content) if content else 0
+
+    def _forget(self, change_id):
+        """Drop a change whose ID is being reused, folding its deltas into its neighbours."""
+        file_path = self.changes[change_id]["file_path"]
+        original, new = self.get_change_contents(change_id)
+        link = self._load_deltas(change_id)[1]
+        # Content the change's predecessor left the file in
+        before = apply_delta(original, link) if link is not None else original
+
+        history = self._history[file_path]
+        index = history.index(change_id)
+        if index + 1 < len(history):
+            # The next change now links straight to the predecessor's content
+            next_id = history[index + 1]
+            next_reverse, next_link = self._load_deltas(next_id)
+            next_original = apply_delta(new, next_link) if next_link is not None else new
+            new_link = make_delta(next_original, before) if next_original != before else None
+            self._replace_deltas(next_id, (next_reverse, new_link))
         else:
-            # Get all changes
-            changes = list(self.changes.values())
+            self._set_head(file_path, before)
+
+        self._replace_deltas(change_id, None)
+        history.remove(change_id)
+        if change_id in self.files_changed.get(file_path, []):
+            self.files_changed[file_path].remove(change_id)
+        del self.changes[change_id]
+
+    def _load_deltas(self, change_id):
+        if change_id in self._deltas:
+            return self._deltas[change_id]
+        offset, length = self._spilled[change_id]
+        self._journal.seek(offset)
+        return pickle.loads(zlib.decompress(self._journal.read(length)))
+
+    def _replace_deltas(self, change_id, deltas):
+        old = self._deltas.pop(change_id, None)
+        if old is not None:
+            self._memory -= delta_size(old[0]) + delta_size(old[1])
+        self._spilled.pop(change_id, None)
+        if deltas is not None:
+            self._deltas[change_id] = deltas
+            self._memory += delta_size(deltas[0]) + delta_size(deltas[1])
 
-        # Filter out undone changes and sort by timestamp (most recent first)
-        changes = [c for c in changes if not c.get("undone", False)]
-        changes = sorted(changes, key=lambda c: c["timestamp"], reverse=True)
+    def _enforce_memory_cap(self):
+        """Spill the oldest in-memory deltas to the journal until under the memory cap."""
+        if self.max_memory is None or self._memory <= self.max_memory:
+            return
 
-        # Apply limit
-        return changes[:limit]
+        # Dicts keep insertion order, so the first deltas are the oldest
+        for change_id in list(self._deltas):
+            if self._memory <= self.max_memory:
+                break
+            deltas = self._deltas.pop(change_id)
+            if self._journal is None:
+                self._journal = tempfile.TemporaryFile(prefix="cecli-changes-")
+            data = zlib.compress(pickle.dumps(deltas))
+            self._journal.seek(0, 2)
+            self._spilled[change_id] = (self._journal.tell(), len(data))
+            self._journal.write(data)
+            self._memory -= delta_size(deltas[0]) + delta_size(deltas[1])
 
     def _generate_change_id(self):
         """Generate a unique ID for a change."""
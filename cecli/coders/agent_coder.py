@@ -1,11 +1,13 @@
 import ast
 import asyncio
 import base64
+import functools
 import json
 import locale
 import os
 import platform
 import re
+import threading
 import time
 import traceback
 from collections import Counter, defaultdict
@@ -16,17 +18,30 @@ from cecli import urls, utils
 from cecli.change_tracker import ChangeTracker
 from cecli.helpers import nested
 from cecli.helpers.background_commands import BackgroundCommandManager
+from cecli.helpers.context_blocks import ContextBlockCache
 from cecli.helpers.conversation import ConversationChunks
 
 # All conversation functions are now available via ConversationChunks class
 from cecli.helpers.conversation.manager import ConversationManager
 from cecli.helpers.conversation.tags import MessageTag
+from cecli.helpers.directory_tree import DirectoryTree
+from cecli.helpers.file_events import DELETED, file_events
 from cecli.helpers.similarity import (
     cosine_similarity,
     create_bigram_vector,
     normalize_vector,
 )
 from cecli.helpers.skills import SkillsManager
+from cecli.helpers.tool_cache import (
+    LOCAL_NAMESPACE,
+    MISS,
+    ToolResultCache,
+    files_signature,
+    git_signature,
+    mcp_cache_ttl,
+    stat_signature,
+)
+from cecli.helpers.tool_scheduler import ScheduledCall, ToolScheduler
 from cecli.llm import litellm
 from cecli.mcp import LocalServer, McpServerManager
 from cecli.repo import ANY_GIT_ERROR
@@ -57,18 +72,31 @@ class AgentCoder(Coder):
             "viewfileswithsymbol",
             "grep",
             "listchanges",
-            "extractlines",
             "shownumberedcontext",
         }
         self.write_tools = {
             "command",
             "commandinteractive",
+            "deleteblock",
+            "deleteline",
+            "deletelines",
+            "extractlines",
+            "indentlines",
             "insertblock",
             "replaceblock",
             "replaceall",
             "replacetext",
             "undochange",
         }
+        # Idempotent read tools whose results can be cached, mapped to the
+        # state their output depends on
+        self.cacheable_tools = {
+            "grep": "files",
+            "viewfilesmatching": "files",
+            "ls": "directory",
+            "gitlog": "git",
+            "gitshow": "git",
+        }
         self.max_tool_calls = 10000
         self.large_file_token_threshold = 8192
         self.context_management_enabled = True
@@ -84,10 +112,28 @@ class AgentCoder(Coder):
         self.allowed_context_blocks = set()
         self.context_block_tokens = {}
         self.context_blocks_cache = {}
+        self.context_block_cache = ContextBlockCache()
+        # Kept current with the file watcher's events, and rescanned from git when
+        # no watcher runs or its coverage changed
+        self.directory_tree = DirectoryTree()
+        self.max_directory_tree_events = 10000
+        self._directory_tree_epoch = None  # file_events epoch of the last full scan
+        self._directory_tree_events = []
+        self._directory_tree_ignored = set()
+        self._directory_tree_lock = threading.Lock()
+        # Saves stat'ing every repo file for the repo signatures while the file watcher runs
+        self.file_events = file_events.subscribe(callback=self._queue_directory_tree_event)
+        self._uncovered_files = None  # (git and event signatures, files the watcher doesn't cover)
+        # Files signatures of the "files" cached tools, kept for the rest of the turn
+        self._tool_files_signatures = {}
         self.tokens_calculated = False
         self.skip_cli_confirmations = False
         self.agent_finished = False
         self.agent_config = self._get_agent_config()
+        self.change_tracker.max_memory = self.agent_config.get("undo_memory_mb", 16) * 1024 * 1024
+        self.tool_scheduler = ToolScheduler(
+            self.read_tools, max_workers=self.agent_config.get("tool_concurrency", 8)
+        )
         ToolRegistry.build_registry(agent_config=self.agent_config)
         super().__init__(*args, **kwargs)
 
@@ -117,6 +163,14 @@ class AgentCoder(Coder):
         config["skip_cli_confirmations"] = nested.getter(
             config, "skip_cli_confirmations", nested.getter(config, "yolo", [])
         )
+        config["tool_concurrency"] = nested.getter(config, "tool_concurrency", 8)
+        config["undo_memory_mb"] = nested.getter(config, "undo_memory_mb", 16)
+        config["directory_structure_max_depth"] = nested.getter(
+            config, "directory_structure_max_depth", None
+        )
+        config["directory_structure_max_tokens"] = nested.getter(
+            config, "directory_structure_max_tokens", 8192
+        )
 
         config["tools_paths"] = nested.getter(config, "tools_paths", [])
         config["tools_includelist"] = nested.getter(
@@ -233,10 +287,19 @@ class AgentCoder(Coder):
             await self.mcp_manager.connect_server(server_name)
 
     async def _execute_local_tool_calls(self, tool_calls_list):
-        tool_responses = []
+        """
+        Execute local (and agent-routed MCP) tool calls through the tool scheduler.
+
+        Read-only calls run concurrently, mutating calls run one at a time on the
+        event loop thread, and responses are returned in the same order as
+        `tool_calls_list`.
+        """
+        scheduled_calls = []
+        call_plans = []
         for tool_call in tool_calls_list:
             tool_name = tool_call.function.name
-            result_message = ""
+            plan = {"tool_call": tool_call, "errors": [], "indices": [], "error": None}
+            call_plans.append(plan)
             try:
                 args_string = tool_call.function.arguments.strip()
                 parsed_args_list = []
@@ -252,17 +315,24 @@ class AgentCoder(Coder):
                             continue
                 if not parsed_args_list and not args_string:
                     parsed_args_list.append({})
-                all_results_content = []
                 norm_tool_name = tool_name.lower()
-                tasks = []
                 if norm_tool_name in ToolRegistry.get_registered_tools():
                     tool_module = ToolRegistry.get_tool(norm_tool_name)
+                    read_only = self.tool_scheduler.is_read_only(norm_tool_name)
                     for params in parsed_args_list:
-                        result = tool_module.process_response(self, params)
-                        if asyncio.iscoroutine(result):
-                            tasks.append(result)
-                        else:
-                            tasks.append(asyncio.to_thread(lambda: result))
+                        plan["indices"].append(len(scheduled_calls))
+                        scheduled_calls.append(
+                            ScheduledCall(
+                                functools.partial(
+                                    self._run_local_tool,
+                                    norm_tool_name,
+                                    tool_module,
+                                    params,
+                                    self._get_tool_cache_entry(norm_tool_name, params),
+                                ),
+                                read_only=read_only,
+                            )
+                        )
                 elif self.mcp_tools:
                     for server_name, server_tools in self.mcp_tools:
                         if any(
@@ -271,31 +341,160 @@ class AgentCoder(Coder):
                         ):
                             server = self.mcp_manager.get_server(server_name)
                             if server:
+                                # Remote tools do not touch the local workspace
                                 for params in parsed_args_list:
-                                    tasks.append(
-                                        self._execute_mcp_tool(server, norm_tool_name, params)
+                                    plan["indices"].append(len(scheduled_calls))
+                                    scheduled_calls.append(
+                                        ScheduledCall(
+                                            functools.partial(
+                                                self._execute_mcp_tool,
+                                                server,
+                                                norm_tool_name,
+                                                params,
+                                            ),
+                                            read_only=True,
+                                        )
                                     )
                                 break
                     else:
-                        all_results_content.append(f"Error: Unknown tool name '{tool_name}'")
+                        plan["errors"].append(f"Error: Unknown tool name '{tool_name}'")
                 else:
-                    all_results_content.append(f"Error: Unknown tool name '{tool_name}'")
-                if tasks:
-                    task_results = await asyncio.gather(*tasks)
-                    all_results_content.extend(str(res) for res in task_results)
-                result_message = "\n\n".join(all_results_content)
+                    plan["errors"].append(f"Error: Unknown tool name '{tool_name}'")
             except Exception as e:
-                result_message = f"Error executing {tool_name}: {e}"
-                self.io.tool_error(f"""Error during {tool_name} execution: {e}
-{traceback.format_exc()}""")
+                plan["error"] = e
+
+        results = await self.tool_scheduler.run(scheduled_calls) if scheduled_calls else []
+
+        tool_responses = []
+        for plan in call_plans:
+            tool_call = plan["tool_call"]
+            tool_name = tool_call.function.name
+            call_results = [results[i] for i in plan["indices"]]
+            error = plan["error"] or next(
+                (res for res in call_results if isinstance(res, BaseException)), None
+            )
+            if error is not None:
+                result_message = f"Error executing {tool_name}: {error}"
+                trace = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+                self.io.tool_error(f"""Error during {tool_name} execution: {error}
+{trace}""")
+            else:
+                all_results_content = plan["errors"] + [str(res) for res in call_results]
+                result_message = "\n\n".join(all_results_content)
             tool_responses.append(
                 {"role": "tool", "tool_call_id": tool_call.id, "content": result_message}
             )
         return tool_responses
 
+    def _get_tool_cache_entry(self, norm_tool_name, params):
+        """
+        Build the result cache key for a cacheable tool call.
+
+        Returns:
+            tuple: (key, scope, directory), or None if the tool is not cacheable
+        """
+        scope = self.cacheable_tools.get(norm_tool_name)
+        if not scope or not isinstance(params, dict):
+            return None
+
+        directory = params.get("directory") or params.get("dir_path")
+        key = ToolResultCache.make_key(LOCAL_NAMESPACE, norm_tool_name, params)
+        return key, scope, directory
+
+    def _get_tool_cache_signature(self, scope, directory=None):
+        if scope == "git":
+            return git_signature(self.repo)
+        if scope == "directory":
+            if not directory:
+                return None
+            return stat_signature(self.abs_root_path(directory))
+
+        # Stat'ing every file the watcher doesn't cover is slow in big repos, so the
+        # signature is kept for the rest of the turn while the git state and file
+        # events stay the same. Write tools and the start of a turn drop it.
+        git_state = git_signature(self.repo)
+        prefix = ""
+        if directory and directory not in (".", "./"):
+            prefix = self.get_rel_fname(self.abs_root_path(directory)).rstrip("/") + "/"
+        memo_key = (prefix, git_state, self.file_events.signature())
+        signature = self._tool_files_signatures.get(memo_key)
+        if signature is None:
+            files = self.get_all_relative_files()
+            if prefix:
+                files = [fname for fname in files if fname.startswith(prefix)]
+            signature = files_signature(self.root, files, events=self.file_events)
+            self._tool_files_signatures[memo_key] = signature
+        return git_state, signature
+
+    def _get_tool_cache_paths(self, scope, directory=None):
+        """Directories a cached result was read from, git results do not depend on any."""
+        if scope == "git":
+            return ()
+        return (self.abs_root_path(directory or "."),)
+
+    def _run_local_tool(self, norm_tool_name, tool_module, params, cache_entry=None):
+        """
+        Run a registered local tool, serving idempotent read tools from the result cache.
+
+        The state signature is taken when the call runs, so earlier calls in the
+        same batch are accounted for. Write tools drop the cached results read
+        from the files they target, or the whole local cache when the targets
+        are unknown, as for shell commands.
+        """
+        if cache_entry is not None:
+            key, scope, directory = cache_entry
+            signature = self._get_tool_cache_signature(scope, directory)
+            result = self.tool_result_cache.get(key, signature)
+            if result is not MISS:
+                if self.verbose:
+                    self.io.tool_output(f"Using cached result for {norm_tool_name}")
+                return result
+
+        try:
+            result = tool_module.process_response(self, params)
+        except Exception:
+            self._invalidate_tool_results(norm_tool_name, params)
+            raise
+        if asyncio.iscoroutine(result):
+            return self._await_local_tool(norm_tool_name, params, result)
+        self._invalidate_tool_results(norm_tool_name, params)
+
+        if cache_entry is not None and isinstance(result, str) and not result.startswith("Error"):
+            self.tool_result_cache.put(
+                key,
+                result,
+                signature=signature,
+                paths=self._get_tool_cache_paths(scope, directory),
+            )
+        return result
+
+    async def _await_local_tool(self, norm_tool_name, params, coro):
+        try:
+            return await coro
+        finally:
+            self._invalidate_tool_results(norm_tool_name, params)
+
+    def _invalidate_tool_results(self, norm_tool_name, params):
+        if norm_tool_name in ("command", "commandinteractive"):
+            # The watcher may not have reported the command's changes yet
+            file_events.invalidate()
+        if norm_tool_name in self.write_tools:
+            self.tool_result_cache.invalidate(
+                LOCAL_NAMESPACE, paths=ToolScheduler.get_file_keys(params, self.root)
+            )
+            self._tool_files_signatures.clear()
+            self._invalidate_directory_tree()
+
     async def _execute_mcp_tool(self, server, tool_name, params):
         """Helper to execute a single MCP tool call, created from legacy format."""
 
+        cache_ttl = mcp_cache_ttl(getattr(server, "config", None), tool_name)
+        cache_key = ToolResultCache.make_key(server.name, tool_name, params)
+        if cache_ttl:
+            cached = self.tool_result_cache.get(cache_key)
+            if cached is not MISS:
+                return cached
+
         async def _exec_async():
             function_dict = {"name": tool_name, "arguments": json.dumps(params)}
             tool_call_dict = {
@@ -304,6 +503,8 @@ class AgentCoder(Coder):
                 "type": "function",
             }
             try:
+                if self.mcp_manager:
+                    await self.mcp_manager.ensure_connected(server.name)
                 session = await server.connect()
                 call_result = await litellm.experimental_mcp_client.call_openai_tool(
                     session=session, openai_tool=tool_call_dict
@@ -327,7 +528,10 @@ class AgentCoder(Coder):
                                     )
                         elif hasattr(item, "text"):
                             content_parts.append(item.text)
-                return "".join(content_parts)
+                result = "".join(content_parts)
+                if cache_ttl and not getattr(call_result, "isError", False):
+                    self.tool_result_cache.put(cache_key, result, ttl=cache_ttl)
+                return result
             except Exception as e:
                 self.io.tool_warning(f"""Executing {tool_name} on {server.name} failed:
   Error: {e}
@@ -343,9 +547,11 @@ class AgentCoder(Coder):
         ensuring they're consistent across all parts of the code.
 
         This method populates the cache for context blocks and calculates tokens.
+        Blocks are only regenerated and re-tokenized when one of their inputs changed
+        since they were last generated.
 
         Args:
-            force: If True, recalculate tokens even if already calculated
+            force: If True, regenerate every block even if its inputs are unchanged
         """
         if hasattr(self, "tokens_calculated") and self.tokens_calculated and not force:
             return
@@ -354,6 +560,8 @@ class AgentCoder(Coder):
             self.context_blocks_cache = {}
         if not self.use_enhanced_context:
             return
+        if force:
+            self.context_block_cache.invalidate()
         try:
             self.context_blocks_cache = {}
             block_types = [
@@ -364,17 +572,89 @@ class AgentCoder(Coder):
                 "skills",
                 "loaded_skills",
             ]
+            memo = {}
             for block_type in block_types:
                 if block_type in self.allowed_context_blocks:
-                    block_content = self._generate_context_block(block_type)
+                    block_content, tokens = self.context_block_cache.get(
+                        block_type,
+                        self._get_context_block_inputs(block_type, memo),
+                        functools.partial(self._generate_context_block, block_type),
+                        self.main_model.token_count,
+                    )
                     if block_content:
-                        self.context_block_tokens[block_type] = self.main_model.token_count(
-                            block_content
-                        )
+                        self.context_blocks_cache[block_type] = block_content
+                        self.context_block_tokens[block_type] = tokens
             self.tokens_calculated = True
         except Exception:
             pass
 
+    def _get_context_block_inputs(self, block_name, memo=None):
+        """
+        Return a fingerprint of the inputs a context block is generated from.
+
+        Returns None for blocks whose inputs are not tracked, so they are always regenerated.
+        """
+        if memo is None:
+            memo = {}
+
+        def repo_state():
+            if "repo_state" not in memo:
+                memo["repo_state"] = self._get_repo_state_signature()
+            return memo["repo_state"]
+
+        def context_files():
+            fnames = set(self.abs_fnames) | set(self.abs_read_only_fnames)
+            return tuple((fname, stat_signature(fname)) for fname in sorted(fnames))
+
+        try:
+            if block_name == "environment_info":
+                return (
+                    datetime.now().strftime("%Y-%m-%d"),
+                    self.root,
+                    self.chat_language,
+                    git_signature(self.repo),
+                )
+            if block_name in ("directory_structure", "git_status"):
+                return repo_state()
+            if block_name == "symbol_outline":
+                return context_files()
+            if block_name == "context_summary":
+                return (context_files(), tuple(sorted(self.context_block_tokens.items())))
+            if block_name == "todo_list":
+                return stat_signature(self.abs_root_path(".cecli/todo.txt"))
+            if block_name == "skills" and self.skills_manager:
+                return self.skills_manager.signature()
+            if block_name == "loaded_skills" and self.skills_manager:
+                return (
+                    tuple(sorted(self.skills_manager.loaded_skills)),
+                    self.skills_manager.signature(),
+                )
+        except Exception:
+            return None
+        return None
+
+    def _get_repo_state_signature(self):
+        """
+        Fingerprint of the git state and the project files, for the repo based context blocks.
+
+        The files the file watcher covers are represented by its event counter, so
+        they are neither listed nor stat'ed again until an event or a git change
+        arrives. Only the files it doesn't cover, and the directories holding them,
+        are stat'ed to catch untracked files appearing next to them.
+        """
+        git_state = git_signature(self.repo)
+        memo_key = (git_state, self.file_events.signature())
+        if self._uncovered_files is None or self._uncovered_files[0] != memo_key:
+            uncovered = [
+                fname
+                for fname in self.get_all_relative_files()
+                if not self.file_events.covers(self.abs_root_path(fname))
+            ]
+            self._uncovered_files = (memo_key, uncovered)
+        return git_state, files_signature(
+            self.root, self._uncovered_files[1], events=self.file_events
+        )
+
     def _generate_context_block(self, block_name):
         """
         Generate a specific context block and cache it.
@@ -416,8 +696,8 @@ class AgentCoder(Coder):
 
     def get_context_symbol_outline(self):
         """
-        Generate a symbol outline for files currently in context using Tree-sitter,
-        bypassing the cache for freshness.
+        Generate a symbol outline for files currently in context using Tree-sitter.
+        Tags come from the RepoMap tags cache, which re-parses files whose mtime changed.
         """
         if not self.use_enhanced_context or not self.repo_map:
             return None
@@ -440,7 +720,7 @@ class AgentCoder(Coder):
             for abs_fname in sorted(files_to_outline):
                 rel_fname = self.get_rel_fname(abs_fname)
                 try:
-                    tags = list(self.repo_map.get_tags_raw(abs_fname, rel_fname))
+                    tags = list(self.repo_map.get_tags(abs_fname, rel_fname))
                     if tags:
                         all_tags_by_file[rel_fname].extend(tags)
                         has_symbols = True
@@ -491,6 +771,9 @@ class AgentCoder(Coder):
             # Use parent's implementation which may use conversation system if flag is enabled
             return super().format_chat_chunks()
 
+        # Re-check the inputs of the context blocks; unchanged blocks come from the cache
+        self.tokens_calculated = False
+
         ConversationChunks.initialize_conversation_system(self)
         # Decrement mark_for_delete values before adding new messages
         ConversationManager.decrement_mark_for_delete()
@@ -555,9 +838,19 @@ class AgentCoder(Coder):
             return None
         if hasattr(self, "context_blocks_cache") and "context_summary" in self.context_blocks_cache:
             return self.context_blocks_cache["context_summary"]
+        if not hasattr(self, "context_block_tokens") or not self.context_block_tokens:
+            self._calculate_context_block_tokens()
+        result, _ = self.context_block_cache.get(
+            "context_summary",
+            self._get_context_block_inputs("context_summary"),
+            self._generate_context_summary,
+        )
+        if result is not None:
+            self.context_blocks_cache["context_summary"] = result
+        return result
+
+    def _generate_context_summary(self):
         try:
-            if not hasattr(self, "context_block_tokens") or not self.context_block_tokens:
-                self._calculate_context_block_tokens()
             result = '<context name="context_summary" from="agent">\n'
             result += "## Current Context Overview\n\n"
             max_input_tokens = self.main_model.info.get("max_input_tokens") or 0
@@ -629,9 +922,6 @@ class AgentCoder(Coder):
                     result += "- Remove non-essential files via the `ContextManager` tool.\n"
                     result += "- Keep only essential files in context for best performance"
             result += "\n</context>"
-            if not hasattr(self, "context_blocks_cache"):
-                self.context_blocks_cache = {}
-            self.context_blocks_cache["context_summary"] = result
             return result
         except Exception as e:
             self.io.tool_error(f"Error generating context summary: {str(e)}")
@@ -819,7 +1109,12 @@ I will proceed based on the current context.""")
         if norm_tool_name in ToolRegistry.get_registered_tools():
             tool_module = ToolRegistry.get_tool(norm_tool_name)
             try:
-                result = tool_module.process_response(self, params)
+                result = self._run_local_tool(
+                    norm_tool_name,
+                    tool_module,
+                    params,
+                    self._get_tool_cache_entry(norm_tool_name, params),
+                )
                 if asyncio.iscoroutine(result):
                     result = await result
                 return result
@@ -1378,6 +1673,9 @@ Just reply with fixed versions of the {blocks} above that failed to match.
                 self.reflected_message = error_message
             edited_files = set(edit[0] for edit in passed)
             if edited_files:
+                self.tool_result_cache.invalidate(
+                    LOCAL_NAMESPACE, paths={self.abs_root_path(path) for path in edited_files}
+                )
                 self.coder_edited_files.update(edited_files)
                 self.auto_commit(edited_files)
                 if self.auto_lint:
@@ -1476,6 +1774,10 @@ Just reply with fixed versions of the {blocks} above that failed to match.
         This clearly delineates user input from other sections in the context window.
         """
         inp = await super().preproc_user_input(inp)
+        # The user may have changed files or git state since the last turn
+        self.tool_result_cache.invalidate(LOCAL_NAMESPACE)
+        self._tool_files_signatures.clear()
+        self._invalidate_directory_tree()
         if inp and not inp.startswith('<context name="user_input" from="agent">'):
             inp = f'<context name="user_input" from="agent">\n{inp}\n</context>'
         return inp
@@ -1494,66 +1796,109 @@ Just reply with fixed versions of the {blocks} above that failed to match.
                 "Below is a snapshot of this project's file structure at the current time. "
                 "It skips over .gitignore patterns."
             )
-            Path(self.root)
-            if self.repo:
-                tracked_files = self.repo.get_tracked_files()
-                untracked_files = []
-                try:
-                    untracked_output = self.repo.repo.git.status("--porcelain")
-                    for line in untracked_output.splitlines():
-                        if line.startswith("??"):
-                            untracked_file = line[3:]
-                            if not self.repo.ignored_file(untracked_file):
-                                untracked_files.append(untracked_file)
-                except Exception as e:
-                    self.io.tool_warning(f"Error getting untracked files: {str(e)}")
-                all_files = tracked_files + untracked_files
-            else:
-                all_files = []
-                for path in Path(self.root).rglob("*"):
-                    if path.is_file():
-                        all_files.append(str(path.relative_to(self.root)))
-            all_files = sorted(all_files)
-            all_files = [
-                f for f in all_files if not any(part.startswith(".cecli") for part in f.split("/"))
-            ]
-            tree = {}
-            for file in all_files:
-                parts = file.split("/")
-                current = tree
-                for i, part in enumerate(parts):
-                    if i == len(parts) - 1:
-                        if "." not in current:
-                            current["."] = []
-                        current["."].append(part)
-                    else:
-                        if part not in current:
-                            current[part] = {}
-                        current = current[part]
-
-            def print_tree(node, prefix="- ", indent="  ", current_path=""):
-                lines = []
-                dirs = sorted([k for k in node.keys() if k != "."])
-                for i, dir_name in enumerate(dirs):
-                    lines.append(f"{prefix}{dir_name}/")
-                    sub_lines = print_tree(
-                        node[dir_name], prefix=prefix, indent=indent, current_path=dir_name
-                    )
-                    for sub_line in sub_lines:
-                        lines.append(f"{indent}{sub_line}")
-                if "." in node:
-                    for file_name in sorted(node["."]):
-                        lines.append(f"{prefix}{file_name}")
-                return lines
-
-            tree_lines = print_tree(tree, prefix="- ")
-            result += "\n".join(tree_lines)
+            self._update_directory_tree()
+            result += self.directory_tree.render(
+                max_depth=self.agent_config.get("directory_structure_max_depth"),
+                max_tokens=self.agent_config.get("directory_structure_max_tokens", 8192),
+            )
             result += "\n</context>"
             return result
         except Exception as e:
             self.io.tool_error(f"Error generating directory structure: {str(e)}")
             return None
 
+    def _queue_directory_tree_event(self, change, path):
+        # Called on the file watcher's thread, the tree applies the events when rendered
+        with self._directory_tree_lock:
+            if len(self._directory_tree_events) < self.max_directory_tree_events:
+                self._directory_tree_events.append((change, path))
+            else:
+                self._directory_tree_epoch = None
+
+    def _invalidate_directory_tree(self):
+        """Rescan the directory tree on its next render, unless the file watcher keeps it current."""
+        if not file_events.active:
+            with self._directory_tree_lock:
+                self._directory_tree_epoch = None
+
+    def _directory_tree_path(self, path):
+        """Project relative path of a file to list in the directory tree, or None."""
+        rel_fname = self.get_rel_fname(path).replace(os.sep, "/")
+        parts = rel_fname.split("/")
+        if parts[0] == ".." or any(part == ".git" or part.startswith(".cecli") for part in parts):
+            return None
+        return rel_fname
+
+    def _scan_directory_tree(self):
+        """List every file to show in the directory tree, untracked directories expanded."""
+        if self.repo:
+            all_files = list(self.repo.get_tracked_files())
+            try:
+                untracked = self.repo.repo.git.ls_files("-z", "--others", "--exclude-standard")
+                all_files.extend(
+                    fname
+                    for fname in untracked.split("\0")
+                    if fname and not self.repo.ignored_file(fname)
+                )
+            except ANY_GIT_ERROR as e:
+                self.io.tool_warning(f"Error getting untracked files: {str(e)}")
+        else:
+            all_files = [
+                str(path.relative_to(self.root))
+                for path in Path(self.root).rglob("*")
+                if path.is_file()
+            ]
+        return [
+            fname
+            for fname in all_files
+            if not any(part.startswith(".cecli") for part in fname.split("/"))
+        ]
+
+    def _update_directory_tree(self):
+        """
+        Bring the directory tree up to date.
+
+        The tree is scanned from git once, then kept current with the file watcher's
+        add and remove events. Without a watcher it is rescanned after write tools
+        and at each new user message.
+        """
+        with self._directory_tree_lock:
+            events, self._directory_tree_events = self._directory_tree_events, []
+            rescan = self._directory_tree_epoch != file_events.epoch
+            self._directory_tree_epoch = file_events.epoch
+
+        if rescan:
+            self._directory_tree_ignored.clear()
+            self.directory_tree.update(self._scan_directory_tree())
+            return
+
+        added = set()
+        for change, path in events:
+            rel_fname = self._directory_tree_path(path)
+            if rel_fname is None:
+                continue
+            if change == DELETED:
+                added.discard(rel_fname)
+                if not self.directory_tree.remove(rel_fname):
+                    self.directory_tree.remove_dir(rel_fname)
+            elif (
+                rel_fname not in self.directory_tree.paths
+                and rel_fname not in self._directory_tree_ignored
+                and os.path.isfile(path)
+            ):
+                added.add(rel_fname)
+
+        if added and self.repo:
+            ignored = {fname for fname in added if self.repo.ignored_file(fname)}
+            try:
+                ignored.update(self.repo.repo.ignored(*added))
+            except ANY_GIT_ERROR as e:
+                self.io.tool_warning(f"Error checking ignored files: {str(e)}")
+            self._directory_tree_ignored.update(ignored)
+            added -= ignored
+        for rel_fname in added:
+            self.directory_tree.add(rel_fname)
+
     def get_todo_list(self):
         """
         Generate a todo list context block from the .cecli/todo.txt file.
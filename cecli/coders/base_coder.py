@@ -44,12 +44,15 @@ from cecli.helpers.conversation import (
     ConversationManager,
     MessageTag,
 )
+from cecli.helpers.file_events import file_events
 from cecli.helpers.profiler import TokenProfiler
+from cecli.helpers.tool_cache import MISS, ToolResultCache, mcp_cache_ttl
+from cecli.helpers.trigram_index import TrigramIndex
 from cecli.history import ChatSummary
 from cecli.io import ConfirmGroup, InputOutput
 from cecli.linter import Linter
 from cecli.llm import litellm
-from cecli.mcp import LocalServer
+from cecli.mcp import LocalServer, get_session_pool
 from cecli.models import RETRY_TIMEOUT
 from cecli.reasoning_tags import (
     REASONING_TAG,
@@ -145,6 +148,8 @@ class Coder:
     mcp_manager = None
     run_one_completed = True
     compact_context_completed = True
+    # Share of context_compaction_max_tokens at which speculative compaction starts
+    speculative_compaction_watermark = 0.75
     suppress_announcements_for_next_prompt = False
     tool_reflection = False
     # Task coordination state variables
@@ -326,6 +331,8 @@ class Coder:
         enable_context_compaction=False,
         context_compaction_max_tokens=None,
         context_compaction_summary_tokens=8192,
+        elide_superseded_files=False,
+        speculative_compaction=False,
         map_cache_dir=".",
         repomap_in_memory=False,
         linear_output=False,
@@ -361,6 +368,10 @@ class Coder:
 
         self.context_compaction_max_tokens = context_compaction_max_tokens
         self.context_compaction_summary_tokens = context_compaction_summary_tokens
+        self.speculative_compaction = speculative_compaction
+        # Tag -> (ids of the messages being summarized, task summarizing them)
+        self.speculative_summaries = {}
+        self.elide_superseded_files = elide_superseded_files
 
         if not fnames:
             fnames = []
@@ -376,6 +387,7 @@ class Coder:
         self.chat_completion_call_hashes = []
         self.chat_completion_response_hashes = []
         self.need_commit_before_edits = set()
+        self.pre_edit_contents = {}  # rel_fname -> content before the last edits
 
         self.total_cost = total_cost
         self.total_tokens_sent = total_tokens_sent
@@ -416,6 +428,9 @@ class Coder:
 
         self.shell_commands = []
         self.partial_response_tool_calls = []
+        self.tool_result_cache = ToolResultCache()
+        self.search_index = None
+        self.search_index_lock = threading.Lock()
 
         if not auto_commits:
             dirty_commits = False
@@ -1237,6 +1252,9 @@ class Coder:
         self.shell_commands = []
         self.message_cost = 0
 
+        # Re-stat files changed since the last turn that the watcher hasn't reported yet
+        file_events.invalidate()
+
         if self.repo:
             self.commit_before_message.append(self.repo.get_head_commit_sha())
 
@@ -1513,6 +1531,7 @@ class Coder:
             self.run_one_completed = False
             await self.run_one(user_message, preproc)
             self.show_undo_hint()
+            self.start_speculative_compaction()
         except asyncio.CancelledError:
             # Don't show undo hint if cancelled
             raise
@@ -1520,6 +1539,7 @@ class Coder:
             self.run_one_completed = True
             self.compact_context_completed = True
             self.io.stop_spinner()
+            self.io.flush_history()
 
     def copy_context(self):
         if self.auto_copy_context:
@@ -1662,6 +1682,116 @@ class Coder:
 
     # Old summarization system removed - using context compaction logic instead
 
+    def get_compaction_tokens(self, done_messages, cur_messages):
+        # Exclude first cur_message since that's the user's initial input
+        done_tokens = self.summarizer.count_tokens(done_messages)
+        cur_tokens = self.summarizer.count_tokens(cur_messages[1:] if len(cur_messages) > 1 else [])
+        return done_tokens, cur_tokens
+
+    def get_compaction_tags(self, done_tokens, cur_tokens):
+        # Compact done_messages or cur_messages if either alone exceeds the limit,
+        # or outweighs the other
+        tags = []
+        if done_tokens > self.context_compaction_max_tokens or done_tokens > cur_tokens:
+            tags.append(MessageTag.DONE)
+        if cur_tokens > self.context_compaction_max_tokens or cur_tokens > done_tokens:
+            tags.append(MessageTag.CUR)
+        return tags
+
+    def get_compaction_prompt(self, message=""):
+        # Append custom message to compaction prompt if provided
+        compaction_prompt = self.gpt_prompts.compaction_prompt
+        if message:
+            compaction_prompt = f"{compaction_prompt}\n\n{message}"
+        return compaction_prompt
+
+    def start_speculative_compaction(self):
+        """
+        Summarize the chat history in the background once it nears the compaction limit.
+
+        Only history up to the last finished assistant reply is summarized. If
+        that history is still in place when compact_context_if_needed() runs,
+        the summary replaces it straight away and later messages are kept.
+        """
+        if not (self.enable_context_compaction and self.speculative_compaction):
+            return
+        if not self.context_compaction_max_tokens:
+            return
+
+        history = {
+            tag: ConversationManager.get_tag_messages(tag)
+            for tag in (MessageTag.DONE, MessageTag.CUR)
+        }
+        done_tokens, cur_tokens = self.get_compaction_tokens(
+            [msg.to_dict() for msg in history[MessageTag.DONE]],
+            [msg.to_dict() for msg in history[MessageTag.CUR]],
+        )
+        watermark = self.context_compaction_max_tokens * self.speculative_compaction_watermark
+        if done_tokens + cur_tokens < watermark:
+            return
+
+        for tag in self.get_compaction_tags(done_tokens, cur_tokens):
+            # Summaries can only replace history up to a finished assistant reply, so no
+            # message after them answers a tool call that was summarized away
+            prefix = history[tag]
+            while prefix and (
+                prefix[-1].message_dict.get("role") != "assistant"
+                or prefix[-1].message_dict.get("tool_calls")
+            ):
+                prefix = prefix[:-1]
+            if not prefix:
+                continue
+
+            message_ids = [msg.message_id for msg in prefix]
+            speculative = self.speculative_summaries.get(tag)
+            if speculative and speculative[0] == message_ids:
+                continue
+            self.discard_speculative_summary(tag)
+
+            task = asyncio.create_task(
+                self.summarize_speculatively([msg.to_dict() for msg in prefix])
+            )
+            self.speculative_summaries[tag] = (message_ids, task)
+
+    async def summarize_speculatively(self, messages):
+        try:
+            return await self.summarizer.summarize_as_text(
+                messages,
+                self.get_compaction_prompt(),
+                self.context_compaction_summary_tokens,
+            )
+        except Exception as e:
+            if self.verbose:
+                self.io.tool_warning(f"Speculative compaction failed: {e}")
+            return None
+
+    def discard_speculative_summary(self, tag):
+        speculative = self.speculative_summaries.pop(tag, None)
+        if speculative:
+            speculative[1].cancel()
+
+    async def take_speculative_summary(self, tag):
+        """
+        Return the speculative summary for tag and the messages added after it.
+
+        Returns None, and discards the summary, if the history it covers has
+        changed or summarizing it failed. Waits for a summary still in progress.
+        """
+        speculative = self.speculative_summaries.pop(tag, None)
+        if not speculative:
+            return None
+
+        message_ids, task = speculative
+        messages = ConversationManager.get_tag_messages(tag)
+        if [msg.message_id for msg in messages[: len(message_ids)]] != message_ids:
+            task.cancel()
+            return None
+
+        summary = await task
+        if not summary:
+            return None
+        return summary, messages[len(message_ids) :]
+
     async def compact_context_if_needed(self, force=False, message=""):
         if not self.enable_context_compaction:
             return
@@ -1671,9 +1801,7 @@ class Coder:
         done_messages = ConversationManager.get_messages_dict(MessageTag.DONE)
         cur_messages = ConversationManager.get_messages_dict(MessageTag.CUR)
 
-        # Exclude first cur_message since that's the user's initial input
-        done_tokens = self.summarizer.count_tokens(done_messages)
-        cur_tokens = self.summarizer.count_tokens(cur_messages[1:] if len(cur_messages) > 1 else [])
+        done_tokens, cur_tokens = self.get_compaction_tokens(done_messages, cur_messages)
         combined_tokens = done_tokens + cur_tokens
 
         if not force and combined_tokens < self.context_compaction_max_tokens:
@@ -1687,20 +1815,34 @@ class Coder:
         self.io.update_spinner("Compacting...")
 
         try:
-            # Check if done_messages alone exceed the limit
-            if done_tokens > self.context_compaction_max_tokens or done_tokens > cur_tokens:
-                # Create a summary of the done_messages
-                # Append custom message to compaction prompt if provided
-                compaction_prompt = self.gpt_prompts.compaction_prompt
-                if message:
-                    compaction_prompt = f"{compaction_prompt}\n\n{message}"
-
-                summary_text = await self.summarizer.summarize_all_as_text(
-                    done_messages,
+            compaction_prompt = self.get_compaction_prompt(message)
+            tags = self.get_compaction_tags(done_tokens, cur_tokens)
+
+            async def summarize(tag, messages):
+                if tag not in tags:
+                    return None, []
+
+                # A summary made ahead of time with the same prompt can be used if its
+                # history is still there, keeping the messages that came after it
+                if not message:
+                    speculative = await self.take_speculative_summary(tag)
+                    if speculative:
+                        return speculative
+
+                summary = await self.summarizer.summarize_as_text(
+                    messages,
                     compaction_prompt,
                     self.context_compaction_summary_tokens,
                 )
+                return summary, []
+
+            # Summarize both at once, they don't depend on each other
+            (summary_text, done_rest), (cur_summary_text, cur_rest) = await asyncio.gather(
+                summarize(MessageTag.DONE, done_messages),
+                summarize(MessageTag.CUR, cur_messages),
+            )
 
+            if MessageTag.DONE in tags:
                 if not summary_text:
                     raise ValueError("Summarization returned an empty result.")
 
@@ -1723,21 +1865,9 @@ class Coder:
                     },
                     tag=MessageTag.DONE,
                 )
+                self.restore_messages(done_rest, MessageTag.DONE)
 
-            # Check if cur_messages alone exceed the limit (after potentially compacting done_messages)
-            if cur_tokens > self.context_compaction_max_tokens or cur_tokens > done_tokens:
-                # Create a summary of the cur_messages
-                # Append custom message to compaction prompt if provided
-                compaction_prompt = self.gpt_prompts.compaction_prompt
-                if message:
-                    compaction_prompt = f"{compaction_prompt}\n\n{message}"
-
-                cur_summary_text = await self.summarizer.summarize_all_as_text(
-                    cur_messages,
-                    compaction_prompt,
-                    self.context_compaction_summary_tokens,
-                )
-
+            if MessageTag.CUR in tags:
                 if not cur_summary_text:
                     raise ValueError("Summarization of current messages returned an empty result.")
 
@@ -1779,6 +1909,7 @@ class Coder:
                     tag=MessageTag.CUR,
                     force=True,
                 )
+                self.restore_messages(cur_rest, MessageTag.CUR)
 
             self.io.tool_output("...chat history compacted.")
             self.io.update_spinner(self.io.last_spinner_text)
@@ -1787,6 +1918,16 @@ class Coder:
             self.io.tool_warning("Proceeding with full history for now.")
             return
 
+    def restore_messages(self, messages, tag):
+        # Re-add messages that came after a speculative summary, after the summary
+        for msg in messages:
+            ConversationManager.add_message(
+                message_dict=msg.message_dict,
+                tag=tag,
+                hash_key=msg.hash_key,
+                force=True,
+            )
+
     def normalize_language(self, lang_code):
         """
         Convert a locale code such as ``en_US`` or ``fr`` into a readable
@@ -2486,18 +2627,63 @@ class Coder:
 
             tool_responses = []
             try:
-                # Connect to the server once
-                session = await server.connect()
+                # Servers connect in the background or lazily on their first tool call
+                if self.mcp_manager:
+                    await self.mcp_manager.ensure_connected(server.name)
+                # Connect to the server once, further sessions are opened by the pool on demand
+                pool = get_session_pool(server)
+                await pool.connect()
                 tool_id_set = set()
 
-                # Execute all tool calls for this server
-                for tool_call in tool_calls_list:
-                    # LLM APIs sometimes return duplicates and that's annoying part 4
-                    if tool_call.id in tool_id_set:
-                        continue
-
-                    tool_id_set.add(tool_call.id)
+                async def _call_tool(tool_call, args):
+                    tool_name = tool_call.function.name
+                    cache_ttl = mcp_cache_ttl(getattr(server, "config", None), tool_name)
+                    cache_key = ToolResultCache.make_key(server.name, tool_name, args)
+                    if cache_ttl:
+                        cached = self.tool_result_cache.get(cache_key)
+                        if cached is not MISS:
+                            return cached
+
+                    new_tool_call = tool_call.model_copy(deep=True)
+                    new_tool_call.function.arguments = json.dumps(args)
+
+                    async with pool.session(tool_name) as session:
+                        call_result = await experimental_mcp_client.call_openai_tool(
+                            session=session,
+                            openai_tool=new_tool_call,
+                        )
 
+                    content_parts = []
+                    if call_result.content:
+                        for item in call_result.content:
+                            if hasattr(item, "resource"):  # EmbeddedResource
+                                resource = item.resource
+                                if hasattr(resource, "text"):  # TextResourceContents
+                                    content_parts.append(resource.text)
+                                elif hasattr(resource, "blob"):  # BlobResourceContents
+                                    try:
+                                        decoded_blob = base64.b64decode(resource.blob).decode(
+                                            "utf-8"
+                                        )
+                                        content_parts.append(decoded_blob)
+                                    except (UnicodeDecodeError, TypeError):
+                                        # Handle non-text blobs gracefully
+                                        name = getattr(resource, "name", "unnamed")
+                                        mime_type = getattr(
+                                            resource, "mimeType", "unknown mime type"
+                                        )
+                                        content_parts.append(
+                                            f"[embedded binary resource: {name} ({mime_type})]"
+                                        )
+                            elif hasattr(item, "text"):  # TextContent
+                                content_parts.append(item.text)
+
+                    result = "".join(content_parts)
+                    if cache_ttl and not getattr(call_result, "isError", False):
+                        self.tool_result_cache.put(cache_key, result, ttl=cache_ttl)
+                    return result
+
+                async def _exec_tool_call(tool_call):
                     try:
                         # Arguments can be a stream of JSON objects.
                         # We need to parse them and run a tool call for each.
@@ -2518,62 +2704,37 @@ class Coder:
                         if not parsed_args_list and not args_string:
                             parsed_args_list.append({})  # For tool calls with no arguments
 
-                        all_results_content = []
-                        for args in parsed_args_list:
-                            new_tool_call = tool_call.model_copy(deep=True)
-                            new_tool_call.function.arguments = json.dumps(args)
-
-                            call_result = await experimental_mcp_client.call_openai_tool(
-                                session=session,
-                                openai_tool=new_tool_call,
-                            )
-
-                            content_parts = []
-                            if call_result.content:
-                                for item in call_result.content:
-                                    if hasattr(item, "resource"):  # EmbeddedResource
-                                        resource = item.resource
-                                        if hasattr(resource, "text"):  # TextResourceContents
-                                            content_parts.append(resource.text)
-                                        elif hasattr(resource, "blob"):  # BlobResourceContents
-                                            try:
-                                                decoded_blob = base64.b64decode(
-                                                    resource.blob
-                                                ).decode("utf-8")
-                                                content_parts.append(decoded_blob)
-                                            except (UnicodeDecodeError, TypeError):
-                                                # Handle non-text blobs gracefully
-                                                name = getattr(resource, "name", "unnamed")
-                                                mime_type = getattr(
-                                                    resource, "mimeType", "unknown mime type"
-                                                )
-                                                content_parts.append(
-                                                    "[embedded binary resource:"
-                                                    f" {name} ({mime_type})]"
-                                                )
-                                    elif hasattr(item, "text"):  # TextContent
-                                        content_parts.append(item.text)
-
-                            result_text = "".join(content_parts)
-                            all_results_content.append(result_text)
-
-                        tool_responses.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_call.id,
-                                "content": "\n\n".join(all_results_content),
-                            }
+                        all_results_content = await asyncio.gather(
+                            *(_call_tool(tool_call, args) for args in parsed_args_list)
                         )
 
+                        return {
+                            "role": "tool",
+                            "tool_call_id": tool_call.id,
+                            "content": "\n\n".join(all_results_content),
+                        }
+
                     except Exception as e:
                         tool_error = f"Error executing tool call {tool_call.function.name}: \n{e}"
                         self.io.tool_warning(
                             f"Executing {tool_call.function.name} on {server.name} failed: \n "
                             f" Error: {e}\n"
                         )
-                        tool_responses.append(
-                            {"role": "tool", "tool_call_id": tool_call.id, "content": tool_error}
-                        )
+                        return {"role": "tool", "tool_call_id": tool_call.id, "content": tool_error}
+
+                # Execute all tool calls for this server, the pool decides which may overlap
+                unique_tool_calls = []
+                for tool_call in tool_calls_list:
+                    # LLM APIs sometimes return duplicates and that's annoying part 4
+                    if tool_call.id in tool_id_set:
+                        continue
+
+                    tool_id_set.add(tool_call.id)
+                    unique_tool_calls.append(tool_call)
+
+                tool_responses.extend(
+                    await asyncio.gather(*(_exec_tool_call(tc) for tc in unique_tool_calls))
+                )
             except httpx.RemoteProtocolError as e:
                 connection_error = f"Server {server.name} disconnected unexpectedly: {e}"
                 self.io.tool_warning(connection_error)
@@ -2710,12 +2871,25 @@ class Coder:
         await self.io.offer_url(urls.token_limits)
 
     def lint_edited(self, fnames):
-        res = ""
-        for fname in fnames:
-            if not fname:
-                continue
-            errors = self.linter.lint(self.abs_root_path(fname))
+        """
+        Lint the edited files concurrently. Where the content from before the edit is
+        known, only errors the edit introduced are reported.
+        """
+        fnames = [fname for fname in fnames if fname]
+        abs_fnames = [self.abs_root_path(fname) for fname in fnames]
 
+        originals = {}
+        for fname, abs_fname in zip(fnames, abs_fnames):
+            original = self.pre_edit_contents.get(fname)
+            if original is not None:
+                originals[abs_fname] = original
+        self.pre_edit_contents = {}
+
+        all_errors = self.linter.lint_many(abs_fnames, originals=originals)
+
+        res = ""
+        for abs_fname in dict.fromkeys(abs_fnames):
+            errors = all_errors.get(abs_fname)
             if errors:
                 res += "\n"
                 res += errors
@@ -2889,6 +3063,7 @@ class Coder:
         self.partial_response_chunks = []
         self.partial_response_tool_calls = []
         self.partial_response_function_call = dict()
+        self.start_streamed_edits()
 
         completion = None
         self.token_profiler.start()
@@ -3092,6 +3267,8 @@ class Coder:
                     pass
 
             self.partial_response_content += text
+            if text:
+                self.update_streamed_edits(text)
 
             self.partial_response_chunks.append(chunk)
 
@@ -3474,6 +3651,18 @@ class Coder:
 
         return self.data_cache["relative_files"]
 
+    def get_search_index(self):
+        """Return the trigram index used by the search tools, creating it on first use."""
+        if not self.repo:
+            return None
+        # The search tools may call this from several threads at once
+        with self.search_index_lock:
+            if self.search_index is None:
+                self.search_index = TrigramIndex(
+                    self.root, cache_dir=self.map_cache_dir, io=self.io, verbose=self.verbose
+                )
+        return self.search_index
+
     def get_all_abs_files(self):
         files = self.get_all_relative_files()
         files = [self.abs_root_path(path) for path in files]
@@ -3626,6 +3815,13 @@ class Coder:
             edits = await self.prepare_to_edit(edits)
             edited = set(edit[0] for edit in edits)
 
+            self.pre_edit_contents = {}
+            for path in edited:
+                if path and Path(self.abs_root_path(path)).is_file():
+                    self.pre_edit_contents[path] = self.io.read_text(
+                        self.abs_root_path(path), silent=True
+                    )
+
             self.apply_edits(edits)
         except ValueError as err:
             self.num_malformed_responses += 1
@@ -3773,6 +3969,14 @@ class Coder:
     def get_edits(self, mode="update"):
         return []
 
+    def start_streamed_edits(self):
+        """Called before a new response is streamed."""
+        return
+
+    def update_streamed_edits(self, text):
+        """Called with each piece of streamed response text, to start on edits early."""
+        return
+
     def apply_edits(self, edits):
         return
 
@@ -3805,14 +4009,15 @@ class Coder:
         if current_time - self._last_autosave_time >= 15.0 or force:
             try:
                 self._last_autosave_time = current_time
-                session_manager = SessionManager(self, self.io)
+                session_name = getattr(self.args, "auto_save_session_name", "auto-save")
+                session_name = session_name.replace(".json", "")
+                journal = getattr(self, "_session_journal", None)
+                if journal is None or journal.session_name != session_name:
+                    # Saves after the first only append what changed to the session's journal
+                    journal = SessionManager(self, self.io).journal(session_name)
+                    self._session_journal = journal
                 loop = asyncio.get_running_loop()
-                self._autosave_future = loop.run_in_executor(
-                    None,
-                    session_manager.save_session,
-                    getattr(self.args, "auto_save_session_name", "auto-save"),
-                    False,
-                )
+                self._autosave_future = loop.run_in_executor(None, journal.save)
             except Exception:
                 # Don't show errors for auto-save to avoid interrupting the user experience
                 pass
@@ -3870,6 +4075,7 @@ class Coder:
             exit_status, output = await asyncio.to_thread(
                 run_cmd, command, error_print=self.io.tool_error, cwd=self.root
             )
+            file_events.invalidate()
             if output:
                 accumulated_output += f"Output from {command}\n{output}\n"
 
@@ -2,6 +2,8 @@ import difflib
 import math
 import re
 import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
 from pathlib import Path
 
@@ -17,6 +19,91 @@ class EditBlockCoder(Coder):
     edit_format = "diff"
     prompt_format = "editblock"
 
+    dry_run_executor = None  # Shared worker thread for the dry runs of streamed edits
+    stream_parser = None
+
+    def start_streamed_edits(self):
+        """Start parsing a new response, dropping the state of the previous one."""
+        self.stream_parser = EditBlockParser(self.fence, self.get_inchat_relative_files())
+        self.stream_lines = []
+        self.stream_partial_line = ""
+        self.dry_run_futures = []
+        self.replace_cache = {}
+
+    def update_streamed_edits(self, text):
+        """
+        Parse the edit blocks completed by a streamed piece of the response, and dry
+        run each of them in the background, so applying the edits once the response
+        is complete mostly reuses those results.
+
+        The files are read here, on the caller's thread, the worker only matches the
+        blocks against the contents it is handed.
+        """
+        if self.stream_parser is None:
+            return
+
+        lines = (self.stream_partial_line + text).splitlines(keepends=True)
+        if lines and not lines[-1].endswith(("\n", "\r")):
+            self.stream_partial_line = lines.pop()
+        else:
+            self.stream_partial_line = ""
+        if not lines:
+            return
+        self.stream_lines.extend(lines)
+
+        try:
+            edits = list(self.stream_parser.parse(self.stream_lines, final=False))
+        except ValueError:
+            # Malformed, the error is reported once the whole response is parsed
+            self.stream_parser = None
+            return
+
+        replaces = []
+        for path, original, updated in edits:
+            if path is None:
+                continue
+            full_path = self.abs_root_path(path)
+            if Path(full_path).exists():
+                content = self.io.read_text(full_path, silent=True)
+                replaces.append((full_path, content, original, updated))
+        if not replaces:
+            return
+
+        if EditBlockCoder.dry_run_executor is None:
+            EditBlockCoder.dry_run_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="edit-dry-run"
+            )
+        for replace in replaces:
+            self.dry_run_futures.append(
+                EditBlockCoder.dry_run_executor.submit(self.cached_replace, *replace)
+            )
+
+    def wait_for_streamed_edits(self):
+        """
+        Wait for the background dry runs of streamed edit blocks.
+
+        An exception raised by a dry run is raised here, to be reported like one
+        raised while applying the edits.
+        """
+        futures, self.dry_run_futures = getattr(self, "dry_run_futures", []), []
+        for future in futures:
+            future.result()
+
+    def cached_replace(self, full_path, content, original, updated):
+        """do_replace, reusing the result of an earlier (dry) run on the same content."""
+        cache = getattr(self, "replace_cache", None)
+        if cache is None:
+            cache = self.replace_cache = {}
+
+        key = (full_path, original, updated)
+        cached = cache.get(key)
+        if cached is not None and cached[0] == content:
+            return cached[1]
+
+        new_content = do_replace(full_path, content, original, updated, self.fence)
+        cache[key] = (content, new_content)
+        return new_content
+
     def get_edits(self):
         content = self.partial_response_content
 
@@ -35,6 +122,7 @@ class EditBlockCoder(Coder):
         return edits
 
     def apply_edits_dry_run(self, edits):
+        self.wait_for_streamed_edits()
         return self.apply_edits(edits, dry_run=True)
 
     def apply_edits(self, edits, dry_run=False):
@@ -49,7 +137,7 @@ class EditBlockCoder(Coder):
 
             if Path(full_path).exists():
                 content = self.io.read_text(full_path)
-                new_content = do_replace(full_path, content, original, updated, self.fence)
+                new_content = self.cached_replace(full_path, content, original, updated)
 
             # If the edit failed, and
             # this is not a "create a new file" with an empty original...
@@ -58,7 +146,7 @@ class EditBlockCoder(Coder):
                 # try patching any of the other files in the chat
                 for full_path in self.abs_fnames:
                     content = self.io.read_text(full_path)
-                    new_content = do_replace(full_path, content, original, updated, self.fence)
+                    new_content = self.cached_replace(full_path, content, original, updated)
                     if new_content:
                         path = self.get_rel_fname(full_path)
                         break
@@ -295,25 +383,19 @@ def match_but_for_leading_whitespace(whole_lines, part_lines):
 def replace_closest_edit_distance(whole_lines, part, part_lines, replace_lines):
     similarity_thresh = 0.8
 
-    max_similarity = 0
-    most_similar_chunk_start = -1
-    most_similar_chunk_end = -1
-
     scale = 0.1
     min_len = math.floor(len(part_lines) * (1 - scale))
     max_len = math.ceil(len(part_lines) * (1 + scale))
 
-    for length in range(min_len, max_len):
-        for i in range(len(whole_lines) - length + 1):
-            chunk = whole_lines[i : i + length]
-            chunk = "".join(chunk)
-
-            similarity = SequenceMatcher(None, chunk, part).ratio()
-
-            if similarity > max_similarity and similarity:
-                max_similarity = similarity
-                most_similar_chunk_start = i
-                most_similar_chunk_end = i + length
+    max_similarity, most_similar_chunk_start, most_similar_chunk_end = closest_window(
+        whole_lines,
+        part,
+        part_lines,
+        range(min_len, max_len),
+        cutoff=similarity_thresh,
+        join="".join,
+        elements=lambda line: line,
+    )
 
     if max_similarity < similarity_thresh:
         return
@@ -328,6 +410,129 @@ def replace_closest_edit_distance(whole_lines, part, part_lines, replace_lines):
     return modified_whole
 
 
+def anchor_starts(whole_lines, part_lines, max_anchors=8):
+    """
+    Guess where `part_lines` could start in `whole_lines`.
+
+    Lines of the part that also occur in the whole (ignoring surrounding whitespace)
+    are used as anchors, rarest first. Each anchor hit implies a start offset.
+    """
+    positions = defaultdict(list)
+    for i, line in enumerate(whole_lines):
+        key = line.strip()
+        if key:
+            positions[key].append(i)
+
+    anchors = sorted(
+        (len(positions[line.strip()]), j, line.strip())
+        for j, line in enumerate(part_lines)
+        if line.strip() in positions
+    )
+
+    starts = set()
+    for _, j, key in anchors[:max_anchors]:
+        for i in positions[key][:max_anchors]:
+            starts.add(i - j)
+    return starts
+
+
+def closest_window(
+    whole_lines, part, part_lines, lengths, cutoff, join, elements, part_first=False
+):
+    """
+    Find the window of `whole_lines` most similar to `part`.
+
+    Gives exactly the result of scoring every window of every length in `lengths`,
+    in order, with `SequenceMatcher(None, join(window), part).ratio()` and keeping
+    the first best one. Windows scoring below `cutoff` are of no interest, which
+    allows skipping most windows without scoring them:
+
+    - windows around anchor lines are scored first, raising the cutoff to the best
+      score found there
+    - a window is only scored if its length and the overlap of its elements with
+      those of `part` (an upper bound of the number of matches) could beat the cutoff
+
+    `elements(line)` gives the items a line contributes to the joined window (and
+    `part` is a sequence of such items), `part_first` swaps the arguments of the
+    SequenceMatcher.
+
+    Returns (similarity, start, end), or (0, -1, -1) if nothing scored above 0.
+    """
+    lengths = [length for length in lengths if 0 <= length <= len(whole_lines)]
+    if not lengths:
+        return 0, -1, -1
+
+    scores = {}
+
+    def score(start, length):
+        key = (start, length)
+        if key not in scores:
+            chunk = join(whole_lines[start : start + length])
+            if part_first:
+                matcher = SequenceMatcher(None, part, chunk)
+            else:
+                matcher = SequenceMatcher(None, chunk, part)
+            scores[key] = matcher.ratio()
+        return scores[key]
+
+    # Score the windows at anchor lines first, to get a high cutoff early
+    length = min(lengths, key=lambda length: abs(length - len(part_lines)))
+    for start in anchor_starts(whole_lines, part_lines):
+        if 0 <= start <= len(whole_lines) - length:
+            cutoff = max(cutoff, score(start, length))
+
+    # Upper bound of the matches of every window: the overlap between the elements
+    # of the longest window starting at the same line and the elements of the part
+    part_counts = Counter(part)
+    line_counts = [Counter(elements(line)) for line in whole_lines]
+    sizes = [0]
+    for counts in line_counts:
+        sizes.append(sizes[-1] + sum(counts.values()))
+
+    longest = max(lengths)
+    window_counts = Counter()
+    overlap = 0
+
+    def add(counts, sign):
+        nonlocal overlap
+        for item, count in counts.items():
+            before = window_counts[item]
+            window_counts[item] = before + sign * count
+            wanted = part_counts.get(item, 0)
+            overlap += min(window_counts[item], wanted) - min(before, wanted)
+
+    for counts in line_counts[:longest]:
+        add(counts, 1)
+    overlaps = []
+    for start in range(len(whole_lines)):
+        overlaps.append(overlap)
+        add(line_counts[start], -1)
+        if start + longest < len(whole_lines):
+            add(line_counts[start + longest], 1)
+    overlaps.append(0)  # The empty window at the end
+
+    part_size = sum(part_counts.values())
+    max_similarity = 0
+    best_start = best_end = -1
+
+    for length in lengths:
+        for start in range(len(whole_lines) - length + 1):
+            chunk_size = sizes[start + length] - sizes[start]
+            total = chunk_size + part_size
+            if total:
+                bound = 2.0 * min(overlaps[start], chunk_size, part_size) / total
+                if bound < cutoff:
+                    continue
+
+            similarity = score(start, length)
+            if similarity > max_similarity and similarity:
+                max_similarity = similarity
+                best_start = start
+                best_end = start + length
+
+    return max_similarity, best_start, best_end
+
+
 DEFAULT_FENCE = ("`" * 3, "`" * 3)
 
 
@@ -437,101 +642,160 @@ def strip_filename(filename, fence):
 
 def find_original_update_blocks(content, fence=DEFAULT_FENCE, valid_fnames=None):
     lines = content.splitlines(keepends=True)
-    i = 0
-    current_filename = None
+    yield from EditBlockParser(fence, valid_fnames).parse(lines)
+
+
+class EditBlockParser:
+    """
+    Resumable parser of SEARCH/REPLACE (and shell) blocks.
+
+    `parse` can be called again and again on a growing list of lines. Unless
+    `final`, it stops in front of a block that isn't complete yet and picks up
+    there on the next call, so every block is yielded once, as soon as its closing
+    marker has arrived. The lines of the incomplete block read so far are kept, so
+    each line is only scanned once however many calls the block spans.
+    """
+
+    shell_starts = [
+        "```bash",
+        "```sh",
+        "```shell",
+        "```cmd",
+        "```batch",
+        "```powershell",
+        "```ps1",
+        "```zsh",
+        "```fish",
+        "```ksh",
+        "```csh",
+        "```tcsh",
+    ]
 
     head_pattern = re.compile(HEAD)
     divider_pattern = re.compile(DIVIDER)
     updated_pattern = re.compile(UPDATED)
 
-    while i < len(lines):
-        line = lines[i]
-
-        # Check for shell code blocks
-        shell_starts = [
-            "```bash",
-            "```sh",
-            "```shell",
-            "```cmd",
-            "```batch",
-            "```powershell",
-            "```ps1",
-            "```zsh",
-            "```fish",
-            "```ksh",
-            "```csh",
-            "```tcsh",
-        ]
+    def __init__(self, fence=DEFAULT_FENCE, valid_fnames=None):
+        self.fence = fence
+        self.valid_fnames = valid_fnames
+        self.index = 0  # First line not parsed yet
+        self.current_filename = None
+        self.partial = None  # State of the incomplete block starting at self.index
+
+    def parse(self, lines, final=True):
+        while self.index < len(lines):
+            i = self.index
+            # Wait for the lines needed to look ahead
+            if not final and i + 2 >= len(lines):
+                return
+
+            if self.partial is not None:
+                block = self.partial["parse"](lines, final)
+            elif self.head_pattern.match(lines[i].strip()):
+                block = self._parse_edit_block(lines, final)
+            elif self._is_shell_start(lines, i):
+                block = self._parse_shell_block(lines, final)
+            else:
+                self.index += 1
+                continue
+
+            if block is None:
+                return
+            self.index, edit = block
+            self.partial = None
+            yield edit
 
+    def _is_shell_start(self, lines, i):
         # Check if the next line or the one after that is an editblock
         next_is_editblock = (
             i + 1 < len(lines)
-            and head_pattern.match(lines[i + 1].strip())
+            and self.head_pattern.match(lines[i + 1].strip())
             or i + 2 < len(lines)
-            and head_pattern.match(lines[i + 2].strip())
+            and self.head_pattern.match(lines[i + 2].strip())
         )
+        line = lines[i].strip()
+        return any(line.startswith(start) for start in self.shell_starts) and not next_is_editblock
+
+    def _parse_shell_block(self, lines, final):
+        """Return (index after the block, shell edit), or None if the block is incomplete."""
+        if self.partial is None:
+            self.partial = dict(parse=self._parse_shell_block, scan=self.index + 1)
 
-        if any(line.strip().startswith(start) for start in shell_starts) and not next_is_editblock:
-            shell_content = []
+        i = self.partial["scan"]
+        while i < len(lines) and not lines[i].strip().startswith("```"):
             i += 1
-            while i < len(lines) and not lines[i].strip().startswith("```"):
-                shell_content.append(lines[i])
-                i += 1
-            if i < len(lines) and lines[i].strip().startswith("```"):
-                i += 1  # Skip the closing ```
+        self.partial["scan"] = i
+        if i >= len(lines) and not final:
+            return
 
-            yield None, "".join(shell_content)
-            continue
+        shell_content = lines[self.index + 1 : i]
+        if i < len(lines):
+            i += 1  # Skip the closing ```
+        return i, (None, "".join(shell_content))
 
-        # Check for SEARCH/REPLACE blocks
-        if head_pattern.match(line.strip()):
-            try:
+    def _parse_edit_block(self, lines, final):
+        """Return (index after the closing marker, edit), or None if the block is incomplete."""
+        i = self.index
+        try:
+            if self.partial is None:
                 # if next line after HEAD exists and is DIVIDER, it's a new file
-                if i + 1 < len(lines) and divider_pattern.match(lines[i + 1].strip()):
-                    filename = find_filename(lines[max(0, i - 3) : i], fence, None)
+                before = lines[max(0, i - 3) : i]
+                if i + 1 < len(lines) and self.divider_pattern.match(lines[i + 1].strip()):
+                    filename = find_filename(before, self.fence, None)
                 else:
-                    filename = find_filename(lines[max(0, i - 3) : i], fence, valid_fnames)
+                    filename = find_filename(before, self.fence, self.valid_fnames)
 
                 if not filename:
-                    if current_filename:
-                        filename = current_filename
+                    if self.current_filename:
+                        filename = self.current_filename
                     else:
-                        raise ValueError(missing_filename_err.format(fence=fence))
-
-                current_filename = filename
-
-                original_text = []
-                i += 1
-                while i < len(lines) and not divider_pattern.match(lines[i].strip()):
-                    original_text.append(lines[i])
+                        raise ValueError(missing_filename_err.format(fence=self.fence))
+
+                self.partial = dict(
+                    parse=self._parse_edit_block,
+                    scan=i + 1,
+                    filename=filename,
+                    original=[],
+                    updated=None,
+                )
+
+            block = self.partial
+            i = block["scan"]
+            if block["updated"] is None:
+                while i < len(lines) and not self.divider_pattern.match(lines[i].strip()):
+                    block["original"].append(lines[i])
                     i += 1
 
-                if i >= len(lines) or not divider_pattern.match(lines[i].strip()):
+                if i >= len(lines):
+                    block["scan"] = i
+                    if not final:
+                        return
                     raise ValueError(f"Expected `{DIVIDER_ERR}`")
 
-                updated_text = []
+                block["updated"] = []
                 i += 1
-                while i < len(lines) and not (
-                    updated_pattern.match(lines[i].strip())
-                    or divider_pattern.match(lines[i].strip())
-                ):
-                    updated_text.append(lines[i])
-                    i += 1
 
-                if i >= len(lines) or not (
-                    updated_pattern.match(lines[i].strip())
-                    or divider_pattern.match(lines[i].strip())
-                ):
-                    raise ValueError(f"Expected `{UPDATED_ERR}` or `{DIVIDER_ERR}`")
+            while i < len(lines) and not (
+                self.updated_pattern.match(lines[i].strip())
+                or self.divider_pattern.match(lines[i].strip())
+            ):
+                block["updated"].append(lines[i])
+                i += 1
 
-                yield filename, "".join(original_text), "".join(updated_text)
+            if i >= len(lines):
+                block["scan"] = i
+                if not final:
+                    return
+                raise ValueError(f"Expected `{UPDATED_ERR}` or `{DIVIDER_ERR}`")
 
-            except ValueError as e:
-                processed = "".join(lines[: i + 1])
-                err = e.args[0]
-                raise ValueError(f"{processed}\n^^^ {err}")
+        except ValueError as e:
+            processed = "".join(lines[: i + 1])
+            err = e.args[0]
+            raise ValueError(f"{processed}\n^^^ {err}")
 
-        i += 1
+        self.current_filename = block["filename"]
+        edit = (block["filename"], "".join(block["original"]), "".join(block["updated"]))
+        return i + 1, edit
 
 
 def find_filename(lines, fence, valid_fnames):
@@ -602,20 +866,21 @@ def find_similar_lines(search_lines, content_lines, threshold=0.6):
     search_lines = search_lines.splitlines()
     content_lines = content_lines.splitlines()
 
-    best_ratio = 0
-    best_match = None
-
-    for i in range(len(content_lines) - len(search_lines) + 1):
-        chunk = content_lines[i : i + len(search_lines)]
-        ratio = SequenceMatcher(None, search_lines, chunk).ratio()
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_match = chunk
-            best_match_i = i
-
+    best_ratio, best_match_i, _ = closest_window(
+        content_lines,
+        search_lines,
+        search_lines,
+        [len(search_lines)],
+        cutoff=threshold,
+        join=list,
+        elements=lambda line: (line,),
+        part_first=True,
+    )
     if best_ratio < threshold:
         return ""
 
+    best_match = content_lines[best_match_i : best_match_i + len(search_lines)]
+
     if best_match[0] == search_lines[0] and best_match[-1] == search_lines[-1]:
         return "\n".join(best_match)
 
@@ -3,6 +3,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 
+from ..helpers.context_index import EXACT, RSTRIP, STRIP, ContextIndex
 from .base_coder import Coder
 
 
@@ -55,41 +56,52 @@ def _norm(line: str) -> str:
     return line.rstrip("\r")
 
 
-def find_context_core(lines: List[str], context: List[str], start: int) -> Tuple[int, int]:
+def find_context_core(
+    lines: List[str], context: List[str], start: int, index: Optional[ContextIndex] = None
+) -> Tuple[int, int]:
     """Finds context block, returns start index and fuzz level."""
     if not context:
         return start, 0
 
+    if index is None:
+        index = ContextIndex(lines)
+
     # Exact match
-    for i in range(start, len(lines) - len(context) + 1):
-        if lines[i : i + len(context)] == context:
-            return i, 0
+    i = index.find(context, start, EXACT)
+    if i != -1:
+        return i, 0
     # Rstrip match
-    norm_context = [s.rstrip() for s in context]
-    for i in range(start, len(lines) - len(context) + 1):
-        if [s.rstrip() for s in lines[i : i + len(context)]] == norm_context:
-            return i, 1  # Fuzz level 1
+    i = index.find(context, start, RSTRIP)
+    if i != -1:
+        return i, 1  # Fuzz level 1
     # Strip match
-    norm_context_strip = [s.strip() for s in context]
-    for i in range(start, len(lines) - len(context) + 1):
-        if [s.strip() for s in lines[i : i + len(context)]] == norm_context_strip:
-            return i, 100  # Fuzz level 100
+    i = index.find(context, start, STRIP)
+    if i != -1:
+        return i, 100  # Fuzz level 100
     return -1, 0
 
 
-def find_context(lines: List[str], context: List[str], start: int, eof: bool) -> Tuple[int, int]:
+def find_context(
+    lines: List[str],
+    context: List[str],
+    start: int,
+    eof: bool,
+    index: Optional[ContextIndex] = None,
+) -> Tuple[int, int]:
     """Finds context, handling EOF marker."""
+    if index is None:
+        index = ContextIndex(lines)
     if eof:
         # If EOF marker, first try matching at the very end
         if len(lines) >= len(context):
-            new_index, fuzz = find_context_core(lines, context, len(lines) - len(context))
+            new_index, fuzz = find_context_core(lines, context, len(lines) - len(context), index)
             if new_index != -1:
                 return new_index, fuzz
         # If not found at end, search from `start` as fallback
-        new_index, fuzz = find_context_core(lines, context, start)
+        new_index, fuzz = find_context_core(lines, context, start, index)
         return new_index, fuzz + 10_000  # Add large fuzz penalty if EOF wasn't at end
     # Normal case: search from `start`
-    return find_context_core(lines, context, start)
+    return find_context_core(lines, context, start, index)
 
 
 def peek_next_section(lines: List[str], index: int) -> Tuple[List[str], List[Chunk], int, bool]:
@@ -414,6 +426,7 @@ class PatchCoder(Coder):
         """Parses all sections (@@, context, -, +) for a single Update File action."""
         action = PatchAction(type=ActionType.UPDATE, path="")  # Path set by caller
         orig_lines = file_content.splitlines()  # Use splitlines for consistency
+        context_index = ContextIndex(orig_lines)  # Built once, used for every section
         current_file_index = 0  # Track position in original file content
         total_fuzz = 0
 
@@ -440,54 +453,21 @@ class PatchCoder(Coder):
 
             # Find the scope in the original file if specified
             if scope_lines:
-                # Simple scope finding: search from current position
+                # Simple scope finding: search from current position, ignoring whitespace
                 # A more robust finder could handle nested scopes like the reference @@ @@
-                found_scope = False
-                temp_index = current_file_index
-                while temp_index < len(orig_lines):
-                    # Check if all scope lines match sequentially from temp_index
-                    match = True
-                    for i, scope in enumerate(scope_lines):
-                        if (
-                            temp_index + i >= len(orig_lines)
-                            or _norm(orig_lines[temp_index + i]).strip() != scope
-                        ):
-                            match = False
-                            break
-                    if match:
-                        current_file_index = temp_index + len(scope_lines)
-                        found_scope = True
-                        break
-                    temp_index += 1
-
-                if not found_scope:
-                    # Try fuzzy scope matching (strip whitespace)
-                    temp_index = current_file_index
-                    while temp_index < len(orig_lines):
-                        match = True
-                        for i, scope in enumerate(scope_lines):
-                            if (
-                                temp_index + i >= len(orig_lines)
-                                or _norm(orig_lines[temp_index + i]).strip() != scope.strip()
-                            ):
-                                match = False
-                                break
-                        if match:
-                            current_file_index = temp_index + len(scope_lines)
-                            found_scope = True
-                            total_fuzz += 1  # Add fuzz for scope match difference
-                            break
-                        temp_index += 1
-
-                if not found_scope:
+                scope_index = context_index.find(scope_lines, current_file_index, STRIP)
+                if scope_index == -1:
                     scope_txt = "\n".join(scope_lines)
                     raise DiffError(f"Could not find scope context:\n{scope_txt}")
+                current_file_index = scope_index + len(scope_lines)
 
             # Peek and parse the next context/change section
             context_block, chunks_in_section, next_index, is_eof = peek_next_section(lines, index)
 
             # Find where this context block appears in the original file
-            found_index, fuzz = find_context(orig_lines, context_block, current_file_index, is_eof)
+            found_index, fuzz = find_context(
+                orig_lines, context_block, current_file_index, is_eof, context_index
+            )
             total_fuzz += fuzz
 
             if found_index == -1:
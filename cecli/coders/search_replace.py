@@ -1,6 +1,12 @@
 #!/usr/bin/env python
 
+import atexit
+import json
+import logging
+import os
 import sys
+import threading
+import time
 from pathlib import Path
 
 try:
@@ -12,6 +18,7 @@ from diff_match_patch import diff_match_patch
 from tqdm import tqdm
 
 from cecli.dump import dump
+from cecli.helpers.file_searcher import handle_core_files
 from cecli.utils import GitTemporaryDirectory
 
 
@@ -562,19 +569,211 @@ udiff_strategies = [
 ]
 
 
-def flexible_search_and_replace(texts, strategies):
+# Wall time after which flexible_search_and_replace stops trying further methods.
+# This is a soft limit: an attempt that is already running is not interrupted.
+DEFAULT_TIME_BUDGET = 10.0
+
+# Rough cost in seconds of one attempt, used until a method has been timed
+STRATEGY_COSTS = dict(
+    search_and_replace=0.001,
+    dmp_lines_apply=0.05,
+    dmp_apply=0.5,
+    git_cherry_pick_osr_onto_o=1.0,
+    git_cherry_pick_sr_onto_so=1.0,
+)
+
+PREPROC_NAMES = ("strip_blank", "relative_indent", "reverse")
+
+
+def method_name(strategy, preproc):
+    """Name of a (strategy, preproc) combination, e.g. "search_and_replace+strip_blank"."""
+    flags = [name for name, enabled in zip(PREPROC_NAMES, preproc) if enabled]
+    return "+".join([strategy.__name__] + flags)
+
+
+def edit_shape(texts):
+    """Coarse bucket of an edit's size, so methods are compared on similar edits."""
+    search_text, _, original_text = texts
+
+    search_lines = search_text.count("\n")
+    if search_lines <= 5:
+        search = "xs"
+    elif search_lines <= 20:
+        search = "s"
+    elif search_lines <= 100:
+        search = "m"
+    else:
+        search = "l"
+
+    original_lines = original_text.count("\n")
+    if original_lines <= 200:
+        original = "s"
+    elif original_lines <= 2000:
+        original = "m"
+    else:
+        original = "l"
+
+    return f"search-{search}/original-{original}"
+
+
+class StrategyTelemetry:
+    """
+    Attempts, successes and time spent per search/replace method and edit shape.
+
+    The numbers are kept across runs in a small JSON file. With `adaptive`, they
+    are used to order the methods by their expected cost per success.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None, save_interval=30, adaptive=False):
+        self.save_interval = save_interval
+        self.adaptive = adaptive
+        self.lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self.use_path(path)
+
+    def use_path(self, path):
+        """Keep the stats in `path` from now on, dropping those read from the previous file."""
+        with self.lock:
+            self.path = Path(path) if path else None
+            self.stats = {}  # shape -> method -> [attempts, successes, total seconds]
+            self._loaded = self.path is None
+            self._dirty = False
+
+    def _load(self):
+        self._loaded = True
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.VERSION:
+            self.stats = data.get("stats") or {}
+
+    def record(self, shape, method, elapsed, success):
+        with self.lock:
+            if not self._loaded:
+                self._load()
+            entry = self.stats.setdefault(shape, {}).setdefault(method, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += 1 if success else 0
+            entry[2] += elapsed
+            self._dirty = True
+
+    def expected_cost(self, shape, strategy, preproc):
+        """Expected seconds spent per successful edit with this method."""
+        prior = STRATEGY_COSTS.get(strategy.__name__, 0.1)
+        with self.lock:
+            if not self._loaded:
+                self._load()
+            attempts, successes, total = self.stats.get(shape, {}).get(
+                method_name(strategy, preproc), (0, 0, 0.0)
+            )
+        mean_time = (total + prior) / (attempts + 1)
+        success_rate = (successes + 1) / (attempts + 2)
+        return mean_time / success_rate
+
+    def order(self, shape, candidates):
+        """Sort (strategy, preproc) candidates by expected cost, keeping ties in order."""
+        return sorted(candidates, key=lambda c: self.expected_cost(shape, *c))
+
+    def save(self, force=False):
+        """Write the stats to disk, at most once per `save_interval` unless forced."""
+        with self.lock:
+            if not self.path or not self._dirty:
+                return
+            if not force and time.monotonic() - self._last_save < self.save_interval:
+                return
+            payload = json.dumps({"version": self.VERSION, "stats": self.stats})
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.path.with_suffix(".tmp")
+            tmp_file.write_text(payload, encoding="utf-8")
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            logging.warning(f"Could not save search/replace stats: {e}")
+
+    def format_report(self):
+        """Return a table of attempts, success rate and mean time per method."""
+        totals = {}
+        with self.lock:
+            if not self._loaded:
+                self._load()
+            for methods in self.stats.values():
+                for method, (attempts, successes, total) in methods.items():
+                    entry = totals.setdefault(method, [0, 0, 0.0])
+                    entry[0] += attempts
+                    entry[1] += successes
+                    entry[2] += total
+
+        if not totals:
+            return "No search/replace attempts have been recorded yet."
+
+        width = max(len(method) for method in totals)
+        lines = [f"{'Method':<{width}} {'Tries':>7} {'Success':>8} {'Mean ms':>9}"]
+        for method in sorted(totals):
+            attempts, successes, total = totals[method]
+            lines.append(
+                f"{method:<{width}} {attempts:>7} {successes / attempts:>8.0%}"
+                f" {total / attempts * 1000:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+strategy_telemetry = StrategyTelemetry(
+    handle_core_files(Path.home() / ".cecli" / "caches" / "search-replace-stats.json")
+)
+# Saves are throttled, so write out whatever was recorded since the last one
+atexit.register(strategy_telemetry.save, force=True)
+
+
+def flexible_search_and_replace(
+    texts, strategies, adaptive=None, budget=DEFAULT_TIME_BUDGET, telemetry=None
+):
     """Try a series of search/replace methods, starting from the most
     literal interpretation of search_text. If needed, progress to more
     flexible methods, which can accommodate divergence between
     search_text and original_text and yet still achieve the desired
     edits.
+
+    The time and outcome of every attempt is recorded in `telemetry`. With
+    `adaptive`, which defaults to the telemetry's setting, the methods are
+    instead tried in order of their expected cost per success for edits of
+    this shape. No further methods are tried once `budget` seconds have
+    passed, so pathological edits fail fast. The budget is only checked
+    between attempts, so it is a soft limit: a slow attempt, like a git
+    cherry-pick, runs to completion and can overshoot it by its own time.
     """
+    if telemetry is None:
+        telemetry = strategy_telemetry
+    if adaptive is None:
+        adaptive = telemetry.adaptive
 
-    for strategy, preprocs in strategies:
-        for preproc in preprocs:
+    shape = edit_shape(texts)
+    candidates = [(strategy, preproc) for strategy, preprocs in strategies for preproc in preprocs]
+    if adaptive:
+        candidates = telemetry.order(shape, candidates)
+
+    start = time.monotonic()
+    try:
+        for strategy, preproc in candidates:
+            if budget is not None and time.monotonic() - start > budget:
+                return
+
+            attempt_start = time.monotonic()
             res = try_strategy(texts, strategy, preproc)
+            telemetry.record(
+                shape,
+                method_name(strategy, preproc),
+                time.monotonic() - attempt_start,
+                bool(res),
+            )
             if res:
                 return res
+    finally:
+        telemetry.save()
 
 
 def reverse_lines(text):
@@ -3,6 +3,7 @@ from itertools import groupby
 from pathlib import Path
 
 from ..dump import dump  # noqa: F401
+from ..helpers.context_index import ContextIndex
 from .base_coder import Coder
 from .search_replace import (
     SearchTextNotUnique,
@@ -10,6 +11,7 @@ from .search_replace import (
     diff_lines,
     flexible_search_and_replace,
     search_and_replace,
+    udiff_strategies,
 )
 
 no_match_error = """UnifiedDiffNoMatch: hunk failed to apply!
@@ -150,10 +152,15 @@ def collapse_repeats(s):
 def apply_hunk(content, hunk):
     before_text, after_text = hunk_to_before_after(hunk)
 
-    res = directly_apply_hunk(content, hunk)
+    # Index the content once, so hunks that can't match are rejected without
+    # running every search strategy over the whole file
+    index = ContextIndex(content.splitlines())
+
+    res = directly_apply_hunk(content, hunk, index)
     if res:
         return res
 
+    original = content
     hunk = make_new_lines_explicit(content, hunk)
 
     # just consider space vs not-space
@@ -184,9 +191,10 @@ def apply_hunk(content, hunk):
         changes = sections[i - 1]
         following_context = sections[i]
 
-        res = apply_partial_hunk(content, preceding_context, changes, following_context)
+        res = apply_partial_hunk(content, preceding_context, changes, following_context, index)
         if res:
             content = res
+            index = ContextIndex(content.splitlines())
         else:
             all_done = False
             # FAILED!
@@ -196,6 +204,14 @@ def apply_hunk(content, hunk):
     if all_done:
         return content
 
+    # Last resort: the slower, fuzzier methods, tried on the whole hunk
+    if not original.endswith("\n"):
+        original += "\n"
+    try:
+        return flexible_search_and_replace([before_text, after_text, original], udiff_strategies)
+    except SearchTextNotUnique:
+        return
+
 
 def flexi_just_search_and_replace(texts):
     strategies = [
@@ -257,12 +273,15 @@ def normalize_hunk(hunk):
     return diff
 
 
-def directly_apply_hunk(content, hunk):
+def directly_apply_hunk(content, hunk, index=None):
     before, after = hunk_to_before_after(hunk)
 
     if not before:
         return
 
+    if index is not None and not index.could_contain(before):
+        return
+
     before_lines, _ = hunk_to_before_after(hunk, lines=True)
     before_lines = "".join([line.strip() for line in before_lines])
 
@@ -278,7 +297,7 @@ def directly_apply_hunk(content, hunk):
     return new_content
 
 
-def apply_partial_hunk(content, preceding_context, changes, following_context):
+def apply_partial_hunk(content, preceding_context, changes, following_context, index=None):
     len_prec = len(preceding_context)
     len_foll = len(following_context)
 
@@ -303,7 +322,7 @@ def apply_partial_hunk(content, preceding_context, changes, following_context):
 
             this_foll = following_context[:use_foll]
 
-            res = directly_apply_hunk(content, this_prec + changes + this_foll)
+            res = directly_apply_hunk(content, this_prec + changes + this_foll, index)
             if res:
                 return res
 
@@ -22,6 +22,7 @@ from .copy_context import CopyContextCommand
 from .core import Commands, SwitchCoderSignal
 from .diff import DiffCommand
 from .drop import DropCommand
+from .edit_stats import EditStatsCommand
 from .editor import EditCommand, EditorCommand
 from .editor_model import EditorModelCommand
 from .exit import ExitCommand
@@ -92,6 +93,7 @@ CommandRegistry.register(CopyContextCommand)
 CommandRegistry.register(DiffCommand)
 CommandRegistry.register(DropCommand)
 CommandRegistry.register(EditCommand)
+CommandRegistry.register(EditStatsCommand)
 CommandRegistry.register(EditorCommand)
 CommandRegistry.register(EditorModelCommand)
 CommandRegistry.register(ExitCommand)
@@ -155,6 +157,7 @@ __all__ = [
     "DiffCommand",
     "DropCommand",
     "EditCommand",
+    "EditStatsCommand",
     "EditorCommand",
     "EditorModelCommand",
     "ExitCommand",
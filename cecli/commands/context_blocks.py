@@ -17,6 +17,18 @@ class ContextBlocksCommand(BaseCommand):
                 io, "context-blocks", "Enhanced context blocks only available in agent mode"
             )
 
+        # Report per-block cache hits and generation times
+        if args.strip().lower() == "report":
+            if hasattr(coder, "context_block_cache"):
+                io.tool_output(coder.context_block_cache.format_report())
+                return format_command_result(
+                    io, "context-blocks", "Displayed context block cache report"
+                )
+            io.tool_error("This coder doesn't track context block generation.")
+            return format_command_result(
+                io, "context-blocks", "Coder doesn't track context block generation"
+            )
+
         # If an argument is provided, try to print that specific context block
         if args.strip():
             # Format block name to match internal naming conventions
@@ -93,7 +105,7 @@ class ContextBlocksCommand(BaseCommand):
             block_names = list(coder.context_block_tokens.keys())
             # Format them for display (convert snake_case to Title Case)
             formatted_blocks = [name.replace("_", " ").title() for name in block_names]
-            return formatted_blocks
+            return formatted_blocks + ["report"]
 
         # Standard blocks that are typically available
         return [
@@ -102,6 +114,7 @@ class ContextBlocksCommand(BaseCommand):
             "Environment Info",
             "Git Status",
             "Symbol Outline",
+            "report",
         ]
 
     @classmethod
@@ -111,6 +124,7 @@ class ContextBlocksCommand(BaseCommand):
         help_text += "\nUsage:\n"
         help_text += "  /context-blocks              # Toggle enhanced context blocks\n"
         help_text += "  /context-blocks <block-name> # View a specific context block\n"
+        help_text += "  /context-blocks report       # Show per-block cache hits and timings\n"
         help_text += "\nExamples:\n"
         help_text += "  /context-blocks              # Toggle context blocks on/off\n"
         help_text += "  /context-blocks git status   # View git status context block\n"
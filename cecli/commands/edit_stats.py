@@ -0,0 +1,36 @@
+from typing import List
+
+from cecli.coders.search_replace import strategy_telemetry
+from cecli.commands.utils.base_command import BaseCommand
+from cecli.commands.utils.helpers import format_command_result
+
+
+class EditStatsCommand(BaseCommand):
+    NORM_NAME = "edit-stats"
+    DESCRIPTION = (
+        "Report how often each fuzzy search/replace method succeeds, and how long it takes"
+    )
+
+    @classmethod
+    async def execute(cls, io, coder, args, **kwargs):
+        """Execute the edit-stats command with given parameters."""
+        io.tool_output(strategy_telemetry.format_report())
+        if strategy_telemetry.adaptive:
+            io.tool_output("\nMethods are tried in order of their expected cost per success.")
+        return format_command_result(io, "edit-stats", "Displayed search/replace method stats")
+
+    @classmethod
+    def get_completions(cls, io, coder, args) -> List[str]:
+        """Get completion options for edit-stats command."""
+        return []
+
+    @classmethod
+    def get_help(cls) -> str:
+        """Get help text for the edit-stats command."""
+        help_text = super().get_help()
+        help_text += "\nUsage:\n"
+        help_text += "  /edit-stats  # Show the recorded search/replace method stats\n"
+        help_text += "\nWhen an edit doesn't apply cleanly, the udiff edit format falls back to\n"
+        help_text += "fuzzier search/replace methods. This command lists the attempts, success\n"
+        help_text += "rate and mean time of each method, as used by --adaptive-search-replace.\n"
+        return help_text
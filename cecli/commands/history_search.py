@@ -3,6 +3,7 @@ from typing import List
 
 from cecli.commands.utils.base_command import BaseCommand
 from cecli.commands.utils.helpers import format_command_result
+from cecli.helpers.history_writer import history_writer
 from cecli.utils import run_fzf
 
 
@@ -16,6 +17,7 @@ class HistorySearchCommand(BaseCommand):
         # Get history lines based on whether we're in TUI mode or not
         if coder.tui and coder.tui():
             # In TUI mode, parse the history file directly using our custom parser
+            history_writer.flush(io.input_history_file)
             history_lines = cls.parse_input_history_file(io.input_history_file)
         else:
             # In non-TUI mode, use the io.get_input_history() method
@@ -5,6 +5,7 @@ import cecli.prompts.utils.system as prompts
 from cecli.commands.utils.base_command import BaseCommand
 from cecli.commands.utils.helpers import format_command_result
 from cecli.helpers.conversation import ConversationManager, MessageTag
+from cecli.helpers.file_events import file_events
 from cecli.run_cmd import run_cmd
 
 
@@ -30,6 +31,7 @@ class RunCommand(BaseCommand):
             cwd=coder.root,
             should_print=should_print,
         )
+        file_events.invalidate()
 
         if coder.args.tui:
             print(combined_output)
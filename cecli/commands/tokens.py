@@ -188,6 +188,14 @@ class TokensCommand(BaseCommand):
         io.tool_output("=" * (width + cost_width + 1))
         io.tool_output(f"${total_cost:7.4f} {fmt(total)} tokens total")  # noqa: E231
 
+        if getattr(coder, "elide_superseded_files", False):
+            elided = ConversationManager.get_elision_stats()
+            if elided["messages"]:
+                io.tool_output(
+                    f"{cost_pad}{fmt(elided['tokens'])} tokens saved by leaving out"
+                    f" {elided['messages']} superseded file diffs"
+                )
+
         limit = coder.main_model.info.get("max_input_tokens") or 0
         if not limit:
             return format_command_result(io, "tokens", "Token report generated")
@@ -1,6 +1,8 @@
 import difflib
 import sys
 
+from diff_match_patch import diff_match_patch
+
 from .dump import dump  # noqa: F401
 
 
@@ -125,5 +127,97 @@ def find_last_non_deleted(lines_orig, lines_updated):
     return last_non_deleted_orig
 
 
+def unified_diff(a, b, fromfile="", tofile="", n=3):
+    """
+    Yield the lines of a unified diff of the line lists `a` and `b`.
+
+    The output matches difflib.unified_diff(..., lineterm=""), but lines are
+    matched with diff-match-patch's Myers diff, one character per distinct
+    line, which is much faster than difflib's matcher on large files. Past
+    diff-match-patch's timeout the diff is still correct, just not minimal.
+    """
+    line_codes = {}
+    chars_a = "".join(chr(line_codes.setdefault(line, len(line_codes))) for line in a)
+    chars_b = "".join(chr(line_codes.setdefault(line, len(line_codes))) for line in b)
+
+    opcodes = []
+    i = j = 0
+    for op, text in diff_match_patch().diff_main(chars_a, chars_b, False):
+        size = len(text)
+        if op == diff_match_patch.DIFF_EQUAL:
+            opcodes.append(("equal", i, i + size, j, j + size))
+            i += size
+            j += size
+            continue
+
+        if op == diff_match_patch.DIFF_DELETE:
+            i += size
+        else:
+            j += size
+        if opcodes and opcodes[-1][0] != "equal":
+            # Adjacent deletes and inserts are one replace, as difflib reports them
+            _, i1, _, j1, _ = opcodes.pop()
+            opcodes.append(("replace", i1, i, j1, j))
+        elif op == diff_match_patch.DIFF_DELETE:
+            opcodes.append(("delete", i - size, i, j, j))
+        else:
+            opcodes.append(("insert", i, i, j - size, j))
+
+    started = False
+    for group in group_opcodes(opcodes, n):
+        if not started:
+            started = True
+            yield f"--- {fromfile}"
+            yield f"+++ {tofile}"
+
+        first, last = group[0], group[-1]
+        yield (f"@@ -{format_range(first[1], last[2])} +{format_range(first[3], last[4])} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + line
+
+
+def group_opcodes(codes, n=3):
+    """Hunks of opcodes with `n` lines of context, like SequenceMatcher.get_grouped_opcodes()."""
+    codes = list(codes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # End the hunk at a long run of unchanged lines
+        if tag == "equal" and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def format_range(start, stop):
+    """Line range of a unified diff hunk header."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
 if __name__ == "__main__":
     main()
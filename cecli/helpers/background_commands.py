@@ -5,39 +5,85 @@ Provides a static BackgroundCommandManager class for running shell commands
 in the background and capturing their output for injection into chat streams.
 """
 
+import codecs
+import os
+import selectors
 import subprocess
 import threading
-from collections import deque
+from collections import defaultdict, deque
 from typing import Dict, Optional, Tuple
 
 
 class CircularBuffer:
     """
     Thread-safe circular buffer for storing command output with size limit.
+
+    The buffer holds at most `max_size` characters; the oldest output is dropped
+    (partially, if needed) to make room. Every chunk remembers its offset in the
+    combined output and in its own stream, so incremental reads only touch the new
+    chunks. Optionally, everything appended is also written to `spill_path`, so the
+    full log survives the size limit.
     """
 
-    def __init__(self, max_size: int = 4096):
+    def __init__(self, max_size: int = 4096, spill_path: Optional[str] = None):
         """
         Initialize circular buffer with maximum size.
 
         Args:
             max_size: Maximum number of characters to store
+            spill_path: Optional file that receives the complete output
         """
         self.max_size = max_size
-        self.buffer = deque(maxlen=max_size)
+        self.buffer = deque()  # (stream, text, offset, stream_offset) chunks
         self.lock = threading.Lock()
         self.total_added = 0  # Track total characters added for new output detection
+        self.stream_totals = defaultdict(int)  # Total characters added per stream
+        self.spill_path = spill_path
+        self._spill_file = None
+        self._size = 0
 
-    def append(self, text: str) -> None:
+    def append(self, text: str, stream: str = "stdout") -> None:
         """
         Add text to buffer, removing oldest content if exceeds max size.
 
         Args:
             text: Text to append to buffer
+            stream: Name of the stream the text came from
         """
+        if not text:
+            return
         with self.lock:
-            self.buffer.append(text)
+            if self.spill_path:
+                if self._spill_file is None:
+                    self._spill_file = open(self.spill_path, "a", encoding="utf-8")
+                self._spill_file.write(text)
+                self._spill_file.flush()
+
+            offset = self.total_added
+            stream_offset = self.stream_totals[stream]
             self.total_added += len(text)
+            self.stream_totals[stream] += len(text)
+
+            if len(text) > self.max_size:
+                cut = len(text) - self.max_size
+                text = text[cut:]
+                offset += cut
+                stream_offset += cut
+
+            self.buffer.append((stream, text, offset, stream_offset))
+            self._size += len(text)
+            self._trim()
+
+    def _trim(self) -> None:
+        while self._size > self.max_size and self.buffer:
+            stream, text, offset, stream_offset = self.buffer[0]
+            excess = self._size - self.max_size
+            if len(text) <= excess:
+                self.buffer.popleft()
+                self._size -= len(text)
+            else:
+                self.buffer[0] = (stream, text[excess:], offset + excess, stream_offset + excess)
+                self._size -= excess
 
     def get_all(self, clear: bool = False) -> str:
         """
@@ -50,43 +96,64 @@ class CircularBuffer:
             Concatenated string of all buffer content
         """
         with self.lock:
-            result = "".join(self.buffer)
+            result = "".join(chunk[1] for chunk in self.buffer)
             if clear:
-                self.buffer.clear()
-                self.total_added = 0
+                self._clear()
             return result
 
-    def get_new_output(self, last_read_position: int) -> Tuple[str, int]:
+    def get_new_output(
+        self, last_read_position: int, stream: Optional[str] = None
+    ) -> Tuple[str, int]:
         """
         Get new output since last read position.
 
         Args:
-            last_read_position: Position from last read (self.total_added value)
+            last_read_position: Position from last read (self.total_added value, or the
+                stream's total when reading a single stream)
+            stream: Optional stream name to only read that stream's output
 
         Returns:
             Tuple of (new_output, new_position)
         """
         with self.lock:
-            if last_read_position >= self.total_added:
-                return "", self.total_added
-
-            # Calculate how much new content we have
-            new_chars = self.total_added - last_read_position
-            # Get the last new_chars characters from the buffer
-            all_content = "".join(self.buffer)
-            new_output = all_content[-new_chars:] if new_chars > 0 else ""
-            return new_output, self.total_added
+            total = self.total_added if stream is None else self.stream_totals[stream]
+            if last_read_position >= total:
+                return "", total
+
+            # Walk back from the newest chunk until reaching already read output
+            parts = []
+            for chunk_stream, text, offset, stream_offset in reversed(self.buffer):
+                if stream is not None:
+                    if chunk_stream != stream:
+                        continue
+                    offset = stream_offset
+                if offset + len(text) <= last_read_position:
+                    break
+                parts.append(text[max(0, last_read_position - offset) :])
+            return "".join(reversed(parts)), total
+
+    def _clear(self) -> None:
+        self.buffer.clear()
+        self.total_added = 0
+        self.stream_totals.clear()
+        self._size = 0
 
     def clear(self) -> None:
         """Clear the buffer."""
         with self.lock:
-            self.buffer.clear()
-            self.total_added = 0
+            self._clear()
 
     def size(self) -> int:
         """Get current buffer size in characters."""
         with self.lock:
-            return sum(len(chunk) for chunk in self.buffer)
+            return self._size
+
+    def close(self) -> None:
+        """Close the spill file, if any."""
+        with self.lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
 
 
 class BackgroundProcess:
@@ -107,34 +174,89 @@ class BackgroundProcess:
         self.process = process
         self.buffer = buffer
         self.reader_thread = None
+        self.reader_threads = []
         self.last_read_position = 0
+        self.stream_positions = {}  # stream name -> read position within that stream
         self._start_output_reader()
 
+    @property
+    def log_path(self) -> Optional[str]:
+        """Path of the file holding the complete output, if spilling is enabled."""
+        return self.buffer.spill_path
+
     def _start_output_reader(self) -> None:
-        """Start thread to read process output."""
+        """
+        Start reading stdout and stderr concurrently.
 
-        def reader():
-            try:
-                # Simple approach: read lines when available
-                # This will block on readline(), but that's OK because
-                # we're in a separate thread and the buffer will capture
-                # output as soon as it's available
+        A single selector thread multiplexes both pipes where the platform supports it,
+        otherwise each pipe gets its own thread. Either way a full stderr pipe can never
+        block the process while stdout is being read.
+        """
+        streams = {
+            name: pipe
+            for name, pipe in (("stdout", self.process.stdout), ("stderr", self.process.stderr))
+            if pipe is not None
+        }
 
-                # Read stdout
-                for line in iter(self.process.stdout.readline, ""):
-                    if line:
-                        self.buffer.append(line)
+        if os.name != "nt" and all(self._has_fileno(pipe) for pipe in streams.values()):
+            targets = [(self._select_reader, (streams,))]
+        else:
+            targets = [(self._pipe_reader, (name, pipe)) for name, pipe in streams.items()]
 
-                # Read stderr
-                for line in iter(self.process.stderr.readline, ""):
-                    if line:
-                        self.buffer.append(line)
+        for target, args in targets:
+            thread = threading.Thread(target=target, args=args, daemon=True)
+            thread.start()
+            self.reader_threads.append(thread)
+        self.reader_thread = self.reader_threads[0] if self.reader_threads else None
 
-            except Exception as e:
-                self.buffer.append(f"\n[Error reading process output: {str(e)}]\n")
+    @staticmethod
+    def _has_fileno(pipe) -> bool:
+        try:
+            pipe.fileno()
+            return True
+        except (AttributeError, OSError, ValueError):
+            return False
 
-        self.reader_thread = threading.Thread(target=reader, daemon=True)
-        self.reader_thread.start()
+    @staticmethod
+    def _decoder():
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return text.replace("\r\n", "\n")
+
+    def _select_reader(self, streams) -> None:
+        decoders = {}
+        try:
+            with selectors.DefaultSelector() as selector:
+                for name, pipe in streams.items():
+                    selector.register(pipe, selectors.EVENT_READ, name)
+                    decoders[name] = self._decoder()
+
+                while selector.get_map():
+                    for key, _ in selector.select():
+                        data = os.read(key.fd, 65536)
+                        if not data:
+                            selector.unregister(key.fileobj)
+                            text = decoders[key.data].decode(b"", final=True)
+                        else:
+                            text = decoders[key.data].decode(data)
+                        self.buffer.append(self._normalize(text), stream=key.data)
+        except Exception as e:
+            self.buffer.append(f"\n[Error reading process output: {str(e)}]\n", stream="stderr")
+
+    def _pipe_reader(self, name, pipe) -> None:
+        decoder = self._decoder()
+        try:
+            while True:
+                line = pipe.readline()
+                if not line:
+                    break
+                text = line if isinstance(line, str) else decoder.decode(line)
+                self.buffer.append(self._normalize(text), stream=name)
+            self.buffer.append(decoder.decode(b"", final=True), stream=name)
+        except Exception as e:
+            self.buffer.append(f"\n[Error reading process output: {str(e)}]\n", stream="stderr")
 
     def get_output(self, clear: bool = False) -> str:
         """
@@ -148,17 +270,34 @@ class BackgroundProcess:
         """
         return self.buffer.get_all(clear)
 
-    def get_new_output(self) -> str:
+    def get_new_output(self, stream: Optional[str] = None) -> str:
         """
         Get new output since last call.
 
+        Args:
+            stream: Optional stream name ("stdout" or "stderr") to only read that stream.
+                Each stream keeps its own read position.
+
         Returns:
             New output since last call
         """
-        new_output, new_position = self.buffer.get_new_output(self.last_read_position)
-        self.last_read_position = new_position
+        if stream is None:
+            new_output, new_position = self.buffer.get_new_output(self.last_read_position)
+            self.last_read_position = new_position
+            return new_output
+
+        new_output, new_position = self.buffer.get_new_output(
+            self.stream_positions.get(stream, 0), stream=stream
+        )
+        self.stream_positions[stream] = new_position
         return new_output
 
+    def _finish_reading(self, timeout: float = 1.0) -> None:
+        """Give the reader threads a moment to drain the pipes of an exited process."""
+        for thread in self.reader_threads:
+            thread.join(timeout)
+        self.buffer.close()
+
     def is_alive(self) -> bool:
         """Check if process is running."""
         return self.process.poll() is None
@@ -177,6 +316,7 @@ class BackgroundProcess:
             # Try SIGTERM first
             self.process.terminate()
             self.process.wait(timeout=timeout)
+            self._finish_reading()
 
             # Get final output
             output = self.get_output(clear=True)
@@ -188,6 +328,7 @@ class BackgroundProcess:
             # Force kill if timeout
             self.process.kill()
             self.process.wait()
+            self._finish_reading()
 
             output = self.get_output(clear=True)
             exit_code = self.process.returncode
@@ -247,6 +388,7 @@ class BackgroundCommandManager:
         verbose: bool = False,
         cwd: Optional[str] = None,
         max_buffer_size: int = 4096,
+        log_file: Optional[str] = None,
     ) -> str:
         """
         Start a command in background.
@@ -256,15 +398,17 @@ class BackgroundCommandManager:
             verbose: Whether to print verbose output
             cwd: Working directory for command
             max_buffer_size: Maximum buffer size for output
+            log_file: Optional file that receives the complete, untruncated output
 
         Returns:
             Command key for future reference
         """
         try:
             # Create output buffer
-            buffer = CircularBuffer(max_size=max_buffer_size)
+            buffer = CircularBuffer(max_size=max_buffer_size, spill_path=log_file)
 
-            # Start process with pipes for output capture
+            # Start process with pipes for output capture. The pipes are read as raw
+            # bytes and decoded incrementally, so partial lines show up right away.
             process = subprocess.Popen(
                 command,
                 shell=True,
@@ -272,9 +416,7 @@ class BackgroundCommandManager:
                 stderr=subprocess.PIPE,
                 stdin=subprocess.DEVNULL,  # No stdin for background commands
                 cwd=cwd,
-                text=True,  # Use text mode for easier handling
-                bufsize=1,  # Line buffered
-                universal_newlines=True,
+                bufsize=0,  # Unbuffered
             )
 
             # Create background process wrapper
@@ -426,5 +568,6 @@ class BackgroundCommandManager:
                     "command": bg_process.command,
                     "running": bg_process.is_alive(),
                     "buffer_size": bg_process.buffer.size(),
+                    "log_file": bg_process.log_path,
                 }
             return result
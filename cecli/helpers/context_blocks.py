@@ -0,0 +1,78 @@
+"""
+Dependency tracked cache of agent context blocks.
+
+Each block is cached together with a signature of the inputs it was generated
+from (file stats, git state, skills directories, ...). A block is only
+regenerated and re-tokenized when its signature changes.
+"""
+
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class BlockStats:
+    """Generation statistics of a single context block."""
+
+    hits: int = 0
+    misses: int = 0
+    tokens: int = 0
+    last_time: float = 0.0
+    total_time: float = 0.0
+
+
+class ContextBlockCache:
+    def __init__(self):
+        self._entries = {}  # block name -> (signature, content, tokens)
+        self.stats = {}  # block name -> BlockStats
+
+    def get(self, name, signature, generate, count_tokens=None):
+        """
+        Return (content, tokens) for block `name`, regenerating it only if needed.
+
+        Args:
+            name: Name of the context block
+            signature: Hashable fingerprint of the block's inputs, or None to always regenerate
+            generate: Callable returning the block content
+            count_tokens: Optional callable returning the token count of the content
+        """
+        stats = self.stats.setdefault(name, BlockStats())
+        entry = self._entries.get(name)
+        if entry is not None and signature is not None and entry[0] == signature:
+            stats.hits += 1
+            return entry[1], entry[2]
+
+        start = time.perf_counter()
+        content = generate()
+        tokens = count_tokens(content) if content and count_tokens else 0
+        elapsed = time.perf_counter() - start
+
+        stats.misses += 1
+        stats.tokens = tokens
+        stats.last_time = elapsed
+        stats.total_time += elapsed
+        self._entries[name] = (signature, content, tokens)
+        return content, tokens
+
+    def invalidate(self, name=None):
+        """Drop the cached content of block `name`, or of all blocks."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def format_report(self):
+        """Return a table of per-block cache hits, misses, tokens and generation times."""
+        if not self.stats:
+            return "No context blocks have been generated yet."
+
+        lines = [
+            f"{'Block':<22} {'Hits':>6} {'Misses':>7} {'Tokens':>8} {'Last ms':>9} {'Total ms':>9}"
+        ]
+        for name in sorted(self.stats):
+            stats = self.stats[name]
+            lines.append(
+                f"{name:<22} {stats.hits:>6} {stats.misses:>7} {stats.tokens:>8,}"
+                f" {stats.last_time * 1000:>9.1f} {stats.total_time * 1000:>9.1f}"
+            )
+        return "\n".join(lines)
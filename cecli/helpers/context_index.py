@@ -0,0 +1,103 @@
+"""
+Line hash index for locating patch context in a file.
+
+The lines of a file are hashed once per normalization (exact, rstripped and
+stripped), mapping each normalized line to the positions it occurs at. Finding a
+block of context lines becomes a probe for its rarest line followed by a check of
+the remaining lines against the already normalized file, instead of a rescan of
+the whole file that re-normalizes every line.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+
+EXACT = "exact"
+RSTRIP = "rstrip"
+STRIP = "strip"
+
+_NORMALIZERS = {
+    EXACT: None,
+    RSTRIP: str.rstrip,
+    STRIP: str.strip,
+}
+
+
+class ContextIndex:
+    def __init__(self, lines):
+        self.lines = lines
+        self._normalized = {}  # level -> normalized lines
+        self._positions = {}  # level -> {normalized line: [positions]}
+        self._nonblank = None  # (stripped non-blank lines, positions) used by could_contain
+
+    def _level(self, level):
+        if level not in self._positions:
+            normalize = _NORMALIZERS[level]
+            normalized = self.lines if normalize is None else [normalize(s) for s in self.lines]
+            positions = defaultdict(list)
+            for i, line in enumerate(normalized):
+                positions[line].append(i)
+            self._normalized[level] = normalized
+            self._positions[level] = positions
+        return self._normalized[level], self._positions[level]
+
+    def find(self, context, start=0, level=EXACT):
+        """
+        Return the first index >= `start` where `context` matches the file, or -1.
+
+        Lines are compared after the `level` normalization of both sides.
+        """
+        if not context:
+            return start
+
+        normalized, positions = self._level(level)
+        normalize = _NORMALIZERS[level]
+        if normalize is not None:
+            context = [normalize(s) for s in context]
+
+        # Probe the rarest context line, every occurrence implies a candidate start
+        offset = min(range(len(context)), key=lambda j: len(positions.get(context[j], ())))
+        hits = positions.get(context[offset], [])
+        last_start = len(normalized) - len(context)
+
+        for pos in hits[bisect_left(hits, start + offset) :]:
+            i = pos - offset
+            if i > last_start:
+                break
+            if normalized[i : i + len(context)] == context:
+                return i
+        return -1
+
+    def could_contain(self, text):
+        """
+        Quick check whether `text` could occur in the file, allowing for different
+        indentation and leading or trailing blank lines.
+
+        Returns False only if no such match is possible. The non-blank lines of `text`
+        must appear in the file in a row, except that the first one may be the end of
+        a line and the last one the start of a line.
+        """
+        lines = [line.strip() for line in text.splitlines()]
+        lines = [line for line in lines if line]
+        if len(lines) < 3:
+            return True
+
+        if self._nonblank is None:
+            stripped = [line.strip() for line in self.lines]
+            nonblank = [line for line in stripped if line]
+            self._nonblank = ContextIndex(nonblank)
+        nonblank = self._nonblank
+
+        first, middle, last = lines[0], lines[1:-1], lines[-1]
+        start = 1
+        while True:
+            i = nonblank.find(middle, start)
+            if i == -1:
+                return False
+            end = i + len(middle)
+            if (
+                end < len(nonblank.lines)
+                and nonblank.lines[i - 1].endswith(first)
+                and nonblank.lines[end].startswith(last)
+            ):
+                return True
+            start = i + 1
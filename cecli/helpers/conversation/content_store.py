@@ -0,0 +1,186 @@
+import os
+import tempfile
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import xxhash
+
+# Uncompressed content kept in memory before the least recently used entries are compressed
+MAX_HOT_BYTES = 32 * 1024 * 1024
+# Compressed content kept in memory before the least recently used entries are spilled to disk
+MAX_COLD_BYTES = 64 * 1024 * 1024
+
+
+class _Entry:
+    __slots__ = ("refs", "size", "content", "compressed", "spilled")
+
+    def __init__(self, content: str):
+        self.refs = 0
+        self.size = len(content)
+        self.content: Optional[str] = content
+        self.compressed: Optional[bytes] = None
+        self.spilled = False  # Compressed content is in the spill directory
+
+
+class ContentStore:
+    """
+    Reference counted store of file contents keyed by content hash.
+
+    Identical contents are stored once, however many files or snapshots refer
+    to them. Once the uncompressed entries exceed max_hot_bytes, the least
+    recently used ones are zlib compressed until they are read again. Once the
+    compressed entries exceed max_cold_bytes, the least recently used of those
+    are written to a temporary directory, so memory stays bounded however many
+    files are tracked. Every entry is still referenced, so nothing is dropped.
+    """
+
+    def __init__(
+        self,
+        max_hot_bytes: int = MAX_HOT_BYTES,
+        compress: bool = True,
+        max_cold_bytes: Optional[int] = MAX_COLD_BYTES,
+    ):
+        self.max_hot_bytes = max_hot_bytes
+        self.max_cold_bytes = max_cold_bytes
+        self.compress = compress
+        self._entries: Dict[str, _Entry] = {}
+        self._hot: "OrderedDict[str, None]" = OrderedDict()  # Uncompressed entries, LRU first
+        self._cold: "OrderedDict[str, None]" = OrderedDict()  # Compressed in memory, LRU first
+        self.hot_bytes = 0
+        self.cold_bytes = 0
+        self._spill_dir = None
+
+    @staticmethod
+    def digest(content: str) -> str:
+        return xxhash.xxh3_128_hexdigest(content.encode("utf-8", "surrogatepass"))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._entries
+
+    def put(self, content: str, digest: Optional[str] = None) -> str:
+        """Add a reference to `content` and return its digest."""
+        if digest is None:
+            digest = self.digest(content)
+
+        entry = self._entries.get(digest)
+        if entry is None:
+            entry = self._entries[digest] = _Entry(content)
+            self._make_hot(digest, entry)
+        entry.refs += 1
+        return digest
+
+    def retain(self, digest: str) -> str:
+        """Add a reference to content already in the store."""
+        self._entries[digest].refs += 1
+        return digest
+
+    def get(self, digest: str) -> str:
+        entry = self._entries[digest]
+        if entry.content is None:
+            if entry.spilled:
+                compressed = self._unspill(digest, entry)
+            else:
+                compressed = entry.compressed
+                self._drop_cold(digest, entry)
+            entry.content = zlib.decompress(compressed).decode("utf-8", "surrogatepass")
+            self._make_hot(digest, entry)
+        else:
+            self._hot.move_to_end(digest)
+        return entry.content
+
+    def release(self, digest: Optional[str]) -> None:
+        """Drop a reference, removing the content once nothing refers to it."""
+        entry = self._entries.get(digest)
+        if entry is None:
+            return
+        entry.refs -= 1
+        if entry.refs > 0:
+            return
+
+        del self._entries[digest]
+        if entry.content is not None:
+            del self._hot[digest]
+            self.hot_bytes -= entry.size
+        elif entry.spilled:
+            try:
+                os.remove(self._spill_path(digest))
+            except OSError:
+                pass
+        else:
+            self._drop_cold(digest, entry)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._hot.clear()
+        self._cold.clear()
+        self.hot_bytes = 0
+        self.cold_bytes = 0
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hot_bytes": self.hot_bytes,
+            "cold_entries": len(self._cold),
+            "cold_bytes": self.cold_bytes,
+            "spilled_entries": sum(entry.spilled for entry in self._entries.values()),
+        }
+
+    def _make_hot(self, digest: str, entry: _Entry) -> None:
+        self._hot[digest] = None
+        self.hot_bytes += entry.size
+        if not self.compress:
+            return
+
+        # Compress the coldest entries, but never the one just used
+        while self.hot_bytes > self.max_hot_bytes and len(self._hot) > 1:
+            cold_digest, _ = self._hot.popitem(last=False)
+            cold = self._entries[cold_digest]
+            cold.compressed = zlib.compress(cold.content.encode("utf-8", "surrogatepass"), 1)
+            cold.content = None
+            self.hot_bytes -= cold.size
+            self._cold[cold_digest] = None
+            self.cold_bytes += len(cold.compressed)
+
+        if self.max_cold_bytes is None:
+            return
+        while self.cold_bytes > self.max_cold_bytes and self._cold:
+            cold_digest = next(iter(self._cold))
+            if not self._spill(cold_digest, self._entries[cold_digest]):
+                break
+
+    def _drop_cold(self, digest: str, entry: _Entry) -> None:
+        del self._cold[digest]
+        self.cold_bytes -= len(entry.compressed)
+        entry.compressed = None
+
+    def _spill_path(self, digest: str) -> str:
+        return os.path.join(self._spill_dir.name, digest)
+
+    def _spill(self, digest: str, entry: _Entry) -> bool:
+        """Move an entry's compressed content to disk, False if it can't be written."""
+        try:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.TemporaryDirectory(prefix="cecli-content-")
+            with open(self._spill_path(digest), "wb") as f:
+                f.write(entry.compressed)
+        except OSError:
+            return False
+        self._drop_cold(digest, entry)
+        entry.spilled = True
+        return True
+
+    def _unspill(self, digest: str, entry: _Entry) -> bytes:
+        """Read back and delete an entry's spilled content."""
+        path = self._spill_path(digest)
+        with open(path, "rb") as f:
+            compressed = f.read()
+        os.remove(path)
+        entry.spilled = False
+        return compressed
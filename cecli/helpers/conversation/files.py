@@ -1,10 +1,13 @@
-import difflib
 import os
+import time
 import weakref
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
+from cecli.diffs import unified_diff
+from cecli.helpers.file_events import file_events
 from cecli.repomap import RepoMap
 
+from .content_store import ContentStore
 from .manager import ConversationManager
 from .tags import MessageTag
 
@@ -18,13 +21,20 @@ class ConversationFiles:
     """
 
     # Class-level storage for singleton pattern
+    # File contents live in the store, the per-file dicts hold their digests
+    _store = ContentStore()
     _file_contents_original: Dict[str, str] = {}
     _file_contents_snapshot: Dict[str, str] = {}
-    _file_timestamps: Dict[str, float] = {}
+    # (size, mtime_ns) of the file when its snapshot was taken, None if it didn't exist
+    _file_stats: Dict[str, Optional[Tuple[int, int]]] = {}
     _file_diffs: Dict[str, str] = {}
+    # Characters of diff messages added since each file's content was last read
+    _diff_chain_sizes: Dict[str, int] = {}
     _file_to_message_id: Dict[str, str] = {}
     # Track image files separately since they don't have text content
     _image_files: Dict[str, bool] = {}
+    # Lets has_file_changed() skip the stat while the file watcher covers a file
+    _file_events = file_events.subscribe()
     _coder_ref = None
     _initialized = False
 
@@ -61,9 +71,10 @@ class ConversationFiles:
         abs_fname = os.path.abspath(fname)
 
         # Check if we need to refresh
-        current_mtime = os.path.getmtime(abs_fname) if os.path.exists(abs_fname) else 0
-
         if force_refresh or abs_fname not in cls._file_contents_original:
+            cls._file_events.validate(abs_fname)
+            current_stat = cls._stat(abs_fname)
+
             # Read content from disk if not provided
             if content is None:
                 # Use coder.io.read_text() - coder should always be available
@@ -78,14 +89,16 @@ class ConversationFiles:
                     content = ""  # Empty content for unreadable files
 
             # Update cache
-            cls._file_contents_original[abs_fname] = content
-            cls._file_contents_snapshot[abs_fname] = content
-            cls._file_timestamps[abs_fname] = current_mtime
+            digest = cls._store.put(content)
+            cls._set_digest(cls._file_contents_original, abs_fname, digest)
+            cls._set_digest(cls._file_contents_snapshot, abs_fname, cls._store.retain(digest))
+            cls._file_stats[abs_fname] = current_stat
 
             # Clear previous diff
             cls._file_diffs.pop(abs_fname, None)
+            cls._diff_chain_sizes.pop(abs_fname, None)
 
-        return cls._file_contents_original.get(abs_fname, "")
+        return cls._store.get(cls._file_contents_original[abs_fname])
 
     @classmethod
     def get_file_content(
@@ -117,9 +130,10 @@ class ConversationFiles:
             cls.add_file(fname)
 
         # Get content from cache
-        content = cls._file_contents_original.get(abs_fname)
-        if content is None:
+        digest = cls._file_contents_original.get(abs_fname)
+        if digest is None:
             return None
+        content = cls._store.get(digest)
 
         # If not generating stub, return full content
         if not generate_stub:
@@ -143,7 +157,11 @@ class ConversationFiles:
     @classmethod
     def has_file_changed(cls, fname: str) -> bool:
         """
-        Check if file has been modified since last cache.
+        Check if file has been modified since its last snapshot.
+
+        An unchanged (size, mtime_ns) means unchanged. A file whose mtime moved
+        without a size change is read and compared by content hash, so touching
+        a file doesn't count as a change.
 
         Args:
             fname: Absolute file path
@@ -156,13 +174,28 @@ class ConversationFiles:
         if abs_fname not in cls._file_contents_original:
             return True
 
-        if not os.path.exists(abs_fname):
+        if cls._file_events.is_fresh(abs_fname):
+            return False
+
+        cls._file_events.validate(abs_fname)
+        current_stat = cls._stat(abs_fname)
+        if current_stat is None:
+            cls._file_events.forget(abs_fname)
             return True
 
-        current_mtime = os.path.getmtime(abs_fname)
-        cached_mtime = cls._file_timestamps.get(abs_fname, 0)
+        cached_stat = cls._file_stats.get(abs_fname)
+        if current_stat == cached_stat:
+            return False
+
+        if cached_stat is not None and current_stat[0] == cached_stat[0]:
+            content = cls._read(abs_fname)
+            snapshot_digest = cls._file_contents_snapshot.get(abs_fname)
+            if content is not None and ContentStore.digest(content) == snapshot_digest:
+                cls._file_stats[abs_fname] = current_stat
+                return False
 
-        return current_mtime > cached_mtime
+        cls._file_events.forget(abs_fname)
+        return True
 
     @classmethod
     def generate_diff(cls, fname: str) -> Optional[str]:
@@ -179,37 +212,40 @@ class ConversationFiles:
         if abs_fname not in cls._file_contents_original:
             return None
 
-        # Read current content using coder.io.read_text()
-        coder = cls.get_coder()
-        try:
-            current_content = coder.io.read_text(abs_fname)
-        except Exception:
-            return None
+        # Read current content, stat first so a write during the read is seen next time
+        current_stat = cls._stat(abs_fname)
+        current_content = cls._read(abs_fname)
 
         # Check if current_content is None (file doesn't exist or can't be read)
         if current_content is None:
             return None
 
         # Get the last snapshot (use file cache as fallback for backward compatibility)
-        snapshot_content = cls._file_contents_snapshot.get(
+        snapshot_digest = cls._file_contents_snapshot.get(
             abs_fname, cls._file_contents_original[abs_fname]
         )
+        current_digest = ContentStore.digest(current_content)
+        cls._file_stats[abs_fname] = current_stat
+        if current_digest == snapshot_digest:
+            return None
 
         # Generate diff between snapshot and current content
-        diff_lines = difflib.unified_diff(
-            snapshot_content.splitlines(),
+        diff_lines = unified_diff(
+            cls._store.get(snapshot_digest).splitlines(),
             current_content.splitlines(),
             fromfile=f"{abs_fname} (snapshot)",
             tofile=f"{abs_fname} (current)",
-            lineterm="",
             n=3,
         )
 
-        diff_text = "\n".join([line for line in list(diff_lines)])
+        diff_text = "\n".join(diff_lines)
 
-        # If there's a diff, update the last snapshot with current content
-        if diff_text.strip():
-            cls._file_contents_snapshot[abs_fname] = current_content
+        # Move the snapshot to the current content
+        cls._set_digest(
+            cls._file_contents_snapshot,
+            abs_fname,
+            cls._store.put(current_content, current_digest),
+        )
 
         return diff_text if diff_text.strip() else None
 
@@ -250,10 +286,31 @@ class ConversationFiles:
             ConversationManager.add_message(
                 message_dict=diff_message,
                 tag=tag,
+                hash_key=("file_diff", abs_fname, str(time.monotonic_ns())),
+            )
+            cls._diff_chain_sizes[abs_fname] = cls._diff_chain_sizes.get(abs_fname, 0) + len(
+                diff_message["content"]
             )
 
         return diff
 
+    @classmethod
+    def diffs_outweigh_content(cls, fname: str) -> bool:
+        """
+        Check if the diffs added for a file are larger than its content.
+
+        Args:
+            fname: Absolute file path
+
+        Returns:
+            True if re-sending the file would take less context than its diffs
+        """
+        abs_fname = os.path.abspath(fname)
+        digest = cls._file_contents_original.get(abs_fname)
+        if digest is None:
+            return False
+        return cls._diff_chain_sizes.get(abs_fname, 0) > len(cls._store.get(digest))
+
     @classmethod
     def get_file_stub(cls, fname: str) -> str:
         """
@@ -295,19 +352,24 @@ class ConversationFiles:
             fname: Optional specific file to clear (None = clear all)
         """
         if fname is None:
+            cls._store.clear()
             cls._file_contents_original.clear()
             cls._file_contents_snapshot.clear()
-            cls._file_timestamps.clear()
+            cls._file_stats.clear()
             cls._file_diffs.clear()
+            cls._diff_chain_sizes.clear()
             cls._file_to_message_id.clear()
+            cls._file_events.forget()
         else:
             abs_fname = os.path.abspath(fname)
-            cls._file_contents_original.pop(abs_fname, None)
-            cls._file_contents_snapshot.pop(abs_fname, None)
-            cls._file_timestamps.pop(abs_fname, None)
+            cls._store.release(cls._file_contents_original.pop(abs_fname, None))
+            cls._store.release(cls._file_contents_snapshot.pop(abs_fname, None))
+            cls._file_stats.pop(abs_fname, None)
             cls._file_diffs.pop(abs_fname, None)
+            cls._diff_chain_sizes.pop(abs_fname, None)
             cls._file_to_message_id.pop(abs_fname, None)
             cls._image_files.pop(abs_fname, None)
+            cls._file_events.forget(abs_fname)
 
     @classmethod
     def add_image_file(cls, fname: str) -> None:
@@ -343,6 +405,29 @@ class ConversationFiles:
         image_files = set(cls._image_files.keys())
         return regular_files.union(image_files)
 
+    @classmethod
+    def _set_digest(cls, digests: Dict[str, str], abs_fname: str, digest: str) -> None:
+        """Point `abs_fname` at `digest`, releasing the content it pointed at before."""
+        cls._store.release(digests.get(abs_fname))
+        digests[abs_fname] = digest
+
+    @staticmethod
+    def _stat(abs_fname: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(abs_fname)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    @classmethod
+    def _read(cls, abs_fname: str) -> Optional[str]:
+        # Use coder.io.read_text() - coder should always be available
+        coder = cls.get_coder()
+        try:
+            return coder.io.read_text(abs_fname)
+        except Exception:
+            return None
+
     @classmethod
     def get_coder(cls):
         """Get current coder instance via weak reference."""
@@ -362,15 +447,17 @@ class ConversationFiles:
     def debug_print_cache(cls) -> None:
         """Print file cache contents and modification status."""
         print(f"File Cache ({len(cls._file_contents_original)} files):")
-        for fname, content in cls._file_contents_original.items():
-            mtime = cls._file_timestamps.get(fname, 0)
+        for fname, digest in cls._file_contents_original.items():
+            content = cls._store.get(digest)
+            stat = cls._file_stats.get(fname)
+            mtime = stat[1] / 1e9 if stat else 0
             has_changed = cls.has_file_changed(fname)
             status = "CHANGED" if has_changed else "CACHED"
             line_count = len(content.splitlines())
 
             # Check if snapshot differs from cache
-            snapshot_content = cls._file_contents_snapshot.get(fname)
-            snapshot_differs = snapshot_content != content if snapshot_content else False
+            snapshot_digest = cls._file_contents_snapshot.get(fname)
+            snapshot_differs = snapshot_digest != digest if snapshot_digest else False
             snapshot_status = "DIFFERS" if snapshot_differs else "SAME"
 
             print(
@@ -383,16 +470,17 @@ class ConversationFiles:
         """Return dict with cache size, file count, and diff count."""
         # Count how many snapshots differ from their original cache
         snapshot_diff_count = 0
-        for fname, cached_content in cls._file_contents_original.items():
-            snapshot_content = cls._file_contents_snapshot.get(fname)
-            if snapshot_content and snapshot_content != cached_content:
+        for fname, cached_digest in cls._file_contents_original.items():
+            snapshot_digest = cls._file_contents_snapshot.get(fname)
+            if snapshot_digest and snapshot_digest != cached_digest:
                 snapshot_diff_count += 1
 
         return {
             "cache_size": len(cls._file_contents_original),
             "snapshot_size": len(cls._file_contents_snapshot),
             "snapshot_diff_count": snapshot_diff_count,
-            "file_count": len(cls._file_timestamps),
+            "file_count": len(cls._file_stats),
             "diff_count": len(cls._file_diffs),
             "message_mappings": len(cls._file_to_message_id),
+            "store": cls._store.stats(),
         }
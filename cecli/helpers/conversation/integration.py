@@ -368,6 +368,7 @@ class ConversationChunks:
             # Check if file has changed and add diff message if needed
             if ConversationFiles.has_file_changed(fname):
                 ConversationFiles.update_file_diff(fname)
+            refreshed = cls.refresh_superseded_file(coder, fname)
 
             # Get file content (with proper caching and stub generation)
             content = ConversationFiles.get_file_stub(fname)
@@ -381,6 +382,7 @@ class ConversationChunks:
                     message_dict=user_msg,
                     tag=MessageTag.READONLY_FILES,
                     hash_key=("file_user", fname),  # Use file path as part of hash_key
+                    force=refreshed,
                 )
                 messages.append(user_msg)
 
@@ -393,6 +395,7 @@ class ConversationChunks:
                     message_dict=assistant_msg,
                     tag=MessageTag.READONLY_FILES,
                     hash_key=("file_assistant", fname),  # Use file path as part of hash_key
+                    force=refreshed,
                 )
                 messages.append(assistant_msg)
 
@@ -428,6 +431,29 @@ class ConversationChunks:
 
         return messages
 
+    @classmethod
+    def refresh_superseded_file(cls, coder, fname) -> bool:
+        """
+        Re-read a file whose diffs have grown larger than its content.
+
+        The file's messages are then re-added with force=True, which moves them
+        after its diffs so ConversationManager can elide those.
+
+        Args:
+            coder: The coder instance
+            fname: Absolute file path
+
+        Returns:
+            True if the file was re-read
+        """
+        if not getattr(coder, "elide_superseded_files", False):
+            return False
+        if not ConversationFiles.diffs_outweigh_content(fname):
+            return False
+
+        ConversationFiles.add_file(fname, force_refresh=True)
+        return True
+
     @classmethod
     def add_chat_files_messages(cls, coder) -> Dict[str, Any]:
         """
@@ -463,6 +489,7 @@ class ConversationChunks:
             # Check if file has changed and add diff message if needed
             if ConversationFiles.has_file_changed(fname):
                 ConversationFiles.update_file_diff(fname)
+            refreshed = cls.refresh_superseded_file(coder, fname)
 
             # Get file content (with proper caching and stub generation)
             content = ConversationFiles.get_file_stub(fname)
@@ -490,6 +517,7 @@ class ConversationChunks:
                 message_dict=user_msg,
                 tag=tag,
                 hash_key=("file_user", fname),  # Use file path as part of hash_key
+                force=refreshed,
             )
 
             # Add assistant message to ConversationManager with file path as hash_key
@@ -497,6 +525,7 @@ class ConversationChunks:
                 message_dict=assistant_msg,
                 tag=tag,
                 hash_key=("file_assistant", fname),  # Use file path as part of hash_key
+                force=refreshed,
             )
 
         # Handle image files using coder.get_images_message()
@@ -32,6 +32,13 @@ class ConversationManager:
     _tag_cache: Dict[str, List[Dict[str, Any]]] = {}
     _ALL_MESSAGES_CACHE_KEY = "__all__"  # Special key for caching all messages (tag=None)
 
+    # Objects told about every message change, e.g. session journals
+    _observers = weakref.WeakSet()
+
+    # File diffs left out of the cached full message stream, see _elide_superseded_diffs()
+    _elided_messages: List[BaseMessage] = []
+    _elided_tokens: Dict[str, int] = {}
+
     @classmethod
     def initialize(
         cls,
@@ -88,6 +95,7 @@ class ConversationManager:
                     priority=msg.priority,
                     timestamp=time.monotonic_ns(),  # Updated timestamp
                     mark_for_delete=msg.mark_for_delete,
+                    hash_key=msg.hash_key,
                     force=True,
                 )
 
@@ -109,6 +117,26 @@ class ConversationManager:
         else:
             print("[DEBUG] ConversationManager debug mode disabled")
 
+    @classmethod
+    def add_observer(cls, observer) -> None:
+        """
+        Call observer.conversation_changed(event, message) on every message change.
+
+        The event is "add" for a new or force-updated message, "remove" for a
+        removed one and "reset" (with message None) when everything is cleared.
+        Observers are held by weak reference.
+        """
+        cls._observers.add(observer)
+
+    @classmethod
+    def remove_observer(cls, observer) -> None:
+        cls._observers.discard(observer)
+
+    @classmethod
+    def _notify(cls, event: str, message: Optional[BaseMessage] = None) -> None:
+        for observer in list(cls._observers):
+            observer.conversation_changed(event, message)
+
     @classmethod
     def add_message(
         cls,
@@ -174,6 +202,7 @@ class ConversationManager:
                 # Clear cache for this tag and all messages cache since message was updated
                 cls._tag_cache.pop(tag.value, None)
                 cls._tag_cache.pop(cls._ALL_MESSAGES_CACHE_KEY, None)
+                cls._notify("add", existing_message)
                 return existing_message
             else:
                 # Return existing message without updating
@@ -185,6 +214,7 @@ class ConversationManager:
             # Clear cache for this tag and all messages cache since new message was added
             cls._tag_cache.pop(tag.value, None)
             cls._tag_cache.pop(cls._ALL_MESSAGES_CACHE_KEY, None)
+            cls._notify("add", message)
             return message
 
     @classmethod
@@ -241,6 +271,13 @@ class ConversationManager:
 
         messages = cls.get_messages()
 
+        elided = []
+        if getattr(coder, "elide_superseded_files", False):
+            messages, elided = cls._elide_superseded_diffs(messages)
+        if tag is None:
+            # Kept along with the cached full stream, tag filtered views don't count
+            cls._elided_messages = elided
+
         # Filter by tag if specified
         if tag is not None:
             if not isinstance(tag, MessageTag):
@@ -301,6 +338,64 @@ class ConversationManager:
 
         return messages_dict
 
+    @classmethod
+    def _elide_superseded_diffs(
+        cls, messages: List[BaseMessage]
+    ) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+        """
+        Leave out "File ... has changed" diffs that are older than their file's content.
+
+        A file's content message is re-added after its diffs once they outweigh it
+        (or when the file is dropped and added again), so by then it already shows
+        every change those diffs describe. Content messages only ever move later,
+        so a diff left out once stays left out, and the prompt prefix before the
+        re-added file stays the same from one request to the next.
+
+        Args:
+            messages: Messages in stream order
+
+        Returns:
+            The messages without superseded diffs, and the superseded diffs
+        """
+        content_timestamps = {}
+        for msg in messages:
+            if msg.hash_key and msg.hash_key[0] == "file_user":
+                content_timestamps[msg.hash_key[1]] = msg.timestamp
+
+        kept = []
+        elided = []
+        for msg in messages:
+            if (
+                msg.hash_key
+                and msg.hash_key[0] == "file_diff"
+                and msg.timestamp < content_timestamps.get(msg.hash_key[1], -1)
+            ):
+                elided.append(msg)
+            else:
+                kept.append(msg)
+
+        return kept, elided
+
+    @classmethod
+    def get_elision_stats(cls) -> Dict[str, int]:
+        """
+        Report the superseded file diffs left out of the full message stream.
+
+        Returns:
+            Dictionary with the number of elided messages and the tokens they would take
+        """
+        if cls._ALL_MESSAGES_CACHE_KEY not in cls._tag_cache:
+            cls.get_messages_dict()
+
+        coder = cls.get_coder()
+        tokens = 0
+        for msg in cls._elided_messages:
+            if msg.message_id not in cls._elided_tokens:
+                cls._elided_tokens[msg.message_id] = coder.main_model.token_count([msg.to_dict()])
+            tokens += cls._elided_tokens[msg.message_id]
+
+        return {"messages": len(cls._elided_messages), "tokens": tokens}
+
     @classmethod
     def clear_tag(cls, tag: str) -> None:
         """Remove all messages with given tag."""
@@ -320,6 +415,7 @@ class ConversationManager:
         for message in messages_to_remove:
             cls._messages.remove(message)
             del cls._message_index[message.message_id]
+            cls._notify("remove", message)
 
         # Clear cache for this tag and all messages cache since messages were removed
         if messages_to_remove:
@@ -347,6 +443,7 @@ class ConversationManager:
             cls._messages.remove(message)
             del cls._message_index[message.message_id]
             tags_to_clear.add(message.tag)
+            cls._notify("remove", message)
 
         # Clear cache for affected tags and all messages cache if any messages were removed
         if messages_to_remove:
@@ -372,6 +469,7 @@ class ConversationManager:
                 # Clear cache for this tag and all messages cache since message was removed
                 cls._tag_cache.pop(message.tag, None)
                 cls._tag_cache.pop(cls._ALL_MESSAGES_CACHE_KEY, None)
+                cls._notify("remove", message)
                 return True
         return False
 
@@ -405,6 +503,7 @@ class ConversationManager:
             cls._messages.remove(message)
             del cls._message_index[message.message_id]
             tags_to_clear.add(message.tag)
+            cls._notify("remove", message)
 
         # Clear cache for affected tags and all messages cache if any messages were removed
         if messages_to_remove:
@@ -427,6 +526,9 @@ class ConversationManager:
         cls._coder_ref = None
         cls._initialized = False
         cls._tag_cache.clear()
+        cls._elided_messages = []
+        cls._elided_tokens.clear()
+        cls._notify("reset")
 
     @classmethod
     def clear_cache(cls) -> None:
@@ -445,6 +547,7 @@ class ConversationManager:
         for message in messages_to_remove:
             cls._messages.remove(message)
             del cls._message_index[message.message_id]
+            cls._notify("remove", message)
 
     # Debug methods
     @classmethod
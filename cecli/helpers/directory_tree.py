@@ -0,0 +1,168 @@
+"""
+Incrementally maintained tree of project paths for the directory structure context block.
+
+The tree is updated with add/remove events instead of being rebuilt, keeps a
+recursive file count per directory, and renders within a depth and token budget
+by collapsing the directories it cannot afford to expand into file counts.
+"""
+
+from collections import deque
+
+# Rough number of characters per token used to estimate the size of the rendering
+CHARS_PER_TOKEN = 4
+
+
+class _Node:
+    __slots__ = ("dirs", "files", "count")
+
+    def __init__(self):
+        self.dirs = {}
+        self.files = set()
+        self.count = 0  # Number of files in this directory and below
+
+
+class DirectoryTree:
+    def __init__(self):
+        self.root = _Node()
+        self.paths = set()
+        self.version = 0
+        self._render_cache = {}
+
+    @staticmethod
+    def _split(path):
+        return [part for part in path.replace("\\", "/").split("/") if part]
+
+    def add(self, path):
+        """Add a file path; a path ending in '/' adds an (empty) directory."""
+        if path in self.paths:
+            return False
+        parts = self._split(path)
+        if not parts:
+            return False
+
+        is_dir = path.endswith("/")
+        dir_parts = parts if is_dir else parts[:-1]
+        nodes = [self.root]
+        for part in dir_parts:
+            nodes.append(nodes[-1].dirs.setdefault(part, _Node()))
+        if not is_dir:
+            nodes[-1].files.add(parts[-1])
+            for node in nodes:
+                node.count += 1
+
+        self.paths.add(path)
+        self.version += 1
+        return True
+
+    def remove(self, path):
+        """Remove a path, pruning directories left empty."""
+        if path not in self.paths:
+            return False
+        self.paths.discard(path)
+        self.version += 1
+
+        parts = self._split(path)
+        is_dir = path.endswith("/")
+        dir_parts = parts if is_dir else parts[:-1]
+        nodes = [self.root]
+        for part in dir_parts:
+            node = nodes[-1].dirs.get(part)
+            if node is None:
+                return True
+            nodes.append(node)
+
+        if not is_dir and parts[-1] in nodes[-1].files:
+            nodes[-1].files.discard(parts[-1])
+            for node in nodes:
+                node.count -= 1
+
+        # Prune empty directories bottom up, unless still listed as a path themselves
+        for depth in range(len(dir_parts), 0, -1):
+            node = nodes[depth]
+            dir_path = "/".join(dir_parts[:depth]) + "/"
+            if node.files or node.dirs or dir_path in self.paths:
+                break
+            del nodes[depth - 1].dirs[dir_parts[depth - 1]]
+        return True
+
+    def remove_dir(self, path):
+        """Remove every path below the directory `path`."""
+        prefix = path.rstrip("/") + "/"
+        removed = [p for p in self.paths if p.startswith(prefix)]
+        for p in removed:
+            self.remove(p)
+        return bool(removed)
+
+    def update(self, paths):
+        """Apply the add/remove events that turn the tree into `paths`."""
+        paths = set(paths)
+        for path in self.paths - paths:
+            self.remove(path)
+        for path in paths - self.paths:
+            self.add(path)
+
+    @staticmethod
+    def _children_cost(node, indent_width):
+        # Characters needed to list the direct children of a node
+        prefix = indent_width + 3  # indent, "- " and newline
+        cost = sum(prefix + len(name) + 1 for name in node.dirs)
+        cost += sum(prefix + len(name) for name in node.files)
+        return cost
+
+    def render(self, max_depth=None, max_tokens=None):
+        """
+        Render the tree as a markdown list, directories first.
+
+        Directories are expanded breadth first while the output stays within
+        `max_tokens` (estimated) and `max_depth`; the rest are shown collapsed
+        with their file count.
+        """
+        key = (self.version, max_depth, max_tokens)
+        if key in self._render_cache:
+            return self._render_cache[key]
+
+        budget = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+        expanded = {id(self.root)}
+        used = self._children_cost(self.root, 0)
+
+        queue = deque((child, 1) for _, child in sorted(self.root.dirs.items()))
+        while queue:
+            node, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            cost = self._children_cost(node, depth * 2)
+            if budget is not None and used + cost > budget:
+                continue
+            expanded.add(id(node))
+            used += cost
+            queue.extend((child, depth + 1) for _, child in sorted(node.dirs.items()))
+
+        lines = []
+        self._render_node(self.root, "", expanded, lines, budget)
+        result = "\n".join(lines)
+
+        self._render_cache = {key: result}
+        return result
+
+    def _render_node(self, node, indent, expanded, lines, budget):
+        for name, child in sorted(node.dirs.items()):
+            if id(child) in expanded:
+                lines.append(f"{indent}- {name}/")
+                self._render_node(child, indent + "  ", expanded, lines, budget)
+            else:
+                plural = "" if child.count == 1 else "s"
+                lines.append(f"{indent}- {name}/ ({child.count:,} file{plural})")
+
+        files = sorted(node.files)
+        if node is self.root and budget is not None:
+            # The top level is always shown, but a huge one is cut short
+            remaining = budget - sum(len(line) + 1 for line in lines)
+            for i, file_name in enumerate(files):
+                remaining -= len(file_name) + 3
+                if remaining < 0:
+                    lines.append(f"- ... ({len(files) - i:,} more files)")
+                    return
+                lines.append(f"- {file_name}")
+            return
+
+        lines.extend(f"{indent}- {file_name}" for file_name in files)
@@ -0,0 +1,148 @@
+"""
+Invalidation bus for caches of file derived data.
+
+The file watcher publishes the paths it sees being added, modified or deleted,
+and caches subscribe to the paths they care about. While the watcher covers a
+path, a cache entry that was validated and has seen no event since is known to
+be current, so the cache can skip re-stat'ing the file.
+
+Nothing is trusted while no watcher is attached. Attaching or detaching a
+watcher starts a new epoch, which drops every validation made before it, so
+caches fall back to their own mtime polling whenever coverage had a gap.
+
+The watcher debounces its events, so a change can go unreported for a moment.
+Shell commands and each new turn start a new epoch too, through invalidate(), so
+changes made just before them are picked up by a re-stat.
+"""
+
+import os
+import threading
+import weakref
+
+ADDED = "added"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+
+class Subscription:
+    """A cache's view of the bus: validated paths plus a counter of events seen."""
+
+    def __init__(self, bus, root=None, match=None, callback=None):
+        self.bus = bus
+        self.root = os.path.abspath(root) if root else None
+        self.match = match
+        self.callback = callback
+        self.generation = 0  # Bumped for every matching event
+        self._validated = {}  # path -> bus epoch it was last validated in
+
+    def matches(self, path):
+        if self.root and path != self.root and not path.startswith(self.root + os.sep):
+            return False
+        return self.match is None or self.match(path)
+
+    def covers(self, path):
+        """True if changes to `path` are reported to this subscription."""
+        path = os.path.abspath(path)
+        return self.matches(path) and self.bus.covers(path)
+
+    def validate(self, path):
+        """
+        Record that the caller is about to (re)read `path` from disk.
+
+        Call this before the read, so an event arriving during the read still
+        invalidates the entry.
+        """
+        self._validated[os.path.abspath(path)] = self.bus.epoch
+
+    def is_fresh(self, path):
+        """True if `path` was validated in this epoch, is covered and has not changed since."""
+        path = os.path.abspath(path)
+        return self._validated.get(path) == self.bus.epoch and self.covers(path)
+
+    def forget(self, path=None):
+        if path is None:
+            self._validated.clear()
+        else:
+            self._validated.pop(os.path.abspath(path), None)
+
+    def signature(self):
+        """Fingerprint of everything this subscription has seen, for signature based caches."""
+        return (self.bus.epoch, self.generation)
+
+    def _notify(self, change, path):
+        if not self.matches(path):
+            return False
+        self.generation += 1
+        self._validated.pop(path, None)
+        return True
+
+
+class FileEvents:
+    def __init__(self):
+        self.epoch = 0
+        self._lock = threading.Lock()
+        self._sources = []
+        self._subscriptions = weakref.WeakSet()
+
+    @property
+    def active(self):
+        return bool(self._sources)
+
+    def attach(self, source):
+        """
+        Register a watcher that publishes events.
+
+        `source` must have a `covers(path)` method telling which paths it reports.
+        """
+        with self._lock:
+            if source not in self._sources:
+                self._sources.append(source)
+                self.epoch += 1
+
+    def detach(self, source):
+        with self._lock:
+            if source in self._sources:
+                self._sources.remove(source)
+                self.epoch += 1
+
+    def invalidate(self):
+        """Drop every validation, for when changes may not have been reported yet."""
+        with self._lock:
+            self.epoch += 1
+
+    def covers(self, path):
+        return any(source.covers(path) for source in list(self._sources))
+
+    def subscribe(self, root=None, match=None, callback=None):
+        """
+        Return a new subscription to events under `root` and accepted by `match`.
+
+        `callback(change, path)` is called for each matching event, on the
+        publishing thread. The bus only holds a weak reference, so the
+        subscription lives as long as the cache that keeps it.
+        """
+        subscription = Subscription(self, root=root, match=match, callback=callback)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, changes):
+        """Deliver `changes`, an iterable of (change type, path) pairs, to the subscribers."""
+        callbacks = []
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            for change, path in changes:
+                path = os.path.abspath(path)
+                for subscription in subscriptions:
+                    if subscription._notify(change, path) and subscription.callback:
+                        callbacks.append((subscription.callback, change, path))
+
+        for callback, change, path in callbacks:
+            callback(change, path)
+
+
+file_events = FileEvents()
@@ -0,0 +1,147 @@
+"""
+Buffered background writer for the chat and input history files.
+
+History is appended one line at a time on the hot path of every turn. The
+writer keeps appended text in memory and a background thread writes it out
+once MAX_BUFFER characters are pending or the oldest pending text is
+FLUSH_INTERVAL seconds old, with a single open and write per file. Callers
+flush() at turn boundaries and before reading a history file, and everything
+still pending is written at exit.
+"""
+
+import atexit
+import datetime
+import threading
+import time
+from pathlib import Path
+
+FLUSH_INTERVAL = 1.0
+MAX_BUFFER = 64 * 1024
+
+
+def input_history_entry(text):
+    """
+    An input history entry, in the format of prompt_toolkit's FileHistory.
+
+    Append it with newline="" so it is written byte for byte like FileHistory does.
+    """
+    lines = "".join(f"+{line}\n" for line in text.split("\n"))
+    return f"\n# {datetime.datetime.now()}\n{lines}"
+
+
+class HistoryWriter:
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_buffer=MAX_BUFFER):
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()  # Keeps concurrent flushes in order
+        self._pending = {}  # (path, encoding, newline) -> list of texts
+        self._on_error = {}  # (path, encoding, newline) -> callback
+        self._size = 0
+        self._since = None  # When the oldest pending text was appended
+        self._thread = None
+        self._closed = False
+        self._made_dirs = set()
+
+    def append(self, path, text, encoding="utf-8", newline=None, on_error=None):
+        """
+        Queue `text` to be appended to `path`, opened with `encoding` and `newline`.
+
+        `on_error(err)` is called, possibly from the writer thread, if the
+        write fails with an OSError. The failed text is dropped.
+        """
+        key = (Path(path), encoding, newline)
+        with self._lock:
+            self._pending.setdefault(key, []).append(text)
+            if on_error is not None:
+                self._on_error[key] = on_error
+            self._size += len(text)
+            if self._since is None:
+                self._since = time.monotonic()
+
+            if self._closed:
+                flush_now = True
+            else:
+                flush_now = False
+                self._start()
+                if self._size >= self.max_buffer:
+                    self._wakeup.notify()
+
+        if flush_now:
+            self.flush()
+
+    def flush(self, path=None):
+        """Write out pending text, for every file or only for `path`."""
+        with self._write_lock:
+            with self._lock:
+                if path is None:
+                    batches = self._pending
+                    self._pending = {}
+                else:
+                    path = Path(path)
+                    batches = {key: texts for key, texts in self._pending.items() if key[0] == path}
+                    for key in batches:
+                        del self._pending[key]
+
+                for texts in batches.values():
+                    self._size -= sum(len(text) for text in texts)
+                if not self._pending:
+                    self._size = 0
+                    self._since = None
+
+            for key, texts in batches.items():
+                self._write(key, "".join(texts))
+
+    def close(self):
+        """Stop the writer thread and write out everything pending."""
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+    def _write(self, key, text):
+        path, encoding, newline = key
+        try:
+            if path.parent not in self._made_dirs:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._made_dirs.add(path.parent)
+            with path.open("a", encoding=encoding, errors="ignore", newline=newline) as f:
+                f.write(text)
+        except OSError as err:
+            on_error = self._on_error.get(key)
+            if on_error is not None:
+                on_error(err)
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _due(self):
+        if not self._pending:
+            return False
+        if self._size >= self.max_buffer:
+            return True
+        return time.monotonic() - self._since >= self.flush_interval
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._closed and not self._due():
+                    timeout = None
+                    if self._pending:
+                        timeout = max(self._since + self.flush_interval - time.monotonic(), 0)
+                    self._wakeup.wait(timeout)
+                if self._closed:
+                    return
+            self.flush()
+
+
+history_writer = HistoryWriter()
@@ -12,6 +12,8 @@ from typing import Any, Dict, List, Optional
 
 import yaml
 
+from cecli.helpers.tool_cache import stat_signature
+
 
 @dataclass
 class SkillMetadata:
@@ -68,10 +70,44 @@ class SkillsManager:
         self._skills_cache: Dict[str, SkillContent] = {}
         self._skill_metadata_cache: Dict[str, SkillMetadata] = {}
         self._skills_find_cache: Optional[List[SkillMetadata]] = None
+        self._signature = None
 
         # Track which skills have been loaded via load_skill()
         self._loaded_skills: set[str] = set()
 
+    @property
+    def loaded_skills(self) -> frozenset[str]:
+        """Names of the skills loaded via load_skill()."""
+        return frozenset(self._loaded_skills)
+
+    def signature(self) -> tuple:
+        """
+        Fingerprint of the skills on disk: the skills directories and each SKILL.md.
+
+        The cached skills are dropped whenever the fingerprint changes, so skills
+        edited on disk are read again.
+
+        Returns:
+            Tuple of stat signatures
+        """
+        stats = []
+        for directory_path in self.directory_paths:
+            stats.append(stat_signature(directory_path))
+            try:
+                skill_dirs = sorted(directory_path.iterdir())
+            except OSError:
+                continue
+            for skill_dir in skill_dirs:
+                stats.append((skill_dir.name, stat_signature(skill_dir / "SKILL.md")))
+
+        signature = tuple(stats)
+        if self._signature is not None and signature != self._signature:
+            self._skills_cache.clear()
+            self._skill_metadata_cache.clear()
+            self._skills_find_cache = None
+        self._signature = signature
+        return signature
+
     def find_skills(self, reload: bool = False) -> List[SkillMetadata]:
         """
         Find all skills in the configured directory paths.
@@ -0,0 +1,134 @@
+"""
+Completion index of code symbols and project paths for the TUI.
+
+Symbols are lowercased and sorted once when the index is built. Prefix matches
+are found by bisection, substring and fuzzy (subsequence) matches by searching
+one newline joined string of all lowercased symbols, so a keystroke never runs
+a Python level loop over the whole symbol set.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+MAX_SYMBOL_FILES = 200
+MAX_FUZZY_QUERY = 32
+
+
+class SymbolIndex:
+    def __init__(self, symbols=()):
+        entries = sorted({(symbol.lower(), symbol) for symbol in symbols if "\n" not in symbol})
+        self.lowered = [lower for lower, _ in entries]
+        self.symbols = [symbol for _, symbol in entries]
+
+        self._offsets = []  # Start of each symbol in the haystack
+        offset = 0
+        for lower in self.lowered:
+            self._offsets.append(offset)
+            offset += len(lower) + 1
+        self._haystack = "\n".join(self.lowered)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def search(self, query, limit=50):
+        """
+        Return up to `limit` symbols matching `query`, case insensitively.
+
+        Prefix matches come first, then substring matches, then symbols that
+        contain the query's characters in order. Each group is sorted.
+        """
+        query = query.lower()
+        if not query:
+            return self.symbols[:limit]
+        if "\n" in query:
+            return []
+
+        found = []
+        seen = set()
+
+        def add(i):
+            if i not in seen:
+                seen.add(i)
+                found.append(i)
+            return len(found) >= limit
+
+        i = bisect_left(self.lowered, query)
+        while i < len(self.lowered) and self.lowered[i].startswith(query):
+            if add(i):
+                return self._result(found)
+            i += 1
+
+        pos = self._haystack.find(query)
+        while pos != -1:
+            i = self._entry_at(pos)
+            if add(i):
+                return self._result(found)
+            pos = self._haystack.find(query, self._next_start(i))
+
+        if 1 < len(query) <= MAX_FUZZY_QUERY:
+            pattern = re.compile(fuzzy_pattern(query))
+            match = pattern.search(self._haystack)
+            while match:
+                i = self._entry_at(match.start())
+                if add(i):
+                    break
+                match = pattern.search(self._haystack, self._next_start(i))
+
+        return self._result(found)
+
+    def _entry_at(self, pos):
+        return bisect_right(self._offsets, pos) - 1
+
+    def _next_start(self, i):
+        return self._offsets[i + 1] if i + 1 < len(self._offsets) else len(self._haystack)
+
+    def _result(self, found):
+        return [self.symbols[i] for i in found]
+
+
+def fuzzy_pattern(query):
+    """
+    Regex matching `query` as a subsequence of a single line.
+
+    Each gap excludes the character that ends it, so there is only one way to
+    match and no backtracking.
+    """
+    chars = [re.escape(char) for char in query]
+    return chars[0] + "".join(f"[^{char}\n]*{char}" for char in chars[1:])
+
+
+def file_symbols(coder, fname):
+    """Identifiers defined or referenced in `fname`, from the repo map tags if there is one."""
+    repo_map = getattr(coder, "repo_map", None)
+    if repo_map:
+        tags = repo_map.get_tags(fname, repo_map.get_rel_fname(fname))
+        return {tag.name for tag in tags if len(tag.name) > 1}
+
+    # Without a repo map, fall back to lexing the file
+    from pygments.lexers import guess_lexer_for_filename
+    from pygments.token import Token
+
+    with open(fname, "r", encoding="utf-8", errors="ignore") as f:
+        content = f.read()
+    lexer = guess_lexer_for_filename(fname, content)
+    return {
+        value
+        for token_type, value in lexer.get_tokens(content)
+        if token_type in Token.Name and len(value) > 1
+    }
+
+
+def collect_symbols(coder, fnames):
+    """Symbols of the files in `fnames` plus the relative paths of all project files."""
+    symbols = set()
+    if hasattr(coder, "get_inchat_relative_files"):
+        symbols.update(coder.get_inchat_relative_files())
+    if hasattr(coder, "get_all_relative_files"):
+        symbols.update(coder.get_all_relative_files())
+
+    for fname in fnames[:MAX_SYMBOL_FILES]:
+        try:
+            symbols.update(file_symbols(coder, fname))
+        except Exception:
+            continue
+    return symbols
@@ -0,0 +1,185 @@
+"""
+Result cache for idempotent tool calls.
+
+Entries are keyed by (namespace, tool name, normalized arguments) and store a
+signature of the state the result was computed from (file stats, git HEAD, ...).
+A lookup only hits when the caller's current signature matches the stored one
+and the entry's TTL, if any, has not expired.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MISS = object()
+
+LOCAL_NAMESPACE = "local"
+
+DEFAULT_MCP_CACHE_TTL = 300
+
+
+class ToolResultCache:
+    """Thread safe LRU cache of tool results."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(namespace, tool_name, params):
+        try:
+            args = json.dumps(params, sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            args = repr(params)
+        return (namespace, tool_name.lower(), args)
+
+    def get(self, key, signature=None):
+        """Return the cached result for `key`, or MISS."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, entry_signature, expires_at, _ = entry
+                expired = expires_at is not None and time.monotonic() >= expires_at
+                if entry_signature == signature and not expired:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+            self.misses += 1
+            return MISS
+
+    def put(self, key, result, signature=None, ttl=None, paths=None):
+        """
+        Store `result` under `key`.
+
+        `paths` lists the absolute directories the result was read from, so that
+        invalidating a path only drops the entries below it. Entries without
+        `paths` are dropped by every invalidation of their namespace.
+        """
+        expires_at = time.monotonic() + ttl if ttl else None
+        if paths is not None:
+            paths = tuple(os.path.normpath(path) for path in paths)
+        with self._lock:
+            self._entries[key] = (result, signature, expires_at, paths)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace=None, paths=None):
+        """
+        Drop all entries, or only those in `namespace`.
+
+        With `paths`, a collection of absolute file paths that changed, only the
+        entries read from a directory holding one of them are dropped.
+        """
+        if paths is not None:
+            paths = [os.path.normpath(path) for path in paths]
+        with self._lock:
+            if namespace is None and paths is None:
+                self._entries.clear()
+                return
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if (namespace is None or key[0] == namespace)
+                and (paths is None or _depends_on(entry[3], paths))
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _depends_on(entry_paths, changed_paths):
+    if entry_paths is None:
+        return True
+    for directory in entry_paths:
+        prefix = directory.rstrip(os.sep) + os.sep
+        if any(path == directory or path.startswith(prefix) for path in changed_paths):
+            return True
+    return False
+
+
+def stat_signature(path):
+    """Return (mtime_ns, size) for `path`, or None if it cannot be stat'ed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def files_signature(root, rel_fnames, events=None):
+    """
+    Cheap fingerprint of a set of files: count, newest mtime and total size.
+
+    The directories holding the files are included too, so that creating or
+    deleting an untracked file next to them also changes the fingerprint.
+
+    With `events`, a cecli.helpers.file_events subscription, paths the file
+    watcher covers are not stat'ed. Their changes show up in the subscription's
+    signature instead, which is added to the fingerprint.
+    """
+    count = 0
+    newest = 0
+    total_size = 0
+    dirnames = {""}
+    for rel_fname in rel_fnames:
+        dirnames.add(os.path.dirname(rel_fname))
+        path = os.path.join(root, rel_fname)
+        if events is not None and events.covers(path):
+            count += 1
+            continue
+        stat = stat_signature(path)
+        if stat is None:
+            continue
+        count += 1
+        newest = max(newest, stat[0])
+        total_size += stat[1]
+    for dirname in dirnames:
+        path = os.path.join(root, dirname)
+        if dirname and events is not None and events.covers(path):
+            continue
+        stat = stat_signature(path)
+        if stat is not None:
+            newest = max(newest, stat[0])
+    if events is None:
+        return (count, newest, total_size)
+    return (count, newest, total_size) + events.signature()
+
+
+def git_signature(repo):
+    """Fingerprint of the git state: HEAD plus the refs and index that describe it."""
+    if not repo:
+        return None
+    try:
+        git_dir = repo.repo.git_dir
+    except Exception:
+        return None
+    paths = ("HEAD", "index", "packed-refs", os.path.join("refs", "heads"))
+    return (repo.get_head_commit_sha(),) + tuple(
+        stat_signature(os.path.join(git_dir, path)) for path in paths
+    )
+
+
+def mcp_cache_ttl(config, tool_name):
+    """
+    Return the TTL in seconds for caching `tool_name` results, or None.
+
+    MCP servers opt in through their config with `cache_tools` (a list of tool
+    names, or true for all tools) and an optional `cache_ttl` in seconds.
+    """
+    if not isinstance(config, dict):
+        return None
+    cache_tools = config.get("cache_tools")
+    if not cache_tools:
+        return None
+    if cache_tools is not True and tool_name.lower() not in {t.lower() for t in cache_tools}:
+        return None
+    return config.get("cache_ttl", DEFAULT_MCP_CACHE_TTL)
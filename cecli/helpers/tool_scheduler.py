@@ -0,0 +1,120 @@
+"""
+Scheduler for local agent tool calls.
+
+Read-only tools run concurrently in a bounded thread pool. Mutating tools
+change shared coder state (the change tracker, the chat file sets, io output)
+that has no locks, so they run one at a time on the event loop thread, after
+every earlier call. Results are always handed back in the order the calls were
+submitted.
+
+The thread pools are shared by every scheduler of the same size, so coders that
+are switched away from or discarded don't leave idle worker threads behind.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Parameters that name the files a mutating tool will write to
+FILE_PARAM_KEYS = ("file_path", "source_file_path", "target_file_path")
+
+_executors = {}  # max_workers -> shared ThreadPoolExecutor
+_executors_lock = threading.Lock()
+
+
+def get_executor(max_workers):
+    """Return the thread pool shared by all schedulers with `max_workers` workers."""
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cecli-tool")
+            _executors[max_workers] = executor
+        return executor
+
+
+class ScheduledCall:
+    """A single unit of work submitted to the ToolScheduler."""
+
+    def __init__(self, func, read_only=False):
+        """
+        Args:
+            func: Zero-argument callable returning a result or a coroutine
+            read_only: Whether the call leaves the workspace and coder state untouched
+        """
+        self.func = func
+        self.read_only = read_only
+
+    def conflicts_with(self, other):
+        """Return True if this call must wait for an earlier `other` call."""
+        return not (self.read_only and other.read_only)
+
+
+class ToolScheduler:
+    """Runs batches of tool calls with read/write aware concurrency."""
+
+    def __init__(self, read_tools, max_workers=8):
+        self.read_tools = set(read_tools)
+        self.max_workers = max(1, int(max_workers or 1))
+
+    @property
+    def executor(self):
+        return get_executor(self.max_workers)
+
+    def is_read_only(self, tool_name):
+        return tool_name.lower() in self.read_tools
+
+    @staticmethod
+    def get_file_keys(params, root=None):
+        """
+        Determine which files a mutating call targets from its parameters.
+
+        Returns:
+            set: Absolute paths, or None when the target cannot be determined
+        """
+        if not isinstance(params, dict):
+            return None
+        keys = set()
+        for param in FILE_PARAM_KEYS:
+            value = params.get(param)
+            if isinstance(value, str) and value:
+                if root and not os.path.isabs(value):
+                    value = os.path.join(root, value)
+                keys.add(os.path.normpath(value))
+        return keys or None
+
+    async def _run_call(self, call, dependencies):
+        if dependencies:
+            await asyncio.wait(dependencies)
+
+        if asyncio.iscoroutinefunction(call.func):
+            result = call.func()
+        elif call.read_only and self.max_workers > 1:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, call.func)
+        else:
+            result = call.func()
+
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    async def run(self, calls):
+        """
+        Execute the scheduled calls.
+
+        Args:
+            calls: List of ScheduledCall objects in submission order
+
+        Returns:
+            list: One entry per call, either its result or the exception it raised
+        """
+        tasks = []
+        for i, call in enumerate(calls):
+            if self.max_workers <= 1:
+                dependencies = set(tasks[-1:])
+            else:
+                dependencies = {tasks[j] for j in range(i) if call.conflicts_with(calls[j])}
+            tasks.append(asyncio.ensure_future(self._run_call(call, dependencies)))
+
+        return await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,290 @@
+"""
+Persistent trigram index for in-process code search.
+
+Every indexed file is reduced to the set of (lowercased) three character
+substrings it contains. A query is turned into the trigrams any matching file
+must contain, the posting lists narrow the candidate files down, and only the
+candidates are read and verified with the real pattern.
+
+Per-file trigram sets are persisted in a diskcache keyed by the relative file
+name, so a new session only re-indexes files whose (mtime_ns, size) changed.
+The search tools run concurrently in threads, so updates and lookups of the
+in-memory index are done under a lock.
+"""
+
+import fnmatch
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from diskcache import Cache
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+SQLITE_ERRORS = (sqlite3.OperationalError, sqlite3.DatabaseError, OSError)
+
+# Files larger than this are not indexed; they are always treated as candidates
+MAX_INDEXED_SIZE = 1024 * 1024
+
+# Markers stored instead of a trigram set for files that are not indexed
+UNINDEXED = None  # Too large, always a candidate
+UNSEARCHABLE = False  # Binary or undecodable, never a candidate
+
+
+def extract_trigrams(text):
+    text = text.lower()
+    return frozenset(text[i : i + 3] for i in range(len(text) - 2))
+
+
+def _literal_runs(items, runs, current):
+    """Collect the runs of literal characters every match of a parsed regex must contain."""
+    for op, arg in items:
+        if op is sre_parse.LITERAL:
+            current.append(chr(arg))
+        elif op is sre_parse.AT:
+            # Zero width assertions do not break a run of literals
+            continue
+        elif op is sre_parse.SUBPATTERN:
+            _literal_runs(arg[-1], runs, current)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and arg[0] >= 1:
+            runs.append("".join(current))
+            current.clear()
+            _literal_runs(arg[2], runs, current)
+            runs.append("".join(current))
+            current.clear()
+        else:
+            runs.append("".join(current))
+            current.clear()
+
+
+def required_trigrams(pattern, regex=False):
+    """
+    Return the trigrams every match of `pattern` must contain.
+
+    An empty set means the pattern cannot narrow the candidates (e.g. a short literal or
+    a regex made of alternations and character classes), so every file is a candidate.
+    Raises re.error for invalid regular expressions.
+    """
+    if regex:
+        runs = []
+        current = []
+        _literal_runs(sre_parse.parse(pattern), runs, current)
+        runs.append("".join(current))
+    else:
+        runs = [pattern]
+
+    trigrams = set()
+    for run in runs:
+        if len(run) >= 3:
+            trigrams |= extract_trigrams(run)
+    return trigrams
+
+
+def compile_pattern(pattern, regex=False, case_insensitive=False):
+    flags = re.MULTILINE | (re.IGNORECASE if case_insensitive else 0)
+    return re.compile(pattern if regex else re.escape(pattern), flags)
+
+
+def filter_files(rel_fnames, directory=".", file_pattern=None):
+    """
+    Restrict `rel_fnames` to those under `directory` matching the glob `file_pattern`.
+
+    Like ripgrep's -g, a glob without a slash is matched against the file's base name,
+    otherwise against its path relative to `directory`.
+    """
+    directory = os.path.normpath(directory or ".")
+    prefix = "" if directory == "." else directory.replace(os.sep, "/").rstrip("/") + "/"
+
+    selected = []
+    for rel_fname in rel_fnames:
+        posix_fname = rel_fname.replace(os.sep, "/")
+        if prefix and not posix_fname.startswith(prefix):
+            continue
+        if file_pattern and file_pattern != "*":
+            target = posix_fname[len(prefix) :]
+            if "/" not in file_pattern:
+                target = target.rsplit("/", 1)[-1]
+            if not fnmatch.fnmatch(target, file_pattern):
+                continue
+        selected.append(rel_fname)
+    return selected
+
+
+class TrigramIndex:
+    """Incrementally maintained trigram index over a set of files under `root`."""
+
+    CACHE_VERSION = 1
+    INDEX_CACHE_DIR = f".cecli/search.index.v{CACHE_VERSION}"
+
+    def __init__(self, root, cache_dir=None, io=None, verbose=False, use_memory_cache=False):
+        self.root = root
+        self.io = io
+        self.verbose = verbose
+        self.cache_dir = cache_dir or root
+
+        self._files = {}  # rel_fname -> ((mtime_ns, size), trigrams)
+        self._postings = {}  # trigram -> set of rel_fnames
+        self._unindexed = set()  # files too large to index, always candidates
+        self._lock = threading.Lock()
+
+        if use_memory_cache:
+            self.INDEX_CACHE = dict()
+        else:
+            self.load_index_cache()
+
+    def load_index_cache(self):
+        path = Path(self.cache_dir) / self.INDEX_CACHE_DIR
+        try:
+            self.INDEX_CACHE = Cache(path)
+        except SQLITE_ERRORS as e:
+            self.index_cache_error(e)
+
+    def index_cache_error(self, original_error=None):
+        """Fall back to an in-memory cache if the on-disk one cannot be used."""
+        if self.verbose and original_error and self.io:
+            self.io.tool_warning(f"Search index cache error: {str(original_error)}")
+        self.INDEX_CACHE = dict()
+
+    def __len__(self):
+        return len(self._files)
+
+    def _cache_get(self, rel_fname):
+        try:
+            return self.INDEX_CACHE.get(rel_fname)
+        except SQLITE_ERRORS as e:
+            self.index_cache_error(e)
+            return None
+
+    def _cache_set(self, rel_fname, value):
+        try:
+            self.INDEX_CACHE[rel_fname] = value
+        except SQLITE_ERRORS as e:
+            self.index_cache_error(e)
+            self.INDEX_CACHE[rel_fname] = value
+
+    def _index_file(self, abs_fname, size):
+        if size > MAX_INDEXED_SIZE:
+            return UNINDEXED
+        try:
+            with open(abs_fname, "rb") as f:
+                data = f.read()
+        except OSError:
+            return UNSEARCHABLE
+        if b"\0" in data[:8192]:
+            return UNSEARCHABLE
+        try:
+            return extract_trigrams(data.decode("utf-8"))
+        except UnicodeDecodeError:
+            return UNSEARCHABLE
+
+    def _add(self, rel_fname, signature, trigrams):
+        self._files[rel_fname] = (signature, trigrams)
+        if trigrams is UNINDEXED:
+            self._unindexed.add(rel_fname)
+            return
+        if trigrams is UNSEARCHABLE:
+            return
+        for trigram in trigrams:
+            self._postings.setdefault(trigram, set()).add(rel_fname)
+
+    def _remove(self, rel_fname):
+        entry = self._files.pop(rel_fname, None)
+        if entry is None:
+            return
+        trigrams = entry[1]
+        if trigrams is UNINDEXED:
+            self._unindexed.discard(rel_fname)
+            return
+        if trigrams is UNSEARCHABLE:
+            return
+        for trigram in trigrams:
+            posting = self._postings.get(trigram)
+            if posting is None:
+                continue
+            posting.discard(rel_fname)
+            if not posting:
+                del self._postings[trigram]
+
+    def update(self, rel_fnames):
+        """Bring the index in line with `rel_fnames` on disk, re-indexing only changed files."""
+        with self._lock:
+            self._update(rel_fnames)
+
+    def _update(self, rel_fnames):
+        for rel_fname in rel_fnames:
+            abs_fname = os.path.join(self.root, rel_fname)
+            try:
+                stat = os.stat(abs_fname)
+            except OSError:
+                self._remove(rel_fname)
+                continue
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            entry = self._files.get(rel_fname)
+            if entry is not None and entry[0] == signature:
+                continue
+
+            cached = self._cache_get(rel_fname)
+            if cached is not None and cached.get("signature") == signature:
+                trigrams = cached["trigrams"]
+            else:
+                trigrams = self._index_file(abs_fname, stat.st_size)
+                self._cache_set(rel_fname, {"signature": signature, "trigrams": trigrams})
+
+            self._remove(rel_fname)
+            self._add(rel_fname, signature, trigrams)
+
+    def candidates(self, rel_fnames, pattern, regex=False):
+        """
+        Return the files of `rel_fnames` that may contain `pattern`, in the given order.
+
+        Call update() first so the index reflects the files on disk.
+        """
+        trigrams = required_trigrams(pattern, regex=regex)
+        with self._lock:
+            return self._candidates(rel_fnames, trigrams)
+
+    def _candidates(self, rel_fnames, trigrams):
+        if not trigrams:
+            return [
+                fname
+                for fname in rel_fnames
+                if fname in self._files and self._files[fname][1] is not UNSEARCHABLE
+            ]
+
+        postings = []
+        for trigram in trigrams:
+            posting = self._postings.get(trigram)
+            if not posting:
+                postings = []
+                break
+            postings.append(posting)
+
+        matched = set.intersection(*sorted(postings, key=len)) if postings else set()
+        matched |= self._unindexed
+        return [fname for fname in rel_fnames if fname in matched]
+
+    def search(self, rel_fnames, pattern, regex=False, case_insensitive=False):
+        """
+        Yield (rel_fname, content) for every file of `rel_fnames` matching `pattern`.
+
+        Files are verified lazily, so callers can stop iterating once they have
+        enough results. Raises re.error for invalid regular expressions.
+        """
+        compiled = compile_pattern(pattern, regex=regex, case_insensitive=case_insensitive)
+        rel_fnames = list(rel_fnames)
+        self.update(rel_fnames)
+
+        for rel_fname in self.candidates(rel_fnames, pattern, regex=regex):
+            try:
+                with open(os.path.join(self.root, rel_fname), "r", encoding="utf-8") as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+            if compiled.search(content):
+                yield rel_fname, content
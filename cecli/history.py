@@ -1,16 +1,26 @@
 import argparse
+import asyncio
 
 import cecli.prompts.utils.system as prompts
 from cecli import models
 from cecli.dump import dump  # noqa: F401
 
+# Most tokens of history sent in one summarization request
+CHUNK_TOKENS = 16384
+# Most summarization requests in flight at once
+MAX_PARALLEL = 4
+
 
 class ChatSummary:
-    def __init__(self, models=None, max_tokens=1024):
+    def __init__(
+        self, models=None, max_tokens=1024, chunk_tokens=CHUNK_TOKENS, max_parallel=MAX_PARALLEL
+    ):
         if not models:
             raise ValueError("At least one model must be provided")
         self.models = models if isinstance(models, list) else [models]
         self.max_tokens = max_tokens
+        self.chunk_tokens = chunk_tokens
+        self.max_parallel = max_parallel
         self.token_count = self.models[0].token_count
 
     def check_max_tokens(self, messages, max_tokens=None):
@@ -86,11 +96,11 @@ class ChatSummary:
         if split_index <= min_split:
             return await self.summarize_all(messages)
 
-        # Split head and tail
+        # Split head and tail, the head is summarized in concurrent chunks
         head = messages[:split_index]
         tail = messages[split_index:]
 
-        summary = await self.summarize_real(head, depth + 1)
+        summary = await self.map_reduce(head, self.summarize_all, sized[:split_index])
 
         # If the combined summary and tail still fits, return directly
         new_messages = summary + tail
@@ -104,6 +114,65 @@ class ChatSummary:
         # Otherwise recurse with increased depth
         return await self.summarize_real(new_messages, depth + 1)
 
+    def split_chunks(self, sized, chunk_tokens=None):
+        """
+        Split tokenized messages into consecutive chunks of at most chunk_tokens.
+
+        Chunks end after an assistant message where possible, so exchanges stay
+        together. A single message larger than chunk_tokens gets a chunk of its own.
+        """
+        if chunk_tokens is None:
+            chunk_tokens = self.chunk_tokens
+
+        chunks = []
+        start = 0
+        while start < len(sized):
+            end = start
+            total = 0
+            last_break = None
+            while end < len(sized) and (end == start or total + sized[end][0] <= chunk_tokens):
+                total += sized[end][0]
+                end += 1
+                if sized[end - 1][1]["role"] == "assistant":
+                    last_break = end
+
+            if end < len(sized) and last_break is not None:
+                end = last_break
+            chunks.append([msg for _tokens, msg in sized[start:end]])
+            start = end
+
+        return chunks
+
+    async def map_reduce(self, messages, summarize_chunk, sized=None):
+        """
+        Summarize messages with summarize_chunk(messages) -> messages.
+
+        Messages that fit in one chunk are summarized in one request. Longer
+        histories are split into chunks that are summarized concurrently, at
+        most max_parallel at a time, and the chunk summaries are then
+        summarized together the same way.
+        """
+        if sized is None:
+            sized = self.tokenize(messages)
+        chunks = self.split_chunks(sized)
+        if len(chunks) <= 1:
+            return await summarize_chunk(messages)
+
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def summarize(chunk):
+            async with semaphore:
+                return await summarize_chunk(chunk)
+
+        summaries = await asyncio.gather(*(summarize(chunk) for chunk in chunks))
+        merged = [msg for summary in summaries for msg in summary]
+
+        # Summaries that didn't shrink the history can't be merged in more rounds
+        sized_merged = self.tokenize(merged)
+        if sum(tokens for tokens, _msg in sized_merged) >= sum(tokens for tokens, _msg in sized):
+            return await summarize_chunk(merged)
+        return await self.map_reduce(merged, summarize_chunk, sized_merged)
+
     async def summarize_all(self, messages):
         content = ""
         for msg in messages:
@@ -165,6 +234,24 @@ class ChatSummary:
 
         raise ValueError("summarizer unexpectedly failed for all models")
 
+    async def summarize_as_text(self, messages, prompt, max_tokens=None):
+        """
+        Summarize messages with prompt, like summarize_all_as_text().
+
+        Histories longer than chunk_tokens are summarized chunk by chunk, in
+        parallel, and the chunk summaries are merged with a final request.
+        """
+        sized = self.tokenize(messages)
+        if len(self.split_chunks(sized)) <= 1:
+            return await self.summarize_all_as_text(messages, prompt, max_tokens)
+
+        async def summarize_chunk(chunk):
+            summary = await self.summarize_all_as_text(chunk, prompt, max_tokens)
+            return [dict(role="user", content=summary)]
+
+        summary = await self.map_reduce(messages, summarize_chunk, sized)
+        return summary[0]["content"]
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -42,6 +42,8 @@ from rich.text import Text
 
 from cecli.commands import SwitchCoderSignal
 from cecli.helpers import coroutines
+from cecli.helpers.file_events import MODIFIED, file_events
+from cecli.helpers.history_writer import history_writer, input_history_entry
 from cecli.report import update_error_prefix
 
 from .dump import dump  # noqa: F401
@@ -733,6 +735,8 @@ class InputOutput:
             try:
                 with open(str(filename), "w", encoding=self.encoding, newline=newline) as f:
                     f.write(content)
+                # Don't wait for the file watcher to tell the caches about our own write
+                file_events.publish([(MODIFIED, str(filename))])
                 return  # Successfully wrote the file
             except PermissionError as err:
                 if attempt < max_retries - 1:
@@ -1094,18 +1098,31 @@ class InputOutput:
     def add_to_input_history(self, inp):
         if not self.input_history_file:
             return
+        history_writer.append(
+            self.input_history_file,
+            input_history_entry(inp),
+            newline="",
+            on_error=self._input_history_error,
+        )
         try:
-            FileHistory(self.input_history_file).append_string(inp)
             # Also add to the in-memory history if it exists
             if self.prompt_session and self.prompt_session.history:
                 self.prompt_session.history.append_string(inp)
         except OSError as err:
-            self.tool_warning(f"Unable to write to input history file: {err}")
+            self._input_history_error(err)
+
+    def _input_history_error(self, err):
+        self.tool_warning(f"Unable to write to input history file: {err}")
+
+    def flush_history(self):
+        """Write out chat and input history still buffered in memory."""
+        history_writer.flush()
 
     def get_input_history(self):
         if not self.input_history_file:
             return []
 
+        history_writer.flush(self.input_history_file)
         fh = FileHistory(self.input_history_file)
         return fh.load_history_strings()
 
@@ -1722,16 +1739,19 @@ class InputOutput:
         if not text.endswith("\n"):
             text += "\n"
         if self.chat_history_file is not None:
-            try:
-                self.chat_history_file.parent.mkdir(parents=True, exist_ok=True)
-                with self.chat_history_file.open(
-                    "a", encoding=self.encoding or "utf-8", errors="ignore"
-                ) as f:
-                    f.write(text)
-            except (PermissionError, OSError) as err:
-                print(f"Warning: Unable to write to chat history file {self.chat_history_file}.")
-                print(err)
-                self.chat_history_file = None  # Disable further attempts to write
+            history_writer.append(
+                self.chat_history_file,
+                text,
+                encoding=self.encoding or "utf-8",
+                on_error=self._chat_history_error,
+            )
+
+    def _chat_history_error(self, err):
+        if self.chat_history_file is None:
+            return
+        print(f"Warning: Unable to write to chat history file {self.chat_history_file}.")
+        print(err)
+        self.chat_history_file = None  # Disable further attempts to write
 
     def format_files_for_input(self, rel_fnames, rel_read_only_fnames, rel_read_only_stubs_fnames):
         # Optimization for large number of files
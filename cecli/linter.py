@@ -1,9 +1,15 @@
+import difflib
+import hashlib
 import os
 import re
 import subprocess
 import sys
+import tempfile
+import threading
 import traceback
 import warnings
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -18,6 +24,15 @@ from cecli.run_cmd import run_cmd_subprocess  # noqa: F401
 warnings.simplefilter("ignore", category=FutureWarning)
 
 
+# Number of files linted concurrently by lint_many
+MAX_LINT_WORKERS = 8
+
+# Number of lint results of the built-in linters kept, keyed by file content
+LINT_CACHE_SIZE = 256
+
+FLAKE8_FATAL = "E9,F821,F823,F831,F406,F407,F701,F702,F704,F706"
+
+
 class Linter:
     def __init__(self, encoding="utf-8", root=None):
         self.encoding = encoding
@@ -28,6 +43,12 @@ class Linter:
         )
         self.all_lint_cmd = None
 
+        # (fname, linter, content hash) -> LintResult or None, for the built-in linters
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        # (rel_fname, content hash) -> flake8 LintResult or None, from a batched run
+        self.flake8_results = {}
+
     def set_linter(self, lang, cmd):
         if lang:
             self.languages[lang] = cmd
@@ -79,7 +100,14 @@ class Linter:
 
         return LintResult(text=errors, lines=linenums)
 
-    def lint(self, fname, cmd=None):
+    def lint(self, fname, cmd=None, original=None):
+        """
+        Lint a file, returning the errors formatted for the LLM or None.
+
+        If the `original` content from before an edit is given, errors it already had
+        are left out, unless the file doesn't parse at all. External lint commands
+        only see the file on disk, so their errors are always reported in full.
+        """
         rel_fname = self.get_rel_fname(fname)
         try:
             code = Path(fname).read_text(encoding=self.encoding, errors="replace")
@@ -87,23 +115,16 @@ class Linter:
             print(f"Unable to read {fname}: {err}")
             return
 
-        if cmd:
-            cmd = cmd.strip()
-        if not cmd:
-            lang = filename_to_lang(fname)
-            if not lang:
-                return
-            if self.all_lint_cmd:
-                cmd = self.all_lint_cmd
-            else:
-                cmd = self.languages.get(lang)
+        cmd = self.get_cmd(fname, cmd)
+        if cmd is False:
+            return
 
-        if callable(cmd):
-            lintres = cmd(fname, rel_fname, code)
-        elif cmd:
-            lintres = self.run_cmd(cmd, rel_fname, code)
-        else:
-            lintres = basic_lint(rel_fname, code)
+        lintres = self.lint_code(fname, rel_fname, code, cmd)
+        if lintres and original is not None and (not cmd or callable(cmd)):
+            original_lintres = self.lint_code(fname, rel_fname, original, cmd)
+            lintres = self.filter_lint_result(
+                fname, rel_fname, code, lintres, original_lintres, original
+            )
 
         if not lintres:
             return
@@ -115,10 +136,171 @@ class Linter:
 
         return res
 
+    def lint_many(self, fnames, originals=None):
+        """
+        Lint several files concurrently, returning {fname: errors} for the files with errors.
+
+        The flake8 checks of all the Python files run in a single flake8 process.
+        `originals` optionally maps fnames to their content before an edit, see `lint`.
+        Only the originals of the files with errors are linted, their flake8 checks
+        in one more flake8 process over temporary copies.
+        """
+        originals = originals or {}
+        fnames = list(dict.fromkeys(fnames))
+
+        def run_all(func, fnames):
+            if len(fnames) > 1:
+                workers = min(MAX_LINT_WORKERS, len(fnames))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    return list(executor.map(func, fnames))
+            return [func(fname) for fname in fnames]
+
+        python_files = []
+        for fname in fnames:
+            if self.get_cmd(fname) != self.py_lint:
+                continue
+            try:
+                code = Path(fname).read_text(encoding=self.encoding, errors="replace")
+            except OSError:
+                continue
+            if not self.is_cached(fname, code):
+                python_files.append((self.get_rel_fname(fname), code))
+        if len(python_files) > 1:
+            self.flake8_results.update(self.flake8_lint_many(python_files))
+
+        try:
+            results = dict(zip(fnames, run_all(self.lint, fnames)))
+
+            # Leave out the errors the files already had before the edit
+            rechecks = [fname for fname in fnames if results[fname] and fname in originals]
+            python_originals = [
+                (self.get_rel_fname(fname), originals[fname])
+                for fname in rechecks
+                if self.get_cmd(fname) == self.py_lint
+                and not self.is_cached(fname, originals[fname])
+            ]
+            if len(python_originals) > 1:
+                self.flake8_results.update(self.flake8_lint_many(python_originals, copies=True))
+
+            def lint_original(fname):
+                return self.lint(fname, original=originals[fname])
+
+            results.update(zip(rechecks, run_all(lint_original, rechecks)))
+        finally:
+            self.flake8_results.clear()
+
+        return {fname: errors for fname, errors in results.items() if errors}
+
+    def get_cmd(self, fname, cmd=None):
+        """Return the lint cmd for a file: a shell command, a callable, None for
+        basic_lint, or False if the file shouldn't be linted."""
+        if cmd:
+            cmd = cmd.strip()
+        if cmd:
+            return cmd
+
+        lang = filename_to_lang(fname)
+        if not lang:
+            return False
+        if self.all_lint_cmd:
+            return self.all_lint_cmd
+        return self.languages.get(lang)
+
+    @staticmethod
+    def cache_key(fname, cmd, code):
+        name = getattr(cmd, "__name__", cmd)
+        return fname, name, hashlib.sha1(code.encode("utf-8", "replace")).hexdigest()
+
+    def is_cached(self, fname, code):
+        """True if the built-in Python lint of `code` is cached."""
+        with self.cache_lock:
+            return self.cache_key(fname, self.py_lint, code) in self.cache
+
+    def lint_code(self, fname, rel_fname, code, cmd):
+        if cmd and not callable(cmd):
+            # External commands may look at other files, so they are never cached
+            return self.run_cmd(cmd, rel_fname, code)
+
+        key = self.cache_key(fname, cmd, code)
+        with self.cache_lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        if callable(cmd):
+            lintres = cmd(fname, rel_fname, code)
+        else:
+            lintres = basic_lint(rel_fname, code)
+
+        with self.cache_lock:
+            self.cache[key] = lintres
+            while len(self.cache) > LINT_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return lintres
+
+    def filter_lint_result(self, fname, rel_fname, code, lintres, original_lintres, original):
+        """
+        Drop the errors that `original_lintres`, the lint of the `original` content
+        from before the edit, already reported.
+
+        Errors are matched by their code and position, with the lines the edit left
+        alone mapped through the diff. So errors that the edit merely shifted are
+        dropped, while errors it caused, like the undefined names left behind by a
+        deleted import, are kept, even where the same error was already reported on
+        another line.
+        """
+        # A file that doesn't parse is always reported in full
+        if basic_lint(rel_fname, code):
+            return lintres
+        if filename_to_lang(fname) == "python" and lint_python_compile(fname, code):
+            return lintres
+
+        entry_re = re.compile(r"^" + re.escape(rel_fname) + r":(\d+):(?:(\d+):)?\s*(\S*)")
+
+        # Where the lines the edit left alone moved to, by line number
+        matcher = difflib.SequenceMatcher(
+            None, original.splitlines(), code.splitlines(), autojunk=False
+        )
+        line_map = {}
+        for old_start, new_start, size in matcher.get_matching_blocks():
+            for offset in range(size):
+                line_map[old_start + offset + 1] = new_start + offset + 1
+
+        old_errors = Counter()
+        for match in map(
+            entry_re.match, original_lintres.text.splitlines() if original_lintres else []
+        ):
+            if match and int(match.group(1)) in line_map:
+                old_line = int(match.group(1))
+                old_errors[(line_map[old_line], match.group(2), match.group(3))] += 1
+
+        # Drop the "fname:line:col: code message" entries seen before the edit, and the
+        # source lines that follow them
+        text = []
+        lines = []
+        keep = True
+        for line in lintres.text.splitlines(keepends=True):
+            match = entry_re.match(line)
+            if match:
+                error = (int(match.group(1)), match.group(2), match.group(3))
+                keep = not old_errors[error]
+                if keep:
+                    lines.append(error[0] - 1)
+                else:
+                    old_errors[error] -= 1
+            elif line.startswith("#") or not line.strip():
+                keep = True
+            if keep:
+                text.append(line)
+
+        if not lines:
+            return
+        return LintResult(text="".join(text), lines=lines)
+
     def py_lint(self, fname, rel_fname, code):
         basic_res = basic_lint(rel_fname, code)
         compile_res = lint_python_compile(fname, code)
-        flake_res = self.flake8_lint(rel_fname)
+        flake_res = self.flake8_lint(rel_fname, code)
 
         text = ""
         lines = set()
@@ -133,23 +315,33 @@ class Linter:
         if text or lines:
             return LintResult(text, lines)
 
-    def flake8_lint(self, rel_fname):
-        fatal = "E9,F821,F823,F831,F406,F407,F701,F702,F704,F706"
-        flake8_cmd = [
+    def flake8_cmd(self, rel_fnames):
+        return [
             sys.executable,
             "-m",
             "flake8",
-            f"--select={fatal}",
+            f"--select={FLAKE8_FATAL}",
             "--show-source",
             "--isolated",
-            rel_fname,
-        ]
+        ] + list(rel_fnames)
+
+    def flake8_lint(self, rel_fname, code=None):
+        if code is not None:
+            key = (rel_fname, hashlib.sha1(code.encode("utf-8", "replace")).hexdigest())
+            if key in self.flake8_results:
+                return self.flake8_results[key]
 
+        flake8_cmd = self.flake8_cmd([rel_fname])
         text = f"## Running: {' '.join(flake8_cmd)}\n\n"
 
+        # Content that isn't on disk, like a file from before an edit, is piped in
+        if code is not None:
+            flake8_cmd = self.flake8_cmd(["-"]) + [f"--stdin-display-name={rel_fname}"]
+
         try:
             result = subprocess.run(
                 flake8_cmd,
+                input=code,
                 capture_output=True,
                 text=True,
                 check=False,
@@ -167,6 +359,70 @@ class Linter:
         text += errors
         return self.errors_to_lint_result(rel_fname, text)
 
+    def flake8_lint_many(self, files, copies=False):
+        """
+        Run flake8 once over several (rel_fname, code) files.
+
+        Returns {(rel_fname, content hash): LintResult or None}, with the same
+        results separate runs would give. Returns {} if the output can't be split
+        up per file. With `copies`, flake8 checks temporary copies of the code,
+        for content that isn't on disk, like files from before an edit.
+        """
+        rel_fnames = [rel_fname for rel_fname, _ in files]
+        if not copies:
+            return self._flake8_split(files, rel_fnames, self.root)
+
+        with tempfile.TemporaryDirectory(prefix="cecli-lint-") as tmp_dir:
+            names = []
+            for i, (_, code) in enumerate(files):
+                name = f"{i}.py"
+                with open(os.path.join(tmp_dir, name), "w", encoding=self.encoding) as f:
+                    f.write(code)
+                names.append(name)
+            return self._flake8_split(files, names, tmp_dir)
+
+    def _flake8_split(self, files, names, cwd):
+        """Run flake8 on `names` in `cwd`, and split its output per file of `files`."""
+        try:
+            result = subprocess.run(
+                self.flake8_cmd(names),
+                capture_output=True,
+                text=True,
+                check=False,
+                encoding=self.encoding,
+                errors="replace",
+                cwd=cwd,
+            )
+        except Exception:
+            return {}
+        if result.stderr:
+            return {}
+
+        # Split the output into the entries of each file, keeping their source lines,
+        # and report them under the file's own name
+        rel_fnames = dict(zip(names, (rel_fname for rel_fname, _ in files)))
+        entry_re = re.compile(r"^(" + "|".join(re.escape(name) for name in names) + r"):\d+:\d+: ")
+        errors = {rel_fname: "" for rel_fname in rel_fnames.values()}
+        current = None
+        for line in result.stdout.splitlines(keepends=True):
+            match = entry_re.match(line)
+            if match:
+                current = rel_fnames[match.group(1)]
+                line = current + line[match.end(1) :]
+            elif current is None:
+                return {}
+            errors[current] += line
+
+        results = {}
+        for rel_fname, code in files:
+            key = (rel_fname, hashlib.sha1(code.encode("utf-8", "replace")).hexdigest())
+            if errors[rel_fname]:
+                text = f"## Running: {' '.join(self.flake8_cmd([rel_fname]))}\n\n"
+                results[key] = self.errors_to_lint_result(rel_fname, text + errors[rel_fname])
+            else:
+                results[key] = None
+        return results
+
 
 @dataclass
 class LintResult:
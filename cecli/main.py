@@ -39,6 +39,7 @@ from cecli import __version__, models, urls, utils
 from cecli.args import get_parser
 from cecli.coders import AgentCoder, Coder
 from cecli.coders.base_coder import UnknownEditFormat
+from cecli.coders.search_replace import strategy_telemetry
 from cecli.commands import Commands, SwitchCoderSignal
 from cecli.deprecated_args import handle_deprecated_model_args
 from cecli.format_settings import format_settings, scrub_sensitive_info
@@ -997,6 +998,7 @@ async def main_async(argv=None, input=None, output=None, force_git_root=None, re
             args.mcp_servers, args.mcp_servers_file, io, args.verbose, args.mcp_transport
         )
         mcp_manager = await McpServerManager.from_servers(mcp_servers, io, args.verbose)
+        strategy_telemetry.adaptive = args.adaptive_search_replace
 
         coder = await Coder.create(
             main_model=main_model,
@@ -1037,6 +1039,8 @@ async def main_async(argv=None, input=None, output=None, force_git_root=None, re
             enable_context_compaction=args.enable_context_compaction,
             context_compaction_max_tokens=args.context_compaction_max_tokens,
             context_compaction_summary_tokens=args.context_compaction_summary_tokens,
+            elide_superseded_files=args.elide_superseded_files,
+            speculative_compaction=args.speculative_context_compaction,
             map_cache_dir=args.map_cache_dir,
             repomap_in_memory=args.map_memory_cache,
             linear_output=args.linear_output,
@@ -1317,6 +1321,10 @@ async def graceful_exit(coder=None, exit_code=0):
 
         if coder.mcp_manager and coder.mcp_manager.is_connected:
             await coder.mcp_manager.disconnect_all()
+
+        # The watch thread outlives the prompts it is armed for, stop it for good
+        if coder.file_watcher:
+            await asyncio.to_thread(coder.file_watcher.close)
     return exit_code
 
 
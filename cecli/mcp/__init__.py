@@ -1,4 +1,6 @@
 from .manager import McpServerManager
+from .pool import McpSessionPool, get_session_pool
+from .schema_cache import McpSchemaCache
 from .server import HttpStreamingServer, LocalServer, McpServer, SseServer
 from .utils import find_available_port, generate_pkce_codes, load_mcp_servers
 
@@ -8,6 +10,9 @@ __all__ = [
     "HttpStreamingServer",
     "SseServer",
     "LocalServer",
+    "McpSessionPool",
+    "get_session_pool",
+    "McpSchemaCache",
     "load_mcp_servers",
     "find_available_port",
     "generate_pkce_codes",
@@ -1,6 +1,7 @@
 import asyncio
 
 from cecli.llm import litellm
+from cecli.mcp.schema_cache import McpSchemaCache
 from cecli.mcp.server import LocalServer, McpServer
 from cecli.tools.utils.registry import ToolRegistry
 
@@ -18,6 +19,7 @@ class McpServerManager:
         servers: list[McpServer],
         io=None,
         verbose: bool = False,
+        schema_cache: McpSchemaCache | None = None,
     ):
         """
         Initialize the MCP server manager.
@@ -26,13 +28,17 @@ class McpServerManager:
             servers: List of MCP Servers to manage
             io: InputOutput instance for user interaction
             verbose: Whether to output verbose logging
+            schema_cache: On-disk cache of server tool schemas
         """
         self.io = io
         self.verbose = verbose
         self._servers = servers
+        self.schema_cache = schema_cache
 
         self._server_tools: dict[str, list] = {}  # Maps server name to its tools
         self._connected_servers: set[McpServer] = set()
+        self._connect_tasks: dict[str, asyncio.Task] = {}  # In-flight background connections
+        self._lazy_servers: set[str] = set()  # Servers using cached tools, not yet connected
 
     def _log_verbose(self, message: str) -> None:
         """Log a verbose message if verbose mode is enabled and IO is available."""
@@ -76,6 +82,12 @@ class McpServerManager:
 
     async def disconnect_all(self) -> None:
         """Disconnect from all MCP servers."""
+        for task in self._connect_tasks.values():
+            task.cancel()
+        if self._connect_tasks:
+            await asyncio.gather(*self._connect_tasks.values(), return_exceptions=True)
+            self._connect_tasks.clear()
+
         if not self._connected_servers:
             self._log_verbose("MCP servers already disconnected")
             return
@@ -136,6 +148,9 @@ class McpServerManager:
             )
             self._server_tools[server.name] = tools
             self._connected_servers.add(server)
+            self._lazy_servers.discard(server.name)
+            if self.schema_cache:
+                self.schema_cache.save(server, tools)
             self._log_verbose(f"Connected to MCP server: {name}")
             return True
         except Exception as e:
@@ -158,7 +173,15 @@ class McpServerManager:
             self._log_warning(f"MCP server not found: {name}")
             return False
 
+        task = self._connect_tasks.pop(name, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
         if server not in self._connected_servers:
+            if name in self._lazy_servers:
+                self._lazy_servers.discard(name)
+                self._server_tools.pop(name, None)
             self._log_verbose(f"MCP server not connected: {name}")
             return True
 
@@ -198,6 +221,56 @@ class McpServerManager:
 
         return True
 
+    async def _connect_with_retry(self, server: McpServer, max_retries: int = 3) -> bool:
+        """Try to connect to a server with retries."""
+        for _attempt in range(max_retries):
+            if await self.connect_server(server.name):
+                return True
+        return False
+
+    def _start_background_connect(self, server: McpServer) -> None:
+        async def connect():
+            try:
+                if not await self._connect_with_retry(server):
+                    if server.name not in ["unnamed-server", "Local"]:
+                        self._log_warning(
+                            f"MCP tool initialization failed after multiple retries: {server.name}"
+                        )
+            finally:
+                self._connect_tasks.pop(server.name, None)
+
+        self._connect_tasks[server.name] = asyncio.create_task(connect())
+
+    async def ensure_connected(self, name: str) -> bool:
+        """
+        Make sure a server is connected before one of its tools is called.
+
+        Waits for an in-flight background connection, or connects a server whose
+        tools were served from the schema cache on its first use.
+
+        Args:
+            name: Name of the server
+
+        Returns:
+            Boolean indicating whether the server is connected
+        """
+        server = self.get_server(name)
+        if not server:
+            return False
+
+        task = self._connect_tasks.get(name)
+        if task:
+            await asyncio.shield(task)
+        elif name in self._lazy_servers:
+            await self.connect_server(name)
+
+        return server in self._connected_servers
+
+    async def wait_for_connections(self) -> None:
+        """Wait for all background connections to finish."""
+        if self._connect_tasks:
+            await asyncio.gather(*self._connect_tasks.values(), return_exceptions=True)
+
     @property
     def connected_servers(self) -> list["McpServer"]:
         """Get the list of successfully connected servers."""
@@ -236,44 +309,42 @@ class McpServerManager:
 
     @classmethod
     async def from_servers(
-        cls, servers: list[McpServer], io=None, verbose: bool = False
+        cls,
+        servers: list[McpServer],
+        io=None,
+        verbose: bool = False,
+        schema_cache: McpSchemaCache | None = None,
     ) -> "McpServerManager":
         """
         Create an MCP Server Manager from a list of servers it should manage.
-        Automatically connects if the server is set to auto connect (by default it is)
+
+        Servers that are set to auto connect (by default they are) do not block startup:
+        servers with tool schemas in the on-disk cache get their cached tools right away
+        and connect lazily on their first tool call, all others connect concurrently
+        in the background and their tools become available once connected.
         """
-        mcp_manager = cls(servers=[], io=io, verbose=verbose)
-
-        async def add_server_with_retry(
-            server: McpServer, connect: bool = True, max_retries: int = 3
-        ) -> tuple[McpServer, bool]:
-            """Try to add and connect to a server with retries."""
-            if not connect:
-                success = await mcp_manager.add_server(server, connect=False)
-                return (server, success)
-
-            for _attempt in range(max_retries):
-                success = await mcp_manager.add_server(server, connect=True)
-                if success:
-                    return (server, True)
-            return (server, False)
-
-        tasks = []
+        if schema_cache is None:
+            schema_cache = McpSchemaCache()
+        mcp_manager = cls(servers=[], io=io, verbose=verbose, schema_cache=schema_cache)
+
         for server in servers:
-            auto_connect = server.config.get("enabled", True)
-            tasks.append(add_server_with_retry(server, connect=auto_connect))
+            added = await mcp_manager.add_server(server, connect=False)
+            if not added or not server.config.get("enabled", True):
+                continue
 
-        results = await asyncio.gather(*tasks)
-        for server, did_connect in results:
-            if not did_connect and server.name not in ["unnamed-server", "Local"]:
-                io.tool_warning(
-                    f"MCP tool initialization failed after multiple retries: {server.name}"
-                )
+            cached_tools = None if isinstance(server, LocalServer) else schema_cache.load(server)
+            if cached_tools is not None:
+                mcp_manager._server_tools[server.name] = cached_tools
+                mcp_manager._lazy_servers.add(server.name)
+            else:
+                mcp_manager._start_background_connect(server)
 
         if verbose:
+            # Listing the tools of every server needs their connections to finish
+            await mcp_manager.wait_for_connections()
             io.tool_output("MCP servers configured:")
 
-            for server, _ in results:
+            for server in servers:
                 io.tool_output(f"  - {server.name}")
 
                 for tool in mcp_manager.get_server_tools(server.name):
@@ -0,0 +1,141 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class McpSessionPool:
+    """
+    A small pool of MCP sessions for a single server.
+
+    Tool calls that the server config declares safe (via `parallel_tools`) are
+    pipelined: up to `max_concurrency` of them may be in flight at once, spread
+    over idle pooled sessions or multiplexed on the least loaded one. All other
+    calls keep the historical behaviour of running one at a time, in order.
+
+    Server config options:
+        max_concurrency: Maximum number of in-flight calls to the server (default 4)
+        pool_size: Maximum number of sessions opened to the server (default 1)
+        parallel_tools: List of tool names safe to run concurrently, or true for all
+    """
+
+    def __init__(self, server, max_concurrency=4, pool_size=1, parallel_tools=None):
+        self.server = server
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.pool_size = max(1, int(pool_size))
+        if parallel_tools is True:
+            self.parallel_tools = True
+        else:
+            self.parallel_tools = {name.lower() for name in parallel_tools or []}
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._serial_lock = asyncio.Lock()
+        # Guards connecting the primary session and reserving slots for new ones
+        self._lock = asyncio.Lock()
+        self._primary = None
+        self._extra_sessions = []
+        self._opening = 0  # Pooled sessions being opened, counted against pool_size
+        self._load = {}
+
+    @classmethod
+    def from_config(cls, server, config):
+        if not isinstance(config, dict):
+            config = {}
+        return cls(
+            server,
+            max_concurrency=config.get("max_concurrency", 4),
+            pool_size=config.get("pool_size", 1),
+            parallel_tools=config.get("parallel_tools"),
+        )
+
+    def is_parallel_safe(self, tool_name):
+        if self.parallel_tools is True:
+            return True
+        return tool_name.lower() in self.parallel_tools
+
+    @property
+    def sessions(self):
+        sessions = [self._primary] if self._primary is not None else []
+        return sessions + self._extra_sessions
+
+    async def connect(self):
+        """Ensure the server's primary session is connected and return it."""
+        self._primary = await self.server.connect()
+        return self._primary
+
+    def _least_loaded(self):
+        return min(self.sessions, key=lambda s: self._load.get(id(s), 0))
+
+    async def _acquire_session(self):
+        """Pick a session for a call and count the call as in flight on it."""
+        open_pooled_session = getattr(self.server, "open_pooled_session", None)
+        async with self._lock:
+            if self._primary is None:
+                await self.connect()
+
+            session = next((s for s in self.sessions if not self._load.get(id(s))), None)
+            if session is None:
+                if len(self.sessions) + self._opening < self.pool_size and callable(
+                    open_pooled_session
+                ):
+                    # Reserve the slot before opening, so concurrent calls can't overfill the pool
+                    self._opening += 1
+                else:
+                    # Every session is busy, so pipeline on the least loaded one
+                    session = self._least_loaded()
+
+            if session is not None:
+                self._load[id(session)] = self._load.get(id(session), 0) + 1
+                return session
+
+        # Open the new session outside the lock, so calls on the others aren't held up
+        try:
+            session = await open_pooled_session()
+        except Exception:
+            session = None
+        finally:
+            self._opening -= 1
+
+        async with self._lock:
+            if session is not None:
+                self._extra_sessions.append(session)
+            else:
+                if self._primary is None:
+                    await self.connect()
+                session = self._least_loaded()
+            self._load[id(session)] = self._load.get(id(session), 0) + 1
+            return session
+
+    @asynccontextmanager
+    async def session(self, tool_name):
+        """Acquire a session slot for a single call to `tool_name`."""
+        if self.is_parallel_safe(tool_name):
+            async with self._semaphore:
+                async with self._use_session() as session:
+                    yield session
+        else:
+            async with self._serial_lock, self._semaphore:
+                async with self._use_session() as session:
+                    yield session
+
+    @asynccontextmanager
+    async def _use_session(self):
+        session = await self._acquire_session()
+        key = id(session)
+        try:
+            yield session
+        finally:
+            if key in self._load:
+                self._load[key] -= 1
+
+    def reset(self):
+        """Forget all sessions, e.g. after the server has been disconnected."""
+        self._primary = None
+        self._extra_sessions = []
+        self._load = {}
+
+
+def get_session_pool(server):
+    """Return the session pool of `server`, creating a default one if it has none."""
+    pool = getattr(server, "session_pool", None)
+    if isinstance(pool, McpSessionPool):
+        return pool
+    return McpSessionPool.from_config(server, getattr(server, "config", None))
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from cecli.helpers.file_searcher import handle_core_files
+
+
+class McpSchemaCache:
+    """
+    On-disk cache of the tool schemas advertised by MCP servers.
+
+    Entries are keyed by a hash of the server config, so any change to the
+    command, args, url, env, etc. of a server naturally invalidates its entry.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = handle_core_files(Path.home() / ".cecli" / "caches" / "mcp-tools")
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def config_hash(config):
+        """
+        Return a stable hash of a server config, or None if it cannot be cached.
+
+        Only configs that identify a real endpoint (a command or a url) are cached.
+        """
+        if not isinstance(config, dict):
+            return None
+        if not (config.get("command") or config.get("url")):
+            return None
+        try:
+            serialized = json.dumps(config, sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _cache_file(self, server):
+        config_hash = self.config_hash(getattr(server, "config", None))
+        if not config_hash:
+            return None
+        return self.cache_dir / f"{config_hash}.json"
+
+    def load(self, server):
+        """Return the cached tool schemas of `server`, or None if there are none."""
+        cache_file = self._cache_file(server)
+        if not cache_file or not cache_file.is_file():
+            return None
+        try:
+            data = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != self.VERSION or not isinstance(data.get("tools"), list):
+            return None
+        return data["tools"]
+
+    def save(self, server, tools):
+        cache_file = self._cache_file(server)
+        if not cache_file:
+            return
+        try:
+            payload = json.dumps(
+                {"version": self.VERSION, "name": server.name, "tools": tools}, default=str
+            )
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(".tmp")
+            tmp_file.write_text(payload, encoding="utf-8")
+            os.replace(tmp_file, cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"Could not cache tool schemas for MCP server {server.name}: {e}")
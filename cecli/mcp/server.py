@@ -19,6 +19,7 @@ from .oauth import (
     get_mcp_oauth_token,
     save_mcp_oauth_token,
 )
+from .pool import McpSessionPool
 
 
 class McpServer:
@@ -44,6 +45,9 @@ class McpServer:
         self.session = None
         self._cleanup_lock: asyncio.Lock = asyncio.Lock()
         self.exit_stack = AsyncExitStack()
+        # (owner task, close event) of each pooled session
+        self._pool_owners: list[tuple[asyncio.Task, asyncio.Event]] = []
+        self.session_pool = McpSessionPool.from_config(self, server_config)
 
     @property
     def is_connected(self) -> bool:
@@ -67,6 +71,16 @@ class McpServer:
         if self.verbose and self.io:
             self.io.tool_output(f"Establishing new connection to MCP server: {self.name}")
 
+        try:
+            self.session = await self._create_session(self.exit_stack)
+            return self.session
+        except Exception as e:
+            logging.error(f"Error initializing server {self.name}: {e}")
+            await self.disconnect()
+            raise
+
+    async def _create_session(self, exit_stack, errlog_mode="w"):
+        """Open a new initialized session whose resources are owned by `exit_stack`."""
         command = self.config["command"]
 
         env = {**os.environ, **self.config["env"]} if self.config.get("env") else None
@@ -77,26 +91,71 @@ class McpServer:
             env=env,
         )
 
+        os.makedirs(".cecli/logs/", exist_ok=True)
+        with open(".cecli/logs/mcp-errors.log", errlog_mode) as err_file:
+            stdio_transport = await exit_stack.enter_async_context(
+                stdio_client(server_params, errlog=err_file)
+            )
+            read, write = stdio_transport
+            session = await exit_stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            return session
+
+    async def open_pooled_session(self):
+        """
+        Open an additional session for the session pool.
+
+        Each pooled session is opened and closed by an owner task of its own, as
+        the anyio cancel scopes of the transport must be exited by the task that
+        entered them.
+
+        Returns:
+            ClientSession: The new session, or None if it could not be opened
+        """
+        ready = asyncio.get_running_loop().create_future()
+        closing = asyncio.Event()
+        owner = asyncio.create_task(self._own_pooled_session(ready, closing))
         try:
-            os.makedirs(".cecli/logs/", exist_ok=True)
-            with open(".cecli/logs/mcp-errors.log", "w") as err_file:
-                stdio_transport = await self.exit_stack.enter_async_context(
-                    stdio_client(server_params, errlog=err_file)
-                )
-                read, write = stdio_transport
-                session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-                await session.initialize()
-                self.session = session
-                return session
-        except Exception as e:
-            logging.error(f"Error initializing server {self.name}: {e}")
-            await self.disconnect()
+            session = await asyncio.shield(ready)
+        except asyncio.CancelledError:
+            closing.set()
             raise
 
+        if session is None:
+            await owner
+            return None
+        self._pool_owners.append((owner, closing))
+        return session
+
+    async def _own_pooled_session(self, ready, closing):
+        """Open a pooled session, hand it over through `ready` and keep it open until `closing`."""
+        try:
+            async with AsyncExitStack() as exit_stack:
+                session = await self._create_session(exit_stack, errlog_mode="a")
+                ready.set_result(session)
+                await closing.wait()
+        except Exception as e:
+            if ready.done():
+                logging.error(f"Error closing pooled session of server {self.name}: {e}")
+            else:
+                logging.error(f"Error opening pooled session for {self.name}: {e}")
+        finally:
+            if not ready.done():
+                ready.set_result(None)
+
+    async def _close_pooled_sessions(self):
+        owners = self._pool_owners
+        self._pool_owners = []
+        self.session_pool.reset()
+        for _, closing in owners:
+            closing.set()
+        await asyncio.gather(*(owner for owner, _ in owners), return_exceptions=True)
+
     async def disconnect(self):
         """Disconnect from the MCP server and clean up resources."""
         async with self._cleanup_lock:
             try:
+                await self._close_pooled_sessions()
                 await self.exit_stack.aclose()
             except (asyncio.CancelledError, RuntimeError, GeneratorExit):
                 # Expected during shutdown - anyio cancel scopes don't play
@@ -192,6 +251,13 @@ class HttpBasedMcpServer(McpServer):
         """
         raise NotImplementedError("Subclasses must implement _create_transport")
 
+    async def open_pooled_session(self):
+        """
+        HTTP servers multiplex concurrent requests over a single session, and each
+        extra session would need its own OAuth flow, so the pool is never grown.
+        """
+        return None
+
     async def connect(self):
         if self.session is not None:
             if self.verbose and self.io:
@@ -247,6 +313,7 @@ class HttpBasedMcpServer(McpServer):
             try:
                 if hasattr(self, "_oauth_shutdown"):
                     self._oauth_shutdown()
+                self.session_pool.reset()
                 await self.exit_stack.aclose()
             except (asyncio.CancelledError, RuntimeError, GeneratorExit):
                 # Expected during shutdown - anyio cancel scopes don't play
@@ -276,21 +343,22 @@ class SseServer(McpServer):
 
         logging.info(f"Establishing new connection to SSE MCP server: {self.name}")
         try:
-            url = self.config.get("url")
-            headers = self.config.get("headers", {})
-            sse_transport = await self.exit_stack.enter_async_context(
-                sse_client(url, headers=headers)
-            )
-            read, write = sse_transport
-            session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-            await session.initialize()
-            self.session = session
-            return session
+            self.session = await self._create_session(self.exit_stack)
+            return self.session
         except Exception as e:
             logging.error(f"Error initializing SSE server {self.name}: {e}")
             await self.disconnect()
             raise
 
+    async def _create_session(self, exit_stack, errlog_mode="w"):
+        url = self.config.get("url")
+        headers = self.config.get("headers", {})
+        sse_transport = await exit_stack.enter_async_context(sse_client(url, headers=headers))
+        read, write = sse_transport
+        session = await exit_stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        return session
+
 
 class LocalServer(McpServer):
     """
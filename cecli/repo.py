@@ -22,6 +22,7 @@ import cecli.prompts.utils.system as prompts
 from cecli import utils
 
 from .dump import dump  # noqa: F401
+from .helpers.file_events import file_events
 
 ANY_GIT_ERROR += [
     OSError,
@@ -128,6 +129,11 @@ class GitRepo:
         if cecli_ignore_file:
             self.cecli_ignore_file = Path(cecli_ignore_file)
 
+        # Edits to ignore files invalidate the ignore caches without waiting for a poll
+        self.file_events = file_events.subscribe(
+            root=self.root, match=self.is_ignore_file, callback=self.ignore_file_changed
+        )
+
     async def commit(self, fnames=None, context=None, message=None, coder_edits=False, coder=None):
         """
         Commit the specified files or all dirty files if none are specified.
@@ -502,15 +508,28 @@ class GitRepo:
         self.normalized_path[orig_path] = path
         return path
 
+    def is_ignore_file(self, path):
+        if os.path.basename(path) == ".gitignore":
+            return True
+        return bool(self.cecli_ignore_file) and path == os.path.abspath(self.cecli_ignore_file)
+
+    def ignore_file_changed(self, change, path):
+        self.ignore_file_cache = {}
+        self.cecli_ignore_last_check = 0
+
     def refresh_cecli_ignore(self):
         if not self.cecli_ignore_file:
             return
 
+        if self.file_events.is_fresh(self.cecli_ignore_file):
+            return
+
         current_time = time.time()
         if current_time - self.cecli_ignore_last_check < 1:
             return
 
         self.cecli_ignore_last_check = current_time
+        self.file_events.validate(self.cecli_ignore_file)
 
         if not self.cecli_ignore_file.is_file():
             return
@@ -17,6 +17,7 @@ from pygments.lexers import guess_lexer_for_filename
 from pygments.token import Token
 
 from cecli.dump import dump
+from cecli.helpers.file_events import file_events
 from cecli.helpers.similarity import (
     cosine_similarity,
     create_bigram_vector,
@@ -186,6 +187,9 @@ class RepoMap:
 
         self.tree_cache = {}
         self.tree_context_cache = {}
+        # mtimes reused while the file watcher reports no change, see get_mtime()
+        self.mtimes = {}
+        self.file_events = file_events.subscribe(root=self.root)
         self.map_cache = {}
         self.map_processing_time = 0
         self.last_map = None
@@ -352,10 +356,18 @@ class RepoMap:
         pass
 
     def get_mtime(self, fname):
+        if fname in self.mtimes and self.file_events.is_fresh(fname):
+            return self.mtimes[fname]
+
+        self.file_events.validate(fname)
         try:
-            return os.path.getmtime(fname)
+            mtime = os.path.getmtime(fname)
         except FileNotFoundError:
+            self.mtimes.pop(fname, None)
             self.io.tool_warning(f"File not found error: {fname}")
+            return
+        self.mtimes[fname] = mtime
+        return mtime
 
     def _compute_file_summary(self, tags, rel_fname):
         """Compute file-level summary from tags."""
@@ -2,6 +2,8 @@
 
 import json
 import os
+import threading
+import uuid
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -12,6 +14,13 @@ from cecli.helpers.conversation import (
     MessageTag,
 )
 
+# Journal size that, once exceeded along with the snapshot size, makes autosave write a new snapshot
+SNAPSHOT_MIN_BYTES = 1024 * 1024
+
+# Message tags stored in sessions, by their key in the session's chat_history
+SESSION_TAGS = {"done_messages": MessageTag.DONE.value, "cur_messages": MessageTag.CUR.value}
+FILE_KINDS = ("editable", "read_only", "read_only_stubs")
+
 
 class SessionManager:
     """Manages chat session saving, listing, and loading."""
@@ -34,8 +43,7 @@ class SessionManager:
             return False
 
         session_name = session_name.replace(".json", "")
-        session_dir = self._get_session_directory()
-        session_file = session_dir / f"{session_name}.json"
+        session_file = self._get_session_file(session_name)
 
         if session_file.exists():
             if output:
@@ -55,6 +63,10 @@ class SessionManager:
             self.io.tool_error(f"Error saving session: {e}")
             return False
 
+    def journal(self, session_name: str) -> "SessionJournal":
+        """Journal that autosaves the current session as `session_name`."""
+        return SessionJournal(self, session_name)
+
     def list_sessions(self) -> List[Dict]:
         """List all saved sessions with metadata."""
         session_dir = self._get_session_directory()
@@ -67,8 +79,7 @@ class SessionManager:
         sessions = []
         for session_file in sorted(session_files, key=lambda x: x.stat().st_mtime, reverse=True):
             try:
-                with open(session_file, "r", encoding="utf-8") as f:
-                    session_data = json.load(f)
+                session_data = self._read_session_file(session_file)
 
                 session_info = {
                     "name": session_file.stem,
@@ -103,8 +114,7 @@ class SessionManager:
             return False
 
         try:
-            with open(session_file, "r", encoding="utf-8") as f:
-                session_data = json.load(f)
+            session_data = self._read_session_file(session_file)
         except Exception as e:
             self.io.tool_error(f"Error loading session: {e}")
             return False
@@ -117,8 +127,40 @@ class SessionManager:
         # Apply session data
         return self._apply_session_data(session_data, session_file)
 
-    def _build_session_data(self, session_name) -> Dict:
-        """Build session data dictionary from current coder state."""
+    def _get_session_file(self, session_name: str) -> Path:
+        return self._get_session_directory() / f"{session_name}.json"
+
+    def _read_session_file(self, session_file: Path) -> Dict:
+        """Session data of a session file, with its journal replayed on top."""
+        with open(session_file, "r", encoding="utf-8") as f:
+            session_data = json.load(f)
+        return replay_journal(session_data, journal_path(session_file))
+
+    def _build_session_data(self, session_name, tag_messages=None) -> Dict:
+        """
+        Build session data dictionary from current coder state.
+
+        `tag_messages` maps the chat_history keys to the BaseMessages to store,
+        for callers that need the exact messages saved, e.g. to record their ids.
+        """
+        if tag_messages is None:
+            # Get CUR and DONE messages from ConversationManager
+            chat_history = {
+                "done_messages": ConversationManager.get_messages_dict(MessageTag.DONE),
+                "cur_messages": ConversationManager.get_messages_dict(MessageTag.CUR),
+            }
+        else:
+            chat_history = {
+                key: [msg.to_dict() for msg in messages] for key, messages in tag_messages.items()
+            }
+
+        return {
+            **self._build_session_meta(session_name),
+            "chat_history": chat_history,
+            "files": self._build_file_lists(),
+        }
+
+    def _build_file_lists(self) -> Dict:
         # Get relative paths for all files
         editable_files = [
             self.coder.get_rel_fname(abs_fname) for abs_fname in self.coder.abs_fnames
@@ -130,7 +172,14 @@ class SessionManager:
             self.coder.get_rel_fname(abs_fname)
             for abs_fname in self.coder.abs_read_only_stubs_fnames
         ]
+        return {
+            "editable": editable_files,
+            "read_only": read_only_files,
+            "read_only_stubs": read_only_stubs_files,
+        }
 
+    def _build_session_meta(self, session_name) -> Dict:
+        """Everything in the session data but the messages and files."""
         # Capture todo list content so it can be restored with the session
         todo_content = None
         try:
@@ -142,10 +191,6 @@ class SessionManager:
         except Exception as e:
             self.io.tool_warning(f"Could not read todo list file: {e}")
 
-        # Get CUR and DONE messages from ConversationManager
-        cur_messages = ConversationManager.get_messages_dict(MessageTag.CUR)
-        done_messages = ConversationManager.get_messages_dict(MessageTag.DONE)
-
         return {
             "version": 1,
             "session_name": session_name,
@@ -154,15 +199,6 @@ class SessionManager:
             "editor_model": self.coder.main_model.editor_model.name,
             "editor_edit_format": self.coder.main_model.editor_edit_format,
             "edit_format": self.coder.edit_format,
-            "chat_history": {
-                "done_messages": done_messages,
-                "cur_messages": cur_messages,
-            },
-            "files": {
-                "editable": editable_files,
-                "read_only": read_only_files,
-                "read_only_stubs": read_only_stubs_files,
-            },
             "settings": {
                 "auto_commits": self.coder.auto_commits,
                 "auto_lint": self.coder.auto_lint,
@@ -305,3 +341,210 @@ class SessionManager:
         except Exception as e:
             self.io.tool_error(f"Error applying session data: {e}")
             return False
+
+
+class SessionJournal:
+    """
+    Append-only journal of a session on top of its last snapshot.
+
+    The snapshot is the regular session file. Message changes reported by
+    ConversationManager, file add/drop events and setting changes are appended
+    to a journal next to it, so a save only writes what changed since the last
+    one. Once the journal outgrows both the snapshot and SNAPSHOT_MIN_BYTES, the
+    next save writes a new snapshot and starts an empty journal, which bounds
+    the replay when the session is loaded.
+    """
+
+    def __init__(self, manager: SessionManager, session_name: str):
+        self.manager = manager
+        self.session_name = session_name
+        self.snapshot_file = manager._get_session_file(session_name)
+        self.journal_file = journal_path(self.snapshot_file)
+
+        self._lock = threading.Lock()
+        self._pending = []  # (event, message) reported since the last save
+        self._snapshot_stat = None  # (mtime_ns, size) of the snapshot this journal continues
+        self._journal_size = 0
+        self._files = None  # File lists as of the last save
+        self._meta = None  # Session meta data as of the last save
+        ConversationManager.add_observer(self)
+
+    def conversation_changed(self, event, message):
+        if message is not None and message.tag not in SESSION_TAGS.values():
+            return
+        with self._lock:
+            self._pending.append((event, message))
+
+    def save(self) -> bool:
+        """Append the changes since the last save, or write a new snapshot."""
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, []
+
+            if self._needs_snapshot():
+                self._write_snapshot()
+                return True
+
+            records = [self._message_record(event, message) for event, message in pending]
+            files = self.manager._build_file_lists()
+            for kind in FILE_KINDS:
+                old, new = set(self._files[kind]), set(files[kind])
+                records += [{"op": "add_file", "kind": kind, "path": p} for p in sorted(new - old)]
+                records += [{"op": "drop_file", "kind": kind, "path": p} for p in sorted(old - new)]
+            meta = self.manager._build_session_meta(self.session_name)
+            if meta != self._meta:
+                records.append({"op": "meta", "data": meta})
+            self._files = files
+            self._meta = meta
+
+            if records:
+                self._append(records)
+            return True
+
+        except Exception as e:
+            self.manager.io.tool_error(f"Error saving session: {e}")
+            return False
+
+    def _needs_snapshot(self):
+        if self._files is None:
+            return True
+        try:
+            stat = self.snapshot_file.stat()
+        except OSError:
+            return True
+        if (stat.st_mtime_ns, stat.st_size) != self._snapshot_stat:
+            return True  # Replaced by a regular save, or removed
+        return self._journal_size > max(SNAPSHOT_MIN_BYTES, stat.st_size)
+
+    def _write_snapshot(self):
+        journal_id = uuid.uuid4().hex
+        # Read each tag once, so the stored messages and their ids can't disagree
+        tag_messages = {
+            key: ConversationManager.get_tag_messages(tag) for key, tag in SESSION_TAGS.items()
+        }
+        session_data = self.manager._build_session_data(self.session_name, tag_messages)
+        session_data["journal"] = {
+            "id": journal_id,
+            "message_ids": {
+                key: [msg.message_id for msg in messages] for key, messages in tag_messages.items()
+            },
+            "message_keys": {
+                key: [[msg.priority, msg.timestamp] for msg in messages]
+                for key, messages in tag_messages.items()
+            },
+        }
+
+        # The journal of an older snapshot is ignored on load, since its id doesn't match
+        tmp_file = self.snapshot_file.with_name(self.snapshot_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(session_data, f, indent=2)
+        os.replace(tmp_file, self.snapshot_file)
+        stat = self.snapshot_file.stat()
+        self._snapshot_stat = (stat.st_mtime_ns, stat.st_size)
+
+        with open(self.journal_file, "w", encoding="utf-8") as f:
+            self._journal_size = f.write(json.dumps({"op": "snapshot", "id": journal_id}) + "\n")
+
+        self._files = session_data["files"]
+        self._meta = {
+            key: value
+            for key, value in session_data.items()
+            if key not in ("chat_history", "files", "journal")
+        }
+
+    def _message_record(self, event, message):
+        if event == "reset":
+            return {"op": "reset"}
+        if event == "remove":
+            return {"op": "remove", "id": message.message_id}
+        return {
+            "op": "add",
+            "id": message.message_id,
+            "tag": message.tag,
+            "priority": message.priority,
+            "timestamp": message.timestamp,
+            "message": message.to_dict(),
+        }
+
+    def _append(self, records):
+        data = "".join(json.dumps(record) + "\n" for record in records)
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(data)
+        self._journal_size += len(data)
+
+
+def journal_path(session_file: Path) -> Path:
+    return Path(session_file).with_suffix(".journal.jsonl")
+
+
+def replay_journal(session_data: Dict, journal_file: Path) -> Dict:
+    """
+    Apply the journal of a snapshot to its session data.
+
+    The journal is streamed a record at a time, and only the messages that
+    survive to the end of it are kept. They are ordered by priority and
+    timestamp like ConversationManager orders them, so a message updated in
+    place moves to where the live conversation shows it. A journal that
+    belongs to another snapshot is ignored, as is a torn last record.
+    """
+    journal = session_data.get("journal")
+    if not isinstance(journal, dict) or not journal_file.exists():
+        return session_data
+
+    with open(journal_file, "r", encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            return session_data
+        if header.get("op") != "snapshot" or header.get("id") != journal.get("id"):
+            return session_data
+
+        chat_history = session_data.get("chat_history", {})
+        messages = {}  # message id -> (tag, message dict), in conversation order
+        sort_keys = {}  # message id -> (priority, timestamp), missing from older journals
+        for key, tag in SESSION_TAGS.items():
+            ids = journal.get("message_ids", {}).get(key, [])
+            keys = journal.get("message_keys", {}).get(key, [])
+            for message_id, message in zip(ids, chat_history.get(key, [])):
+                messages[message_id] = (tag, message)
+            for message_id, sort_key in zip(ids, keys):
+                sort_keys[message_id] = tuple(sort_key)
+        files = {
+            kind: dict.fromkeys(session_data.get("files", {}).get(kind, [])) for kind in FILE_KINDS
+        }
+        meta = {}
+
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # The last record was cut short, e.g. by a crash during a save
+
+            op = record.get("op")
+            if op == "add":
+                # An update moves the message, so it is re-inserted at the end
+                messages.pop(record["id"], None)
+                messages[record["id"]] = (record["tag"], record["message"])
+                if "timestamp" in record:
+                    sort_keys[record["id"]] = (record["priority"], record["timestamp"])
+            elif op == "remove":
+                messages.pop(record["id"], None)
+            elif op == "reset":
+                messages.clear()
+            elif op == "add_file":
+                files[record["kind"]][record["path"]] = None
+            elif op == "drop_file":
+                files[record["kind"]].pop(record["path"], None)
+            elif op == "meta":
+                meta = record["data"]
+
+    if all(message_id in sort_keys for message_id in messages):
+        messages = dict(sorted(messages.items(), key=lambda item: sort_keys[item[0]]))
+
+    session_data = {**session_data, **meta}
+    session_data["chat_history"] = {
+        key: [message for message_tag, message in messages.values() if message_tag == tag]
+        for key, tag in SESSION_TAGS.items()
+    }
+    session_data["files"] = {kind: list(paths) for kind, paths in files.items()}
+    return session_data
@@ -1,11 +1,15 @@
+import re
 import shutil
 from pathlib import Path
 
 import oslex
 
+from cecli.helpers.trigram_index import compile_pattern, filter_files
 from cecli.run_cmd import run_cmd_subprocess
 from cecli.tools.utils.base_tool import BaseTool
 
+MAX_OUTPUT_LINES = 50
+
 
 class Tool(BaseTool):
     NORM_NAME = "grep"
@@ -65,6 +69,87 @@ class Tool(BaseTool):
         else:
             return None, None
 
+    @classmethod
+    def _format_file_matches(cls, rel_fname, content, compiled, context_before, context_after):
+        """Format the matches in one file like `rg --heading -n`, with context lines."""
+        lines = content.splitlines()
+        match_lines = [i for i, line in enumerate(lines) if compiled.search(line)]
+        if not match_lines:
+            return []
+
+        # Merge the context windows of nearby matches into groups
+        groups = []
+        for i in match_lines:
+            start = max(0, i - context_before)
+            end = min(len(lines) - 1, i + context_after)
+            if groups and start <= groups[-1][1] + 1:
+                groups[-1][1] = max(groups[-1][1], end)
+            else:
+                groups.append([start, end])
+
+        matched = set(match_lines)
+        output = [rel_fname]
+        for group_index, (start, end) in enumerate(groups):
+            if group_index:
+                output.append("--")
+            for i in range(start, end + 1):
+                separator = ":" if i in matched else "-"
+                output.append(f"{i + 1}{separator}{lines[i]}")
+        return output
+
+    @classmethod
+    def _search_index(
+        cls,
+        coder,
+        search_index,
+        pattern,
+        file_pattern,
+        directory,
+        use_regex,
+        case_insensitive,
+        context_before,
+        context_after,
+    ):
+        """
+        Search the tracked files in-process using the trigram index.
+
+        Stops reading files as soon as the output limit is reached.
+        """
+        rel_fnames = sorted(
+            set(coder.get_all_relative_files()) | set(coder.get_inchat_relative_files())
+        )
+        rel_fnames = filter_files(rel_fnames, directory=directory, file_pattern=file_pattern)
+        compiled = compile_pattern(pattern, regex=use_regex, case_insensitive=case_insensitive)
+
+        coder.io.tool_output(f"⚙️ Searching index for: {pattern}")
+
+        output_lines = []
+        truncated = False
+        for rel_fname, content in search_index.search(
+            rel_fnames, pattern, regex=use_regex, case_insensitive=case_insensitive
+        ):
+            if output_lines:
+                output_lines.append("")
+            output_lines.extend(
+                cls._format_file_matches(
+                    rel_fname, content, compiled, max(0, context_before), max(0, context_after)
+                )
+            )
+            if len(output_lines) > MAX_OUTPUT_LINES:
+                truncated = True
+                break
+
+        if not output_lines:
+            return "No matches found."
+
+        output_content = "\n".join(output_lines[:MAX_OUTPUT_LINES])
+        if truncated:
+            return (
+                f"Found matches (truncated):\n```text\n{output_content}\n..."
+                " (more matches not shown)\n```"
+            )
+        return f"Found matches:\n```text\n{output_content}\n```"
+
     @classmethod
     def execute(
         cls,
@@ -79,7 +164,8 @@ class Tool(BaseTool):
     ):
         """
         Search for lines matching a pattern in files within the project repository.
-        Uses rg (ripgrep), ag (the silver searcher), or grep, whichever is available.
+        Uses the coder's trigram search index when available, otherwise rg (ripgrep),
+        ag (the silver searcher), or grep, whichever is available.
 
         Args:
             coder: The Coder instance.
@@ -99,6 +185,32 @@ class Tool(BaseTool):
             coder.io.tool_error("Not in a git repository.")
             return "Error: Not in a git repository."
 
+        get_search_index = getattr(coder, "get_search_index", None)
+        search_index = get_search_index() if get_search_index else None
+        if search_index is not None:
+            if not (Path(repo.root) / directory).is_dir():
+                coder.io.tool_error(f"Directory not found: {directory}")
+                return f"Error: Directory not found: {directory}"
+            try:
+                result_message = cls._search_index(
+                    coder,
+                    search_index,
+                    pattern,
+                    file_pattern,
+                    directory,
+                    use_regex,
+                    case_insensitive,
+                    context_before,
+                    context_after,
+                )
+            except re.error as e:
+                coder.io.tool_error(f"Invalid regex pattern '{pattern}': {e}")
+                return f"Error: Invalid regex pattern '{pattern}': {e}"
+
+            if coder.tui and coder.tui():
+                coder.io.tool_output(result_message)
+            return result_message
+
         tool_name, tool_path = cls._find_search_tool()
         if not tool_path:
             coder.io.tool_error("No search tool (rg, ag, grep) found in PATH.")
@@ -196,7 +308,7 @@ class Tool(BaseTool):
             result_message = ""
             if exit_status == 0:
                 # Limit output size if necessary
-                max_output_lines = 50  # Consider making this configurable
+                max_output_lines = MAX_OUTPUT_LINES
                 output_lines = output_content.splitlines()
                 if len(output_lines) > max_output_lines:
                     truncated_output = "\n".join(output_lines[:max_output_lines])
@@ -1,8 +1,12 @@
 import fnmatch
 import re
 
+from cecli.helpers.trigram_index import compile_pattern
 from cecli.tools.utils.base_tool import BaseTool
 
+# Stop searching once this many files match
+MAX_MATCHING_FILES = 100
+
 
 class Tool(BaseTool):
     NORM_NAME = "viewfilesmatching"
@@ -36,6 +40,17 @@ class Tool(BaseTool):
         },
     }
 
+    @classmethod
+    def _read_files(cls, coder, files):
+        """Yield (file, content) for every readable text file, without an index."""
+        for file in files:
+            try:
+                with open(coder.abs_root_path(file), "r", encoding="utf-8") as f:
+                    yield file, f.read()
+            except Exception:
+                # Skip files that can't be read (binary, etc.)
+                continue
+
     @classmethod
     def execute(cls, coder, pattern, file_pattern=None, regex=False):
         """
@@ -69,43 +84,36 @@ class Tool(BaseTool):
                 # Search all files if no pattern provided
                 files_to_search = coder.get_all_relative_files()
 
-            # Search for pattern in files
+            try:
+                compiled = compile_pattern(pattern, regex=regex)
+            except re.error as e:
+                coder.io.tool_error(f"Invalid regex pattern '{pattern}': {e}")
+                return f"Error: Invalid regex pattern '{pattern}': {e}"
+
+            # Search for pattern in files, letting the trigram index skip files that cannot match
             matches = {}
-            num_matches = 0
             inspecific_search_flag = False
 
-            for file in files_to_search:
-                abs_path = coder.abs_root_path(file)
-
-                if num_matches >= 25:
-                    inspecific_search_flag = True
-
-                try:
-                    if coder.repo.ignored_file(abs_path):
-                        continue
-
-                    with open(abs_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        match_count = 0
-                        if regex:
-                            try:
-                                matches_found = re.findall(pattern, content)
-                                match_count = len(matches_found)
-                            except re.error as e:
-                                # Handle invalid regex patterns gracefully
-                                coder.io.tool_error(f"Invalid regex pattern '{pattern}': {e}")
-                                # Skip this file for this search if regex is invalid
-                                continue
-                        else:
-                            # Exact string matching
-                            match_count = content.count(pattern)
-
-                        if match_count > 0:
-                            matches[file] = match_count
-                            num_matches += 1
-                except Exception:
-                    # Skip files that can't be read (binary, etc.)
-                    pass
+            search_index = coder.get_search_index()
+            if search_index is not None:
+                found = search_index.search(files_to_search, pattern, regex=regex)
+            else:
+                found = cls._read_files(coder, files_to_search)
+
+            for file, content in found:
+                if coder.repo and coder.repo.ignored_file(coder.abs_root_path(file)):
+                    continue
+
+                match_count = len(compiled.findall(content))
+                if match_count > 0:
+                    matches[file] = match_count
+
+                if len(matches) >= MAX_MATCHING_FILES:
+                    # Stop reading files once the search is clearly too broad
+                    break
+
+            if len(matches) >= 25:
+                inspecific_search_flag = True
 
             # Return formatted text instead of adding to context
             if matches:
@@ -114,14 +122,16 @@ class Tool(BaseTool):
                 match_list = [f"{file} ({count} matches)" for file, count in sorted_matches]
 
                 if len(matches) > 10:
+                    num_files = str(len(matches))
+                    if len(matches) >= MAX_MATCHING_FILES:
+                        num_files += "+"
                     result = (
-                        f"Found '{pattern}' in {len(matches)} files:"
+                        f"Found '{pattern}' in {num_files} files:"
                         f" {', '.join(match_list[:10])} and {len(matches) - 10} more"
-                        "\nTry more specific search terms going forward"
-                        if inspecific_search_flag
-                        else ""
                     )
-                    coder.io.tool_output(f"🔍 Found '{pattern}' in {len(matches)} files")
+                    if inspecific_search_flag:
+                        result += "\nTry more specific search terms going forward"
+                    coder.io.tool_output(f"🔍 Found '{pattern}' in {num_files} files")
                 else:
                     result = f"Found '{pattern}' in {len(matches)} files: {', '.join(match_list)}"
                     coder.io.tool_output(
@@ -9,6 +9,7 @@ import weakref
 
 from .app import TUI
 from .io import TextualInputOutput
+from .output_queue import OutputQueue
 from .worker import CoderWorker
 
 __all__ = ["TUI", "TextualInputOutput", "CoderWorker", "create_tui_io", "launch_tui"]
@@ -24,7 +25,7 @@ def create_tui_io(args, editing_mode):
     Returns:
         Tuple of (io, output_queue, input_queue)
     """
-    output_queue = queue.Queue()
+    output_queue = OutputQueue()
     input_queue = queue.Queue()
 
     io = TextualInputOutput(
@@ -3,6 +3,8 @@
 import concurrent.futures
 import json
 import queue
+import threading
+import time
 
 from textual import events
 from textual.app import App, ComposeResult
@@ -11,6 +13,8 @@ from textual.app import App, ComposeResult
 from textual.theme import Theme
 
 from cecli.editor import pipe_editor
+from cecli.helpers.file_events import file_events
+from cecli.helpers.symbol_index import SymbolIndex, collect_symbols
 from cecli.io import CommandCompletionException
 
 from .widgets import (
@@ -25,6 +29,9 @@ from .widgets import (
 )
 from .widgets.output import CostUpdate
 
+# Seconds of each output tick spent handling worker messages, the rest are left for the next
+OUTPUT_FRAME_BUDGET = 0.03
+
 
 class TUI(App):
     """Main Textual application for cecli TUI."""
@@ -44,9 +51,11 @@ class TUI(App):
         self.output_queue = output_queue
         self.input_queue = input_queue
         self.args = args  # Store args for _get_config
-        # Cache for code symbols (functions, classes, variables)
-        self._symbols_cache = None
-        self._symbols_files_hash = None
+        # Completion index of code symbols and project paths, built off the UI thread
+        self.symbol_index = SymbolIndex()
+        self._symbols_key = None  # What the index was built from, see _refresh_symbol_index()
+        self._symbols_building = False
+        self._symbol_events = file_events.subscribe()
         self._mouse_hold_timer = None
         self._currently_generating = False
 
@@ -213,6 +222,7 @@ class TUI(App):
         # Default settings for the "other" section
         default_other = {
             "render_markdown": False,
+            "output_max_lines": 5000,
         }
 
         # Merge default other settings with user-provided settings
@@ -263,7 +273,9 @@ class TUI(App):
 
         # Simple vertical layout - no header, footer has all info
         # Git info loaded in on_mount to avoid blocking startup
-        yield OutputContainer(id="output")
+        yield OutputContainer(
+            id="output", max_rendered_lines=self.tui_config["other"]["output_max_lines"]
+        )
         yield StatusBar(id="status-bar")
         yield InputContainer(
             InputArea(history_file=history_file, id="input"),
@@ -313,6 +325,8 @@ class TUI(App):
 
         self.begin_capture_print(output_container, stdout=True, stderr=True)
 
+        # Output put by the app itself must never wait for the app, see OutputQueue
+        self.output_queue.consumer = threading.current_thread()
         self.set_interval(0.05, self.check_output_queue)
         self.worker.start()
         self.query_one("#input").focus()
@@ -322,6 +336,7 @@ class TUI(App):
 
         # Load git info in background to avoid blocking startup
         self.call_later(self._load_git_info)
+        self._refresh_symbol_index()
 
     def on_mouse_down(self, event: events.MouseDown) -> None:
         """Handle mouse down events to start the selection hint timer."""
@@ -422,16 +437,17 @@ class TUI(App):
                 else:
                     footer.update_git("No Repo", 0)
 
-    def check_output_queue(self):
-        """Process messages from coder worker."""
-        try:
-            while True:
+    async def check_output_queue(self):
+        """Process messages from coder worker, within a time budget per tick."""
+        deadline = time.monotonic() + OUTPUT_FRAME_BUDGET
+        while time.monotonic() < deadline:
+            try:
                 msg = self.output_queue.get_nowait()
-                self.handle_output_message(msg)
-        except queue.Empty:
-            pass
+            except queue.Empty:
+                break
+            await self.handle_output_message(msg)
 
-    def handle_output_message(self, msg):
+    async def handle_output_message(self, msg):
         """Route output messages to appropriate handlers."""
         msg_type = msg["type"]
 
@@ -447,13 +463,13 @@ class TUI(App):
             output_container.add_tool_result(msg["text"])
         elif msg_type == "start_response":
             # Start a new LLM response with streaming
-            self.run_worker(self._start_response())
+            await self._start_response()
         elif msg_type == "stream_chunk":
-            # Stream a chunk of LLM response
-            self.run_worker(self._stream_chunk(msg["text"]))
+            # Stream a chunk of LLM response, chunks are merged per tick by OutputQueue
+            await self._stream_chunk(msg["text"])
         elif msg_type == "end_response":
             # End the current LLM response
-            self.run_worker(self._end_response())
+            await self._end_response()
         elif msg_type == "start_task":
             self.start_task(msg["task_id"], msg["title"], msg.get("task_type"))
         elif msg_type == "confirmation":
@@ -462,6 +478,8 @@ class TUI(App):
             self.update_spinner(msg)
         elif msg_type == "ready_for_input":
             self.enable_input(msg)
+            # The turn may have edited or added files
+            self._refresh_symbol_index(force=True)
             footer = self.query_one(MainFooter)
             footer.stop_spinner()
         elif msg_type == "error":
@@ -775,73 +793,47 @@ class TUI(App):
     # Commands that use path-based completion
     PATH_COMPLETION_COMMANDS = {"/read-only", "/read-only-stub", "/load", "/save"}
 
-    def _extract_symbols(self) -> set[str]:
-        """Extract code symbols from files in chat using Pygments."""
+    def _refresh_symbol_index(self, force=False):
+        """Rebuild the symbol index in the background if the chat files or any file changed."""
         coder = self.worker.coder
+        if coder is None:
+            return
 
-        # Get current files in chat
         inchat_files = []
-        if hasattr(coder, "abs_fnames"):
-            inchat_files.extend(coder.abs_fnames)
-        if hasattr(coder, "abs_read_only_fnames"):
-            inchat_files.extend(coder.abs_read_only_fnames)
-
-        # Check if cache is still valid
-        files_hash = hash(tuple(sorted(inchat_files)))
-        if self._symbols_cache is not None and self._symbols_files_hash == files_hash:
-            return self._symbols_cache
-
-        symbols = set()
+        try:
+            inchat_files.extend(getattr(coder, "abs_fnames", ()))
+            inchat_files.extend(getattr(coder, "abs_read_only_fnames", ()))
+        except RuntimeError:
+            # Changed by the coder thread while copying, try again on the next keystroke
+            return
+        inchat_files = sorted(inchat_files)
 
-        # Also add filenames as completable symbols
-        if hasattr(coder, "get_inchat_relative_files"):
-            symbols.update(coder.get_inchat_relative_files())
-        if hasattr(coder, "get_all_relative_files"):
-            # Add all project files too
-            symbols.update(coder.get_all_relative_files())
+        key = (id(coder), tuple(inchat_files), self._symbol_events.generation)
+        if self._symbols_building:
+            if force or key != self._symbols_key:
+                self._symbols_key = None  # Build again once the running build is done
+            return
+        if key == self._symbols_key and not force:
+            return
 
-        # Limit files to tokenize for performance
-        files_to_process = inchat_files[:30]
+        self._symbols_building = True
+        self._symbols_key = key
 
-        try:
-            from pygments.lexers import guess_lexer_for_filename
-            from pygments.token import Token
-        except ImportError:
-            # Pygments not available, just return filenames
-            self._symbols_cache = symbols
-            self._symbols_files_hash = files_hash
-            return symbols
-
-        for fname in files_to_process:
+        def build():
             try:
-                with open(fname, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
-
-                lexer = guess_lexer_for_filename(fname, content)
-                tokens = lexer.get_tokens(content)
-
-                for token_type, token_value in tokens:
-                    # Extract identifiers (function names, class names, variables)
-                    if token_type in Token.Name and len(token_value) > 1:
-                        symbols.add(token_value)
+                self.symbol_index = SymbolIndex(collect_symbols(coder, inchat_files))
             except Exception:
-                continue
+                self._symbols_key = None
+            finally:
+                self._symbols_building = False
 
-        self._symbols_cache = symbols
-        self._symbols_files_hash = files_hash
-        return symbols
+        threading.Thread(target=build, daemon=True).start()
 
     def _get_symbol_completions(self, prefix: str) -> list[str]:
         """Get symbol completions for @ mentions."""
-        symbols = self._extract_symbols()
-        prefix_lower = prefix.lower()
-
-        if prefix:
-            matches = [s for s in symbols if prefix_lower in s.lower()]
-        else:
-            matches = list(symbols)
-
-        return sorted(matches)[:50]
+        # Search the current index right away, a stale one is refreshed for later keystrokes
+        self._refresh_symbol_index()
+        return self.symbol_index.search(prefix, limit=50)
 
     def _get_path_completions(self, prefix: str) -> list[str]:
         """Get filesystem path completions relative to coder root."""
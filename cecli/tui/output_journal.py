@@ -0,0 +1,86 @@
+"""On-disk log of the TUI output, so only a window of it needs to stay rendered in memory."""
+
+import json
+import tempfile
+from array import array
+
+from rich.markdown import Markdown
+from rich.padding import Padding
+from rich.text import Text
+
+
+class OutputJournal:
+    """Append-only log of output entries in an anonymous temporary file."""
+
+    def __init__(self):
+        self._file = None
+        self._offsets = array("Q")  # Start of each entry in the file
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def append(self, record):
+        """Store `record`, a dict from serialize(), and return its index."""
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        data = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        self._file.seek(0, 2)
+        self._offsets.append(self._file.tell())
+        self._file.write(data)
+        return len(self._offsets) - 1
+
+    def read(self, index):
+        self._file.flush()
+        self._file.seek(self._offsets[index])
+        return json.loads(self._file.readline())
+
+    def clear(self):
+        self._offsets = array("Q")
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._offsets = array("Q")
+
+
+def serialize(content, console):
+    """Raw text plus style metadata of a renderable written to the output."""
+    if isinstance(content, str):
+        return {"kind": "str", "text": content}
+    if isinstance(content, Markdown):
+        return {"kind": "markdown", "text": content.markup}
+    if isinstance(content, Text):
+        return {"kind": "text", "text": content.markup, "style": str(content.style or "")}
+    if isinstance(content, Padding):
+        return {
+            "kind": "padding",
+            "pad": [content.top, content.right, content.bottom, content.left],
+            "expand": content.expand,
+            "inner": serialize(content.renderable, console),
+        }
+
+    # Anything else is kept as the ANSI text it renders to
+    with console.capture() as capture:
+        console.print(content)
+    return {"kind": "ansi", "text": capture.get().removesuffix("\n")}
+
+
+def deserialize(record):
+    """Renderable of a record made by serialize()."""
+    kind = record["kind"]
+    if kind == "str":
+        return record["text"]
+    if kind == "markdown":
+        return Markdown(record["text"])
+    if kind == "text":
+        text = Text.from_markup(record["text"])
+        if record["style"]:
+            text.style = record["style"]
+        return text
+    if kind == "padding":
+        return Padding(deserialize(record["inner"]), tuple(record["pad"]), expand=record["expand"])
+    return Text.from_ansi(record["text"])
@@ -0,0 +1,59 @@
+"""Output queue between the coder worker and the TUI app."""
+
+import queue
+import threading
+
+# Distinct messages the worker may get ahead of the app before put() waits
+MAX_PENDING = 500
+# Longest put() waits for the app, so a worker never hangs on an app that stopped reading
+MAX_PUT_WAIT = 1.0
+# Merged text messages are split past this size so one message never stalls a frame
+MAX_MERGED_TEXT = 64 * 1024
+
+# Message types whose consecutive texts can be merged into one message
+MERGEABLE = ("stream_chunk", "output")
+
+
+class OutputQueue(queue.Queue):
+    """
+    Queue of output messages for the TUI.
+
+    A text message is appended to the last queued message when both have the
+    same type (and task), so a fast stream turns into one chunk per frame
+    instead of thousands of tiny ones. Once MAX_PENDING distinct messages are
+    waiting, the worker's put() waits for the app to catch up.
+    """
+
+    def __init__(self, maxsize=MAX_PENDING):
+        super().__init__(maxsize)
+        self.consumer = None  # Thread of the app, which must never wait on itself
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self._merge(item):
+                return
+
+            wait = block and self.maxsize > 0 and threading.current_thread() is not self.consumer
+            if wait:
+                timeout = MAX_PUT_WAIT if timeout is None else min(timeout, MAX_PUT_WAIT)
+                self.not_full.wait_for(lambda: self._qsize() < self.maxsize, timeout)
+
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _merge(self, item):
+        if not self.queue or not isinstance(item, dict):
+            return False
+
+        last = self.queue[-1]
+        msg_type = item.get("type")
+        if msg_type not in MERGEABLE or last.get("type") != msg_type:
+            return False
+        if last.get("task_id") != item.get("task_id"):
+            return False
+        if len(last["text"]) + len(item["text"]) > MAX_MERGED_TEXT:
+            return False
+
+        self.queue[-1] = dict(last, text=last["text"] + item["text"])
+        return True
@@ -4,6 +4,8 @@ from prompt_toolkit.history import FileHistory
 from textual.message import Message
 from textual.widgets import TextArea
 
+from cecli.helpers.history_writer import history_writer, input_history_entry
+
 
 class InputArea(TextArea):
     """Input widget with autocomplete and history support."""
@@ -134,6 +136,7 @@ class InputArea(TextArea):
             self._history = []
             if self.history_file:
                 try:
+                    history_writer.flush(self.history_file)
                     # FileHistory returns most recent first, so reverse it
                     self._history = list(
                         reversed(list(FileHistory(self.history_file).load_history_strings()))
@@ -169,10 +172,7 @@ class InputArea(TextArea):
 
         # Save to file
         if self.history_file:
-            try:
-                FileHistory(self.history_file).append_string(text)
-            except (OSError, IOError):
-                pass
+            history_writer.append(self.history_file, input_history_entry(text), newline="")
 
         # Add to in-memory history
         history.append(text)
@@ -2,15 +2,26 @@
 
 import re
 import textwrap
+from collections import deque
 
+from rich.errors import MarkupError
 from rich.markdown import Markdown
+from rich.measure import measure_renderables
 from rich.padding import Padding
+from rich.segment import Segment
 from rich.style import Style as RichStyle
 from rich.text import Text
 from textual import events, on
+from textual.geometry import Size
 from textual.message import Message
+from textual.strip import Strip
 from textual.widgets import RichLog
 
+from ..output_journal import OutputJournal, deserialize, serialize
+
+# Rendered lines kept in memory by default, older output is re-rendered from the journal
+DEFAULT_MAX_RENDERED_LINES = 5000
+
 
 class CostUpdate(Message):
     """Message to update cost in footer."""
@@ -25,6 +36,10 @@ class OutputContainer(RichLog):
 
     Uses Textual's RichLog widget for efficient streaming and display
     of LLM responses and system messages.
+
+    Every write is also stored in an on-disk OutputJournal. Only a window of
+    entries is kept rendered, at most `max_rendered_lines` lines of it, and
+    entries are rendered again from the journal when scrolled into view.
     """
 
     DEFAULT_CSS = """
@@ -38,8 +53,14 @@ class OutputContainer(RichLog):
     _last_write_type = None
     _write_history = []
 
-    def __init__(self, **kwargs):
+    def __init__(self, max_rendered_lines=DEFAULT_MAX_RENDERED_LINES, **kwargs):
         super().__init__(**kwargs)
+        self.max_rendered_lines = max_rendered_lines
+        self.journal = OutputJournal()
+        # The rendered window is journal entries [_window_start, _window_end)
+        self._window_start = 0
+        self._window_sizes = deque()  # Rendered line count of each entry in the window
+        self._adjusting_window = False
         # Line buffer for streaming text to avoid word-per-line issue
         self._line_buffer = ""
         # Track if we're on the first line of the current response
@@ -137,6 +158,7 @@ class OutputContainer(RichLog):
         """Add a user message (displayed differently from LLM output)."""
         # User messages shown with > prefix in green color
         self.auto_scroll = True
+        self.show_latest()
         self.set_last_write_type("user")
 
         # Split text by newlines and process each line individually
@@ -259,10 +281,11 @@ class OutputContainer(RichLog):
 
     def _check_cost(self, text: str):
         """Extract and emit cost updates."""
-        match = re.search(r"\$(\d+\.?\d*)\s*session", text)
-        if match:
+        # Queued outputs may be merged, so the last report is the current one
+        matches = re.findall(r"\$(\d+\.?\d*)\s*session", text)
+        if matches:
             try:
-                self.post_message(CostUpdate(float(match.group(1))))
+                self.post_message(CostUpdate(float(matches[-1])))
             except (ValueError, AttributeError):
                 pass
 
@@ -275,6 +298,156 @@ class OutputContainer(RichLog):
         self._line_buffer = ""
         self.clear()
 
+    @property
+    def _window_end(self):
+        return self._window_start + len(self._window_sizes)
+
+    def write(self, content, width=None, expand=False, shrink=True, scroll_end=None, animate=False):
+        """Journal `content` and render it if the window shows the latest output."""
+        if not self._size_known:
+            # RichLog defers the write and calls write() again once the size is known
+            return super().write(content, width, expand, shrink, scroll_end, animate)
+
+        self.journal.append(serialize(content, self.app.console))
+        if self._window_end < len(self.journal) - 1:
+            # Older output is in view, the entry gets rendered once scrolled to
+            return self
+
+        before = len(self.lines)
+        super().write(content, width, expand, shrink, scroll_end, animate)
+        self._window_sizes.append(len(self.lines) - before)
+        self._trim_window()
+        return self
+
+    def clear(self):
+        self.journal.clear()
+        self._window_start = 0
+        self._window_sizes.clear()
+        return super().clear()
+
+    def show_latest(self):
+        """Move the window back to the latest output."""
+        if self._window_end == len(self.journal):
+            return
+        self.lines = []
+        self._window_sizes.clear()
+        self._window_start = len(self.journal)
+        self._load_before()
+        self.scroll_end(animate=False, immediate=False, x_axis=False)
+
+    def on_unmount(self):
+        self.journal.close()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if self._adjusting_window or not self._size_known:
+            return
+
+        margin = max(self.size.height, 1)
+        if new_value < margin and self._window_start > 0:
+            self._load_before()
+        elif new_value + 2 * margin > len(self.lines) and self._window_end < len(self.journal):
+            self._load_after()
+
+    def _page_lines(self):
+        return max(min(4 * self.size.height, self.max_rendered_lines // 3), 1)
+
+    def _render_entry(self, index):
+        """Render journal entry `index` into strips, the way RichLog.write() does."""
+        renderable = self._make_renderable(deserialize(self.journal.read(index)))
+        console = self.app.console
+        options = console.options
+        if isinstance(renderable, Text) and not self.wrap:
+            options = options.update(overflow="ignore", no_wrap=True)
+
+        width = measure_renderables(console, options, [renderable]).maximum
+        width = max(min(width, self.scrollable_content_region.width), self.min_width)
+        lines = list(Segment.split_lines(console.render(renderable, options.update_width(width))))
+        if not lines:
+            return [Strip.blank(width)]
+
+        strips = Strip.from_lines(lines)
+        for strip in strips:
+            strip.adjust_cell_length(width)
+        self._widest_line_width = max(
+            self._widest_line_width, max(strip.cell_length for strip in strips)
+        )
+        return strips
+
+    def _load_before(self):
+        """Render the entries before the window, keeping the view where it is."""
+        chunks = []
+        added = 0
+        while self._window_start > 0 and added < self._page_lines():
+            self._window_start -= 1
+            strips = self._render_entry(self._window_start)
+            chunks.append(strips)
+            self._window_sizes.appendleft(len(strips))
+            added += len(strips)
+
+        self.lines = [strip for strips in reversed(chunks) for strip in strips] + self.lines
+        self._window_changed(shift=added)
+        self._trim_back()
+        self._trim_front()
+
+    def _load_after(self):
+        """Render the entries after the window."""
+        added = 0
+        while self._window_end < len(self.journal) and added < self._page_lines():
+            strips = self._render_entry(self._window_end)
+            self.lines.extend(strips)
+            self._window_sizes.append(len(strips))
+            added += len(strips)
+
+        self._window_changed()
+        self._trim_window()
+
+    def _trim_window(self):
+        """Keep at most max_rendered_lines lines, dropping the oldest entries first."""
+        self._trim_front()
+        self._trim_back()
+
+    def _trim_front(self):
+        """Drop whole entries from the start of the window, never ones in view."""
+        # Following the output, everything above the end may go
+        keep_from = len(self.lines) if self.auto_scroll else int(self.scroll_y)
+        drop = 0
+        while (
+            len(self.lines) - drop > self.max_rendered_lines
+            and len(self._window_sizes) > 1
+            and drop + self._window_sizes[0] <= keep_from
+        ):
+            drop += self._window_sizes.popleft()
+            self._window_start += 1
+        if drop:
+            del self.lines[:drop]
+            self._window_changed(shift=-drop)
+
+    def _trim_back(self):
+        """Drop whole entries from the end of the window, never ones in view."""
+        keep_to = int(self.scroll_y) + self.size.height
+        dropped = False
+        while len(self.lines) > self.max_rendered_lines and len(self._window_sizes) > 1:
+            size = self._window_sizes[-1]
+            if len(self.lines) - size < keep_to:
+                break
+            self._window_sizes.pop()
+            del self.lines[-size:]
+            dropped = True
+        if dropped:
+            self._window_changed()
+
+    def _window_changed(self, shift=0):
+        self._line_cache.clear()
+        self.virtual_size = Size(self._widest_line_width, len(self.lines))
+        if shift:
+            self._adjusting_window = True
+            try:
+                self.scroll_y = max(0, self.scroll_y + shift)
+            finally:
+                self._adjusting_window = False
+        self.refresh()
+
     def set_last_write_type(self, type):
         if type and self._last_write_type and self._last_write_type != type:
             self.output("")
@@ -295,9 +468,7 @@ class OutputContainer(RichLog):
             if isinstance(text, str):
                 text = Markdown(text)
 
-        with self.app.console.capture() as capture:
-            self.app.console.print(text)
-        check = Text(capture.get()).plain
+        check = self._plain_line(text)
 
         # self.write(str(self._write_history))
         # self.write(repr(check))
@@ -324,6 +495,24 @@ class OutputContainer(RichLog):
         if len(self._write_history) > 5:
             self._write_history.pop(0)
 
+    def _plain_line(self, text):
+        """Plain text of a renderable as printed, without rendering it a second time."""
+        if isinstance(text, Padding):
+            return self._plain_line(text.renderable)
+        if isinstance(text, Markdown):
+            return text.markup + "\n"
+        if isinstance(text, Text):
+            return text.plain + "\n"
+        if isinstance(text, str):
+            try:
+                return Text.from_markup(text).plain + "\n"
+            except MarkupError:
+                return text + "\n"
+
+        with self.app.console.capture() as capture:
+            self.app.console.print(text)
+        return Text(capture.get()).plain
+
     @on(events.Print)
     def log_print(self, event: events.Print) -> None:
         """Writes the captured print output to the RichLog widget."""
@@ -1,5 +1,10 @@
+import hashlib
+import os
 import re
+import stat
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -9,8 +14,17 @@ from pathspec.patterns import GitWildMatchPattern
 from watchfiles import watch
 
 from cecli.dump import dump  # noqa
+from cecli.helpers.file_events import file_events
 from cecli.watch_prompts import watch_ask_prompt, watch_code_prompt
 
+# Max ms the watch blocks without changes. The first timeout tells the watch is ready,
+# later ones that the tree has gone quiet, which ends the debounce of AI comment scans
+WATCH_QUIET_MS = 200
+# Scan the pending changes anyway once they have waited this long (seconds)
+MAX_DEBOUNCE = 2.0
+SCAN_WORKERS = 4
+MAX_SCAN_SIZE = 1 * 1024 * 1024
+
 
 def load_gitignores(gitignore_paths: list[Path]) -> Optional[PathSpec]:
     """Load and parse multiple .gitignore files into a single PathSpec"""
@@ -80,6 +94,13 @@ class FileWatcher:
         self.changed_files = set()
         self.gitignores = gitignores
         self.is_running = False
+        self.armed = False  # Only look for AI comments while waiting for input
+        self.watched_roots = None  # Roots the running watch covers, see covers()
+        # path -> ((size, mtime), content hash, get_ai_comments() result)
+        self.ai_comments_cache = {}
+        self.scan_pool = ThreadPoolExecutor(
+            max_workers=SCAN_WORKERS, thread_name_prefix="cecli-watch"
+        )
 
         self.gitignore_spec = load_gitignores(
             [Path(g) for g in self.gitignores] if self.gitignores else []
@@ -92,6 +113,11 @@ class FileWatcher:
         path_obj = Path(path)
         path_abs = path_obj.absolute()
 
+        file_events.publish([(change_type.name, str(path_abs))])
+
+        if not self.armed:
+            return False
+
         if not path_abs.is_relative_to(self.root.absolute()):
             return False
 
@@ -104,19 +130,8 @@ class FileWatcher:
         ):
             return False
 
-        # Check file size before reading content
-        if path_abs.is_file() and path_abs.stat().st_size > 1 * 1024 * 1024:  # 1MB limit
-            return False
-
-        if self.verbose:
-            print("Checking", rel_path)
-
-        # Check if file contains AI markers
-        try:
-            comments, _, _ = self.get_ai_comments(str(path_abs))
-            return bool(comments)
-        except Exception:
-            return
+        # The file is scanned for AI comments once the changes settle, see scan_changes()
+        return True
 
     def get_roots_to_watch(self):
         """Determine which root paths to watch based on gitignore rules"""
@@ -132,6 +147,37 @@ class FileWatcher:
             return roots if roots else [str(self.root)]
         return [str(self.root)]
 
+    def covers(self, path):
+        """True if the running watch reports changes to `path`, see cecli.helpers.file_events"""
+        roots = self.watched_roots
+        if not roots:
+            return False
+        return any(path == root or path.startswith(root + os.sep) for root in roots)
+
+    def scan_changes(self, changes):
+        """
+        Scan the changed files for AI comments on the thread pool.
+
+        Takes a dict of path -> change type, returns the (change type, path) pairs
+        of the files that have AI comments.
+        """
+        paths = list(changes)
+        results = self.scan_pool.map(self.scan_file, paths)
+        return [(changes[path], path) for path, found in zip(paths, results) if found]
+
+    def scan_file(self, path):
+        """True if `path` is a regular file of a sane size with AI comments"""
+        try:
+            st = os.stat(path)
+            if not stat.S_ISREG(st.st_mode) or st.st_size > MAX_SCAN_SIZE:
+                return False
+            if self.verbose:
+                print("Checking", path)
+            line_nums, _, _ = self.get_ai_comments(path)
+            return bool(line_nums)
+        except Exception:
+            return False
+
     def handle_changes(self, changes):
         """Process the detected changes and update state"""
         if not changes:
@@ -143,7 +189,14 @@ class FileWatcher:
         return True
 
     def watch_files(self):
-        """Watch for file changes and process them"""
+        """
+        Watch for file changes and process them.
+
+        The watch keeps running between prompts to feed the cache invalidation bus,
+        AI comments are only acted on while armed.
+        """
+        pending = {}  # path -> change type
+        first_pending = None
         try:
             roots_to_watch = self.get_roots_to_watch()
 
@@ -152,26 +205,60 @@ class FileWatcher:
                 watch_filter=self.filter_func,
                 stop_event=self.stop_event,
                 ignore_permission_denied=True,
+                rust_timeout=WATCH_QUIET_MS,
+                yield_on_timeout=True,
             ):
-                if self.handle_changes(changes):
-                    return
+                if self.watched_roots is None:
+                    # The first yield means the watch is set up, so events can be trusted
+                    self.watched_roots = [os.path.abspath(root) for root in roots_to_watch]
+                    file_events.attach(self)
+
+                if not self.armed:
+                    pending = {}
+                    continue
+
+                # Coalesce changes per path until the tree goes quiet
+                for change, path in changes:
+                    pending[str(Path(path))] = change
+                if not pending:
+                    continue
+                if first_pending is None:
+                    first_pending = time.monotonic()
+                if changes and time.monotonic() - first_pending < MAX_DEBOUNCE:
+                    continue
+
+                batch, pending, first_pending = pending, {}, None
+                if self.handle_changes(self.scan_changes(batch)):
+                    self.armed = False
 
         except Exception as e:
             if self.verbose:
                 dump(f"File watcher error: {e}")
             raise e
+        finally:
+            file_events.detach(self)
+            self.watched_roots = None
 
     def start(self):
         """Start watching for file changes"""
-        self.stop_event = threading.Event()
         self.changed_files = set()
-
         self.is_running = True
+        self.armed = True
+
+        if self.watcher_thread and self.watcher_thread.is_alive():
+            return
+
+        self.stop_event = threading.Event()
         self.watcher_thread = threading.Thread(target=self.watch_files, daemon=True)
         self.watcher_thread.start()
 
     def stop(self):
+        """Stop acting on AI comments, the watch itself keeps feeding the invalidation bus"""
+        self.armed = False
+
+    def close(self):
         """Stop watching for file changes"""
+        self.armed = False
         if self.stop_event:
             self.stop_event.set()
         if self.watcher_thread:
@@ -253,12 +340,45 @@ class FileWatcher:
         return res
 
     def get_ai_comments(self, filepath):
-        """Extract AI comment line numbers, comments and action status from a file"""
+        """
+        Extract AI comment line numbers, comments and action status from a file.
+
+        Results are cached per file by size and mtime, and by content hash for files
+        that were rewritten unchanged.
+        """
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            self.ai_comments_cache.pop(filepath, None)
+            return None, None, None
+
+        key = (st.st_size, st.st_mtime_ns)
+        cached = self.ai_comments_cache.get(filepath)
+        if cached and cached[0] == key:
+            return cached[2]
+
+        content = self.io.read_text(filepath, silent=True)
+        if not content:
+            self.ai_comments_cache.pop(filepath, None)
+            return None, None, None
+
+        digest = hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16)
+        digest = digest.digest()
+        if cached and cached[1] == digest:
+            result = cached[2]
+        else:
+            result = self.find_ai_comments(content)
+        self.ai_comments_cache[filepath] = (key, digest, result)
+        return result
+
+    def find_ai_comments(self, content):
+        """Extract AI comment line numbers, comments and action status from file content"""
         line_nums = []
         comments = []
         has_action = None  # None, "!" or "?"
-        content = self.io.read_text(filepath, silent=True)
-        if not content:
+
+        # Every AI comment contains "ai", most files can be ruled out without the regex
+        if "ai" not in content.lower():
             return None, None, None
 
         for i, line in enumerate(content.splitlines(), 1):
@@ -309,7 +429,7 @@ def main():
                 watcher.changed_files = None
     except KeyboardInterrupt:
         print("\nStopped watching files")
-        watcher.stop()
+        watcher.close()
 
 
 if __name__ == "__main__":
@@ -49,6 +49,7 @@ def _install_stubs():
 _install_stubs()
 
 from cecli.helpers.background_commands import (  # noqa: E402
+    BackgroundCommandManager,
     BackgroundProcess,
     CircularBuffer,
 )
@@ -56,7 +57,7 @@ from cecli.helpers.background_commands import (  # noqa: E402
 
 def test_circular_buffer_basic_operations():
     """Test basic CircularBuffer operations: append, get_all, clear."""
-    buffer = CircularBuffer(max_size=10)
+    buffer = CircularBuffer(max_size=20)
 
     # Test append and get_all
     buffer.append("Hello")
@@ -83,9 +84,16 @@ def test_circular_buffer_max_size():
     buffer.append("12345")  # Exactly max_size
     buffer.append("67890")  # This should push out "12345"
 
-    # Buffer should contain both strings (2 elements, each 5 chars)
-    # deque with maxlen=5 will keep up to 5 elements, not 5 characters
-    assert buffer.get_all() == "1234567890"
+    assert buffer.get_all() == "67890"
+    assert buffer.size() == 5
+
+    # Older chunks are trimmed partially to stay within max_size
+    buffer.append("abc")
+    assert buffer.get_all() == "90abc"
+
+    # A single chunk larger than max_size keeps only its tail
+    buffer.append("x" * 20 + "END")
+    assert buffer.get_all() == "xxEND"
 
     # Test with many small chunks
     buffer.clear()
@@ -98,7 +106,7 @@ def test_circular_buffer_max_size():
 
 def test_circular_buffer_get_new_output():
     """Test CircularBuffer.get_new_output method."""
-    buffer = CircularBuffer(max_size=10)
+    buffer = CircularBuffer(max_size=20)
 
     # Add some initial content
     buffer.append("Hello")
@@ -179,3 +187,62 @@ def test_background_process_basic():
     success, output, exit_code = bg_process.stop()
     assert success is True
     assert exit_code == -1  # terminate() sets returncode to -1 in MockProcess
+
+
+def test_circular_buffer_new_output_after_trimming():
+    """Reads only return output still in the buffer, with positions that keep counting."""
+    buffer = CircularBuffer(max_size=8)
+    buffer.append("aaaa")
+    output, position = buffer.get_new_output(0)
+    assert (output, position) == ("aaaa", 4)
+
+    buffer.append("bbbb")
+    buffer.append("cccc")
+    output, position = buffer.get_new_output(position)
+    assert (output, position) == ("bbbbcccc", 12)
+
+    # Output that was dropped before being read is skipped
+    buffer.append("dddddd")
+    buffer.append("ee")
+    output, position = buffer.get_new_output(position)
+    assert (output, position) == ("dddddd" + "ee", 20)
+
+
+def test_circular_buffer_per_stream_offsets(tmp_path):
+    """Each stream can be read incrementally on its own, and spilled to a log file."""
+    log_file = tmp_path / "output.log"
+    buffer = CircularBuffer(max_size=100, spill_path=str(log_file))
+    buffer.append("out1\n")
+    buffer.append("err1\n", stream="stderr")
+    buffer.append("out2\n")
+
+    assert buffer.get_new_output(0, stream="stdout") == ("out1\nout2\n", 10)
+    assert buffer.get_new_output(0, stream="stderr") == ("err1\n", 5)
+
+    buffer.append("err2\n", stream="stderr")
+    assert buffer.get_new_output(5, stream="stderr") == ("err2\n", 10)
+    assert buffer.get_new_output(10, stream="stdout") == ("", 10)
+    assert buffer.get_all() == "out1\nerr1\nout2\nerr2\n"
+
+    buffer.close()
+    assert log_file.read_text() == "out1\nerr1\nout2\nerr2\n"
+
+
+def test_background_command_reads_both_streams_concurrently(tmp_path):
+    """A process flooding stderr must not stall while stdout is being read."""
+    script = "import sys; sys.stderr.write('e' * 200000); sys.stderr.flush(); print('done stdout')"
+    command = f'"{sys.executable}" -c "{script}"'
+    log_file = tmp_path / "full.log"
+    command_key = BackgroundCommandManager.start_background_command(
+        command, max_buffer_size=1000, log_file=str(log_file)
+    )
+    bg_process = BackgroundCommandManager._background_commands[command_key]
+
+    assert bg_process.wait(timeout=10) == 0
+    success, output, exit_code = BackgroundCommandManager.stop_background_command(command_key)
+
+    assert success is True
+    assert exit_code == 0
+    assert "done stdout" in output
+    assert len(output) <= 1000
+    assert len(log_file.read_text()) == 200000 + len("done stdout\n")
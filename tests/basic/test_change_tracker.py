@@ -0,0 +1,102 @@
+import random
+
+from cecli.change_tracker import ChangeTracker, apply_delta, make_delta
+
+
+def make_file(lines=500):
+    return "".join(f"line {i}: some content here\n" for i in range(lines))
+
+
+def edit(content, rng):
+    lines = content.splitlines(keepends=True)
+    i = rng.randrange(len(lines))
+    lines[i] = f"edited {rng.random()}\n"
+    if rng.random() < 0.3:
+        lines.insert(i, "inserted\n")
+    return "".join(lines)
+
+
+def test_delta_round_trip():
+    source = "a\nb\nc\n"
+    target = "a\nB\nc\nd"
+    assert apply_delta(source, make_delta(source, target)) == target
+    assert apply_delta(target, make_delta(target, source)) == source
+    assert apply_delta("x", make_delta("x", None)) is None
+    assert apply_delta(None, make_delta(None, "new file\n")) == "new file\n"
+
+
+def test_delta_only_diffs_the_edited_region():
+    source = make_file(5000)
+    lines = source.splitlines(keepends=True)
+    lines[2500] = "edited\n"
+    target = "".join(lines)
+    assert make_delta(source, target) == ((0, 2500), "edited\n", (2501, 5000))
+
+    rng = random.Random(1)
+    for _ in range(50):
+        target = edit(source, rng)
+        assert apply_delta(source, make_delta(source, target)) == target
+        assert apply_delta(target, make_delta(target, source)) == source
+
+
+def test_every_change_is_reconstructed_exactly():
+    rng = random.Random(0)
+    tracker = ChangeTracker()
+    content = make_file()
+    expected = {}
+    for _ in range(50):
+        new_content = edit(content, rng)
+        change_id = tracker.track_change("a.py", "replacetext", content, new_content)
+        expected[change_id] = (content, new_content)
+        content = new_content
+
+    for change_id, contents in expected.items():
+        assert tracker.get_change_contents(change_id) == contents
+
+    # Far less than 50 full copies of the file are held in memory
+    assert tracker.memory_usage < 3 * len(content)
+
+
+def test_undo_restores_original_after_external_modification():
+    tracker = ChangeTracker()
+    first = tracker.track_change("a.py", "insertblock", "one\n", "one\ntwo\n")
+    # The file changed outside the tracker before the next edit
+    second = tracker.track_change("a.py", "replacetext", "one\ntwo\nmanual\n", "ONE\ntwo\nmanual\n")
+
+    success, _, change = tracker.undo_change(second)
+    assert success
+    assert change["original"] == "one\ntwo\nmanual\n"
+
+    success, _, change = tracker.undo_change(first)
+    assert success
+    assert (change["original"], change["new"]) == ("one\n", "one\ntwo\n")
+
+    assert tracker.undo_change(first)[0] is False
+    assert tracker.get_last_change("a.py") is None
+
+
+def test_memory_cap_spills_old_deltas_to_disk():
+    rng = random.Random(1)
+    tracker = ChangeTracker(max_memory=20_000)
+    content = make_file(2000)
+    expected = {}
+    for _ in range(30):
+        new_content = edit(content, rng)
+        change_id = tracker.track_change("a.py", "replacetext", content, new_content)
+        expected[change_id] = (content, new_content)
+        content = new_content
+
+    assert tracker._spilled
+    for change_id, contents in expected.items():
+        assert tracker.get_change_contents(change_id) == contents
+
+
+def test_reused_change_id_replaces_the_change():
+    tracker = ChangeTracker()
+    tracker.track_change("a.py", "replacetext", "a\n", "b\n", change_id="fixed")
+    other = tracker.track_change("a.py", "replacetext", "b\n", "c\n")
+    tracker.track_change("a.py", "replacetext", "c\n", "d\n", change_id="fixed")
+
+    assert tracker.get_change_contents(other) == ("b\n", "c\n")
+    assert tracker.get_change_contents("fixed") == ("c\n", "d\n")
+    assert tracker.files_changed["a.py"] == [other, "fixed"]
@@ -1837,3 +1837,57 @@ This command will print 'Hello, World!' to the console."""
                 " (application/octet-stream)]"
             )
             assert result[0]["content"] == expected_content
+
+    async def test_speculative_compaction(self):
+        io = InputOutput(yes=True)
+        coder = await Coder.create(
+            self.GPT35,
+            None,
+            io,
+            enable_context_compaction=True,
+            context_compaction_max_tokens=100,
+            speculative_compaction=True,
+        )
+        coder.summarizer = MagicMock()
+        coder.summarizer.count_tokens = lambda msgs: sum(len(m["content"].split()) for m in msgs)
+        coder.summarizer.summarize_as_text = AsyncMock(return_value="SUMMARY")
+
+        def add(role, content):
+            ConversationManager.add_message({"role": role, "content": content}, MessageTag.CUR)
+
+        add("user", "start")
+        add("assistant", "word " * 50)
+        coder.start_speculative_compaction()
+        assert not coder.speculative_summaries  # Below the watermark
+
+        add("user", "word " * 30)
+        add("assistant", "done")
+        coder.start_speculative_compaction()
+        await coder.speculative_summaries[MessageTag.CUR][1]
+        assert coder.summarizer.summarize_as_text.await_count == 1
+
+        # The summary is swapped in and the newer messages are kept after it
+        add("user", "more " * 30)
+        add("assistant", "latest")
+        await coder.compact_context_if_needed()
+        assert coder.summarizer.summarize_as_text.await_count == 1
+        cur = [msg["content"] for msg in ConversationManager.get_messages_dict(MessageTag.CUR)]
+        assert cur[0] == "start"
+        assert cur[2] == "Here is a summary of our current goals:\nSUMMARY"
+        assert cur[-2:] == ["more " * 30, "latest"]
+        assert not coder.speculative_summaries
+
+        # A summary of history that has since changed is discarded
+        ConversationManager.clear_tag(MessageTag.CUR)
+        add("user", "start")
+        add("assistant", "word " * 80)
+        coder.summarizer.summarize_as_text.return_value = "STALE"
+        coder.start_speculative_compaction()
+        assert await coder.speculative_summaries[MessageTag.CUR][1] == "STALE"
+        ConversationManager.clear_tag(MessageTag.CUR)
+        add("user", "again")
+        add("assistant", "word " * 120)
+        coder.summarizer.summarize_as_text.return_value = "FRESH"
+        await coder.compact_context_if_needed()
+        cur = [msg["content"] for msg in ConversationManager.get_messages_dict(MessageTag.CUR)]
+        assert cur[2] == "Here is a summary of our current goals:\nFRESH"
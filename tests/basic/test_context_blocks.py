@@ -0,0 +1,101 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from cecli.coders import Coder
+from cecli.helpers.context_blocks import ContextBlockCache
+from cecli.helpers.file_events import MODIFIED, file_events
+from cecli.io import InputOutput
+from cecli.mcp import McpServerManager
+from cecli.models import Model
+from cecli.utils import GitTemporaryDirectory
+
+
+def test_block_is_regenerated_only_when_inputs_change():
+    cache = ContextBlockCache()
+    generate = MagicMock(side_effect=["first", "second"])
+    count_tokens = MagicMock(return_value=3)
+
+    assert cache.get("git_status", ("head", 1), generate, count_tokens) == ("first", 3)
+    assert cache.get("git_status", ("head", 1), generate, count_tokens) == ("first", 3)
+    assert cache.get("git_status", ("head", 2), generate, count_tokens) == ("second", 3)
+
+    assert generate.call_count == 2
+    assert count_tokens.call_count == 2
+    stats = cache.stats["git_status"]
+    assert (stats.hits, stats.misses) == (1, 2)
+    assert "git_status" in cache.format_report()
+
+
+def test_untracked_inputs_are_always_regenerated():
+    cache = ContextBlockCache()
+    generate = MagicMock(return_value="content")
+
+    cache.get("block", None, generate)
+    cache.get("block", None, generate)
+
+    assert generate.call_count == 2
+
+
+async def test_agent_coder_reuses_unchanged_blocks():
+    with GitTemporaryDirectory():
+        with open("a.py", "w") as f:
+            f.write("def foo():\n    pass\n")
+        io = InputOutput(yes=True, pretty=False)
+        coder = await Coder.create(
+            Model("gpt-3.5-turbo"),
+            "agent",
+            io,
+            fnames=["a.py"],
+            mcp_manager=McpServerManager([], io),
+        )
+        coder.allowed_context_blocks = {"environment_info", "symbol_outline"}
+
+        coder._calculate_context_block_tokens()
+        coder.tokens_calculated = False
+        coder._calculate_context_block_tokens()
+
+        stats = coder.context_block_cache.stats
+        assert (stats["symbol_outline"].hits, stats["symbol_outline"].misses) == (1, 1)
+
+        with open("a.py", "w") as f:
+            f.write("def bar():\n    pass\n")
+        mtime = os.path.getmtime("a.py") + 1
+        os.utime("a.py", (mtime, mtime))
+        coder.tokens_calculated = False
+        coder._calculate_context_block_tokens()
+
+        assert stats["symbol_outline"].misses == 2
+        assert stats["environment_info"].hits == 2
+
+
+class Watcher:
+    def __init__(self, root):
+        self.root = root
+
+    def covers(self, path):
+        return path == self.root or path.startswith(self.root + os.sep)
+
+
+async def test_repo_state_follows_file_events_instead_of_stating_files():
+    with GitTemporaryDirectory() as repo_dir:
+        with open("a.py", "w") as f:
+            f.write("x = 1\n")
+        io = InputOutput(yes=True, pretty=False)
+        coder = await Coder.create(
+            Model("gpt-3.5-turbo"), "agent", io, mcp_manager=McpServerManager([], io)
+        )
+        coder.repo.repo.git.add("a.py")
+        coder.repo.repo.git.commit("-m", "init")
+
+        watcher = Watcher(os.path.realpath(repo_dir))
+        file_events.attach(watcher)
+        try:
+            before = coder._get_repo_state_signature()
+            with patch.object(coder, "get_all_relative_files") as get_all_relative_files:
+                assert coder._get_repo_state_signature() == before
+                get_all_relative_files.assert_not_called()
+
+            file_events.publish([(MODIFIED, os.path.join(watcher.root, "a.py"))])
+            assert coder._get_repo_state_signature() != before
+        finally:
+            file_events.detach(watcher)
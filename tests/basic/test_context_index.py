@@ -0,0 +1,58 @@
+from cecli.coders.patch_coder import find_context
+from cecli.helpers.context_index import EXACT, RSTRIP, STRIP, ContextIndex
+
+
+def test_find_matches_linear_scan():
+    lines = ["a", "b", "c", "a", "b", "d", "a", "b", "c"]
+    index = ContextIndex(lines)
+
+    assert index.find(["a", "b", "c"]) == 0
+    assert index.find(["a", "b", "c"], start=1) == 6
+    assert index.find(["b", "d"]) == 4
+    assert index.find(["a", "b", "c"], start=7) == -1
+    assert index.find(["x"]) == -1
+    assert index.find([], start=3) == 3
+
+
+def test_find_normalization_levels():
+    index = ContextIndex(["def f():", "    return 1   ", "", "  x = 2"])
+
+    assert index.find(["    return 1"], level=EXACT) == -1
+    assert index.find(["    return 1"], level=RSTRIP) == 1
+    assert index.find(["return 1", "", "x = 2"], level=RSTRIP) == -1
+    assert index.find(["return 1", "", "x = 2"], level=STRIP) == 1
+
+
+def test_find_context_fuzz_and_eof():
+    lines = ["x", "  y", "z", "x", "  y"]
+
+    assert find_context(lines, ["x", "  y"], 0, eof=False) == (0, 0)
+    assert find_context(lines, ["x", "  y  "], 1, eof=False) == (3, 1)
+    assert find_context(lines, ["x", "y"], 0, eof=False) == (0, 100)
+    assert find_context(lines, ["x", "  y"], 0, eof=True) == (3, 0)
+    assert find_context(lines, ["z"], 0, eof=True) == (2, 10_000)
+    assert find_context(lines, ["missing"], 0, eof=False) == (-1, 0)
+
+
+def test_could_contain():
+    index = ContextIndex(
+        [
+            "def main():",
+            "    x = load()",
+            "",
+            "    if x:",
+            "        run(x)",
+            "    return x",
+        ]
+    )
+
+    # Different indentation, blank lines and a partial first and last line still match
+    assert index.could_contain("load()\n    if x:\n\n  run(x)\n    return")
+    assert index.could_contain("x = load()\nif x:\n    run(x)\n")
+
+    # Lines that are not in the file in this order can never match
+    assert not index.could_contain("x = load()\nrun(x)\nif x:\n")
+    assert not index.could_contain("x = load()\nif x:\nstop(x)\n")
+
+    # Too few lines to rule anything out
+    assert index.could_contain("anything\nat all\n")
@@ -0,0 +1,196 @@
+import difflib
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from cecli.diffs import unified_diff
+from cecli.helpers.conversation import (
+    ConversationChunks,
+    ConversationFiles,
+    ConversationManager,
+    MessageTag,
+)
+from cecli.helpers.conversation.content_store import ContentStore
+from cecli.io import InputOutput
+
+
+class MinimalCoder:
+    def __init__(self):
+        self.io = InputOutput(pretty=False, fancy_input=False, yes=True)
+
+
+@pytest.fixture
+def coder():
+    ConversationFiles.reset()
+    coder = MinimalCoder()
+    ConversationFiles.initialize(coder)
+    yield coder
+    ConversationFiles.reset()
+
+
+def set_mtime(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_content_store_dedupes_and_compresses_cold_entries():
+    store = ContentStore(max_hot_bytes=100)
+    a = store.put("a" * 60)
+    assert store.put("a" * 60) == a
+    assert len(store) == 1
+
+    b = store.put("b" * 60)
+    assert store.stats()["cold_entries"] == 1  # a was compressed to stay under the cap
+    assert store.hot_bytes == 60
+
+    assert store.get(a) == "a" * 60  # Reading a makes it hot, b goes cold
+    assert store.get(b) == "b" * 60
+
+    store.release(a)
+    assert a in store
+    store.release(a)
+    assert a not in store
+    store.release(b)
+    assert len(store) == 0
+    assert store.hot_bytes == 0
+
+
+def test_content_store_spills_cold_entries_past_the_total_cap():
+    store = ContentStore(max_hot_bytes=100, max_cold_bytes=50)
+    # Random text, so the compressed entries stay large
+    contents = [os.urandom(45).hex() for _ in range(4)]
+    digests = [store.put(content) for content in contents]
+
+    # Only the newest entry is hot, and the compressed ones don't all fit in memory
+    stats = store.stats()
+    assert stats["cold_bytes"] <= 50
+    assert stats["spilled_entries"] >= 1
+    assert stats["cold_entries"] + stats["spilled_entries"] == 3
+
+    # Spilled entries are read back when needed, then dropped from disk when released
+    assert [store.get(digest) for digest in digests] == contents
+    for digest in digests:
+        store.release(digest)
+    assert len(store) == 0
+    assert store.stats()["cold_bytes"] == 0
+    spill_dir = store._spill_dir.name
+    assert os.listdir(spill_dir) == []
+    store.clear()
+    assert not os.path.exists(spill_dir)
+
+
+def test_touch_without_content_change_is_not_a_change(coder, tmp_path):
+    fname = tmp_path / "a.py"
+    fname.write_text("one\ntwo\n")
+    set_mtime(fname, 1_000_000_000)
+
+    assert ConversationFiles.add_file(str(fname)) == "one\ntwo\n"
+    assert not ConversationFiles.has_file_changed(str(fname))
+
+    set_mtime(fname, 2_000_000_000)
+    assert not ConversationFiles.has_file_changed(str(fname))
+
+    # Same size, different content
+    fname.write_text("one\nTWO\n")
+    set_mtime(fname, 3_000_000_000)
+    assert ConversationFiles.has_file_changed(str(fname))
+
+    diff = ConversationFiles.generate_diff(str(fname))
+    assert "-two" in diff and "+TWO" in diff
+    assert not ConversationFiles.has_file_changed(str(fname))
+    assert ConversationFiles.generate_diff(str(fname)) is None
+
+    # The cached content stays the original, shared with nothing else
+    assert ConversationFiles.get_file_content(str(fname)) == "one\ntwo\n"
+    assert ConversationFiles._store.stats()["entries"] == 2
+
+    ConversationFiles.clear_file_cache(str(fname))
+    assert ConversationFiles._store.stats()["entries"] == 0
+
+
+def test_identical_files_share_one_copy(coder, tmp_path):
+    for name in ["a.py", "b.py"]:
+        (tmp_path / name).write_text("same\n" * 100)
+        ConversationFiles.add_file(str(tmp_path / name))
+
+    assert ConversationFiles._store.stats()["entries"] == 1
+
+
+def test_unified_diff_matches_difflib():
+    a = [f"line {i}" for i in range(200)]
+    b = list(a)
+    b[10] = "changed"
+    del b[50:53]
+    b.insert(120, "added")
+    b.append("end")
+
+    ours = list(unified_diff(a, b, "old", "new", n=3))
+    assert ours == list(difflib.unified_diff(a, b, "old", "new", lineterm="", n=3))
+    assert list(unified_diff(a, a)) == []
+    assert list(unified_diff([], ["x"])) == ["--- ", "+++ ", "@@ -0,0 +1 @@", "+x"]
+
+
+class ElidingCoder(MinimalCoder):
+    def __init__(self, fnames, elide_superseded_files=True):
+        super().__init__()
+        self.abs_fnames = set(fnames)
+        self.elide_superseded_files = elide_superseded_files
+        self.main_model = SimpleNamespace(
+            token_count=lambda msgs: sum(len(msg["content"]) for msg in msgs)
+        )
+
+
+def chat_files_stream(coder, fname, content, mtime_ns):
+    fname.write_text(content)
+    set_mtime(fname, mtime_ns)
+    ConversationChunks.add_chat_files_messages(coder)
+    return [msg["content"] for msg in ConversationManager.get_messages_dict()]
+
+
+@pytest.mark.parametrize("elide", [True, False])
+def test_superseded_file_diffs_are_elided(tmp_path, elide):
+    fname = tmp_path / "a.py"
+    lines = [f"line {i}" for i in range(100)]
+    coder = ElidingCoder([str(fname)], elide_superseded_files=elide)
+    ConversationManager.reset()
+    ConversationFiles.reset()
+    ConversationManager.initialize(coder)
+    ConversationFiles.initialize(coder)
+
+    stream = chat_files_stream(coder, fname, "\n".join(lines), 1_000_000_000)
+    assert stream[0].startswith(f"File Contents {fname}")
+
+    # A small change is sent as a diff after the original content
+    lines[3] = "changed"
+    stream = chat_files_stream(coder, fname, "\n".join(lines), 2_000_000_000)
+    assert len(stream) == 3
+    assert stream[2].startswith(f"File {fname} has changed")
+    assert "line 3" in stream[0]
+
+    # Once the diffs outweigh the file, the file is re-sent and its diffs left out
+    lines = [f"other {i}" for i in range(100)]
+    stream = chat_files_stream(coder, fname, "\n".join(lines), 3_000_000_000)
+    diffs = [content for content in stream if content.startswith(f"File {fname} has changed")]
+    if elide:
+        assert len(stream) == 2
+        assert stream[0] == f"File Contents {fname}:\n\n" + "\n".join(lines)
+        stats = ConversationManager.get_elision_stats()
+        assert stats["messages"] == 2
+        assert stats["tokens"] > len(stream[0])
+
+        # Tag filtered views report on the full stream
+        ConversationManager.get_messages_dict(MessageTag.SYSTEM, reload=True)
+        assert ConversationManager.get_elision_stats() == stats
+
+        # Stats follow the current stream, even before it is rebuilt for a request
+        ConversationManager.remove_messages_by_hash_key_pattern(
+            lambda hash_key: hash_key[0] == "file_diff"
+        )
+        assert ConversationManager.get_elision_stats()["messages"] == 0
+    else:
+        assert len(diffs) == 2
+        assert "line 3" in stream[0]
+
+    ConversationManager.reset()
+    ConversationFiles.reset()
+    assert ConversationManager.get_elision_stats()["messages"] == 0
@@ -0,0 +1,134 @@
+import os
+from unittest.mock import patch
+
+from cecli.coders import Coder
+from cecli.helpers.directory_tree import DirectoryTree
+from cecli.helpers.file_events import ADDED, DELETED, file_events
+from cecli.io import InputOutput
+from cecli.mcp import McpServerManager
+from cecli.models import Model
+from cecli.utils import GitTemporaryDirectory
+
+
+def test_render_lists_directories_before_files():
+    tree = DirectoryTree()
+    tree.update(["setup.py", "src/app.py", "src/lib/util.py", "README.md"])
+
+    assert tree.render() == "\n".join(
+        [
+            "- src/",
+            "  - lib/",
+            "    - util.py",
+            "  - app.py",
+            "- README.md",
+            "- setup.py",
+        ]
+    )
+
+
+def test_update_applies_add_and_remove_events():
+    tree = DirectoryTree()
+    tree.update(["a/one.py", "a/two.py", "b/three.py"])
+    version = tree.version
+
+    tree.update(["a/one.py", "c/four.py"])
+
+    assert tree.version == version + 3
+    assert tree.paths == {"a/one.py", "c/four.py"}
+    assert set(tree.root.dirs) == {"a", "c"}
+    assert tree.root.count == 2
+    assert tree.root.dirs["a"].count == 1
+
+
+def test_render_is_cached_until_the_tree_changes():
+    tree = DirectoryTree()
+    tree.update(["a.py"])
+    first = tree.render()
+    assert tree.render() is first
+
+    tree.add("b.py")
+    assert tree.render() == "- a.py\n- b.py"
+
+
+def test_large_directories_are_collapsed_into_counts():
+    tree = DirectoryTree()
+    tree.update([f"vendor/pkg{i}/module.py" for i in range(200)] + ["src/main.py"])
+
+    rendered = tree.render(max_tokens=40)
+
+    assert "- src/\n  - main.py" in rendered
+    assert "- vendor/ (200 files)" in rendered
+    assert "pkg0" not in rendered
+
+    assert tree.render(max_depth=1) == "- src/ (1 file)\n- vendor/ (200 files)"
+
+
+def test_untracked_directories_are_kept_as_empty_directories():
+    tree = DirectoryTree()
+    tree.update(["new_dir/", "new_dir/file.py"])
+    tree.remove("new_dir/file.py")
+
+    assert tree.render() == "- new_dir/"
+
+
+def test_remove_dir_drops_every_path_below_it():
+    tree = DirectoryTree()
+    tree.update(["pkg/a.py", "pkg/sub/b.py", "pkg2/c.py"])
+
+    assert tree.remove_dir("pkg")
+    assert tree.paths == {"pkg2/c.py"}
+    assert tree.render() == "- pkg2/\n  - c.py"
+
+
+class Watcher:
+    def __init__(self, root):
+        self.root = root
+
+    def covers(self, path):
+        return path.startswith(self.root + os.sep)
+
+
+async def test_agent_coder_follows_file_events_without_rescanning():
+    with GitTemporaryDirectory() as repo_dir:
+        with open("tracked.py", "w") as f:
+            f.write("x = 1\n")
+        with open(".gitignore", "w") as f:
+            f.write("*.log\n")
+        io = InputOutput(yes=True, pretty=False)
+        coder = await Coder.create(
+            Model("gpt-3.5-turbo"), "agent", io, mcp_manager=McpServerManager([], io)
+        )
+        coder.repo.repo.git.add("tracked.py", ".gitignore")
+        coder.repo.repo.git.commit("-m", "init")
+        os.makedirs("new_dir/nested")
+        with open("new_dir/nested/untracked.py", "w") as f:
+            f.write("y = 2\n")
+
+        watcher = Watcher(os.path.realpath(repo_dir))
+        file_events.attach(watcher)
+        try:
+            structure = coder.get_directory_structure()
+            # Untracked directories are listed with their files
+            assert "- new_dir/\n  - nested/\n    - untracked.py" in structure
+
+            for fname in ("added.py", "debug.log"):
+                with open(fname, "w") as f:
+                    f.write("z = 3\n")
+            os.remove("new_dir/nested/untracked.py")
+            os.rmdir("new_dir/nested")
+            with patch.object(coder.repo, "get_tracked_files") as get_tracked_files:
+                file_events.publish(
+                    [
+                        (ADDED, os.path.join(watcher.root, "added.py")),
+                        (ADDED, os.path.join(watcher.root, "debug.log")),
+                        (DELETED, os.path.join(watcher.root, "new_dir", "nested")),
+                    ]
+                )
+                structure = coder.get_directory_structure()
+                get_tracked_files.assert_not_called()
+        finally:
+            file_events.detach(watcher)
+
+        assert "- added.py" in structure
+        assert "debug.log" not in structure
+        assert "new_dir" not in structure
@@ -1,6 +1,7 @@
 # flake8: noqa: E501
 
 import tempfile
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -288,6 +289,64 @@ These changes replace the `subprocess.run` patches with `subprocess.check_output
         result = eb.replace_most_similar_chunk(whole, part, replace)
         assert result == expected_output
 
+    def test_replace_closest_edit_distance(self):
+        whole_lines = [f"value_{i} = compute({i})\n" for i in range(200)]
+        part_lines = whole_lines[120:130]
+        part_lines[4] = "value_124 = compute(124, cached=True)\n"
+        part = "".join(part_lines)
+        replace_lines = ["replaced\n"]
+
+        result = eb.replace_closest_edit_distance(whole_lines, part, part_lines, replace_lines)
+        assert result == "".join(whole_lines[:120] + replace_lines + whole_lines[130:])
+
+        unrelated = ["nothing alike here\n"] * 10
+        assert (
+            eb.replace_closest_edit_distance(
+                whole_lines, "".join(unrelated), unrelated, replace_lines
+            )
+            is None
+        )
+
+    def test_closest_window_matches_exhaustive_search(self):
+        from difflib import SequenceMatcher
+
+        whole_lines = [f"line {i % 7} of {i % 3}\n" for i in range(40)]
+        part_lines = ["line 3 of 1\n", "line 4 of 2\n", "extra\n", "line 5 of 0\n"]
+        part = "".join(part_lines)
+        lengths = range(3, 6)
+
+        expected = (0, -1, -1)
+        for length in lengths:
+            for i in range(len(whole_lines) - length + 1):
+                ratio = SequenceMatcher(None, "".join(whole_lines[i : i + length]), part).ratio()
+                if ratio > expected[0]:
+                    expected = (ratio, i, i + length)
+
+        result = eb.closest_window(
+            whole_lines,
+            part,
+            part_lines,
+            lengths,
+            cutoff=0.5,
+            join="".join,
+            elements=lambda line: line,
+        )
+        assert result == expected
+
+    def test_find_similar_lines(self):
+        content = "\n".join(f"line {i}" for i in range(100))
+
+        # Same first and last line: the match itself
+        search = "line 40\nline 41 changed\nline 42"
+        assert eb.find_similar_lines(search, content) == "line 40\nline 41\nline 42"
+
+        # Otherwise the first best match (starting at line 39) with some context around it
+        search = "line 40\nline 41\nline 42 changed"
+        expected = "\n".join(f"line {i}" for i in range(34, 47))
+        assert eb.find_similar_lines(search, content) == expected
+
+        assert eb.find_similar_lines("foo\nbar\nbaz", content) == ""
+
     def test_replace_part_with_missing_leading_whitespace_including_blank_line(self):
         """
         The part has leading whitespace on all lines, so should be ignored.
@@ -381,6 +440,113 @@ new
         content = Path(file1).read_text(encoding="utf-8")
         assert content == "one\nnew\nthree\n"
 
+    async def test_streamed_edits_are_dry_run_early(self):
+        with ChdirTemporaryDirectory():
+            Path("file.txt").write_text("one\ntwo\nthree\n")
+            coder = await Coder.create(self.GPT35, "diff", io=InputOutput(), fnames=["file.txt"])
+
+            response = (
+                "Do this:\n\nfile.txt\n```\n<<<<<<< SEARCH\ntwo\n=======\nnew\n>>>>>>>"
+                " REPLACE\n```\n\nAnd this:\n\nfile.txt\n```\n<<<<<<< SEARCH\nmissing\n"
+            )
+            coder.start_streamed_edits()
+            for i in range(0, len(response), 7):
+                coder.partial_response_content += response[i : i + 7]
+                coder.update_streamed_edits(response[i : i + 7])
+            coder.wait_for_streamed_edits()
+
+            # The completed block was matched in the background, the incomplete one wasn't
+            assert list(coder.replace_cache) == [
+                (coder.abs_root_path("file.txt"), "two\n", "new\n")
+            ]
+
+            coder.partial_response_content = response[: response.index("\nAnd this")]
+            with patch.object(eb, "do_replace", side_effect=AssertionError):
+                edits = coder.apply_edits_dry_run(coder.get_edits())
+                coder.apply_edits(edits)
+
+            assert Path("file.txt").read_text() == "one\nnew\nthree\n"
+
+    async def test_streamed_edit_dry_runs_read_files_on_the_caller_thread(self):
+        with ChdirTemporaryDirectory():
+            Path("file.txt").write_text("one\ntwo\nthree\n")
+            coder = await Coder.create(self.GPT35, "diff", io=InputOutput(), fnames=["file.txt"])
+
+            threads = []
+            read_text = coder.io.read_text
+
+            def recording_read_text(*args, **kwargs):
+                threads.append(threading.current_thread())
+                return read_text(*args, **kwargs)
+
+            response = "file.txt\n```\n<<<<<<< SEARCH\ntwo\n=======\nnew\n>>>>>>> REPLACE\n```\n"
+            coder.start_streamed_edits()
+            with patch.object(coder.io, "read_text", side_effect=recording_read_text):
+                with patch.object(eb, "do_replace", side_effect=RuntimeError("boom")):
+                    coder.update_streamed_edits(response)
+                    coder.partial_response_content = response
+
+                    # A failing dry run is raised where the edits are applied
+                    with pytest.raises(RuntimeError, match="boom"):
+                        coder.apply_edits_dry_run(coder.get_edits())
+
+            assert threads == [threading.current_thread()]
+
+    def test_edit_block_parser_resumes(self):
+        content = """file.txt
+```
+<<<<<<< SEARCH
+one
+=======
+two
+>>>>>>> REPLACE
+```
+
+```bash
+echo hi
+```
+
+other.txt
+```
+<<<<<<< SEARCH
+three
+=======
+four
+>>>>>>> REPLACE
+```
+"""
+        lines = content.splitlines(keepends=True)
+        parser = eb.EditBlockParser()
+        streamed = []
+        for end in range(len(lines) + 1):
+            streamed.append(list(parser.parse(lines[:end], final=False)))
+        streamed.append(list(parser.parse(lines, final=True)))
+
+        # Each block is yielded once, as soon as its closing line is there
+        assert streamed[7] == [("file.txt", "one\n", "two\n")]
+        assert streamed[12] == [(None, "echo hi\n")]
+        assert streamed[20] == [("other.txt", "three\n", "four\n")]
+        assert sum(streamed, []) == list(eb.find_original_update_blocks(content))
+
+    def test_edit_block_parser_scans_each_line_once(self):
+        lines = ["file.txt\n", "```\n", "<<<<<<< SEARCH\n"]
+        lines += [f"line {i}\n" for i in range(500)] + ["=======\n"]
+        lines += [f"new {i}\n" for i in range(500)] + [">>>>>>> REPLACE\n", "```\n"]
+
+        parser = eb.EditBlockParser()
+        matches = []
+        parser.divider_pattern = MagicMock(
+            match=lambda line: matches.append(line)
+            or eb.EditBlockParser.divider_pattern.match(line)
+        )
+        edits = []
+        for end in range(len(lines) + 1):
+            edits += parser.parse(lines[:end], final=False)
+
+        assert edits == [("file.txt", "".join(lines[3:503]), "".join(lines[504:1004]))]
+        # Resuming doesn't rescan the block from its start on every new line
+        assert len(matches) < 2 * len(lines)
+
     async def test_full_edit_dry_run(self):
         # Create a few temporary files
         _, file1 = tempfile.mkstemp()
@@ -0,0 +1,124 @@
+import os
+import time
+from pathlib import Path
+
+from cecli.helpers.file_events import DELETED, MODIFIED, FileEvents
+from cecli.helpers.tool_cache import files_signature
+from cecli.io import InputOutput
+from cecli.watch import FileWatcher
+
+
+class Source:
+    def __init__(self, root):
+        self.root = str(root)
+
+    def covers(self, path):
+        return path.startswith(self.root + os.sep)
+
+
+class MinimalCoder:
+    def __init__(self, io, root):
+        self.io = io
+        self.root = str(root)
+        self.abs_fnames = set()
+
+
+def test_fresh_only_while_covered_and_unchanged(tmp_path):
+    bus = FileEvents()
+    fname = str(tmp_path / "a.py")
+    seen = []
+    sub = bus.subscribe(root=tmp_path, callback=lambda change, path: seen.append((change, path)))
+
+    # No watcher attached, so nothing can be trusted
+    sub.validate(fname)
+    assert not sub.is_fresh(fname)
+
+    source = Source(tmp_path)
+    bus.attach(source)
+    assert not sub.is_fresh(fname)  # Validated before the watcher covered it
+    sub.validate(fname)
+    assert sub.is_fresh(fname)
+
+    bus.publish([(MODIFIED, fname)])
+    assert not sub.is_fresh(fname)
+    assert seen == [(MODIFIED, fname)]
+    assert sub.generation == 1
+
+    # Events outside the subscription's root are not delivered
+    bus.publish([(DELETED, str(tmp_path.parent / "other.py"))])
+    assert sub.generation == 1
+
+    sub.validate(fname)
+    bus.detach(source)
+    assert not sub.is_fresh(fname)
+
+
+def test_files_signature_skips_covered_files(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("a\n")
+    (tmp_path / "b.py").write_text("b\n")
+    bus = FileEvents()
+    bus.attach(Source(tmp_path / "src"))
+    sub = bus.subscribe()
+
+    before = files_signature(tmp_path, ["src/a.py", "b.py"], events=sub)
+    assert before[0] == 2
+    assert before[2] == 2  # Only the uncovered file was stat'ed
+    assert files_signature(tmp_path, ["src/a.py", "b.py"], events=sub) == before
+
+    bus.publish([(MODIFIED, str(tmp_path / "src" / "a.py"))])
+    assert files_signature(tmp_path, ["src/a.py", "b.py"], events=sub) != before
+
+
+def test_invalidate_drops_validations(tmp_path):
+    bus = FileEvents()
+    fname = str(tmp_path / "a.py")
+    bus.attach(Source(tmp_path))
+    sub = bus.subscribe()
+    sub.validate(fname)
+    signature = sub.signature()
+
+    # A shell command may have changed the file before the watcher reports it
+    bus.invalidate()
+    assert not sub.is_fresh(fname)
+    assert sub.signature() != signature
+
+    sub.validate(fname)
+    assert sub.is_fresh(fname)
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_file_watcher_publishes_events(tmp_path, monkeypatch):
+    events = FileEvents()
+    monkeypatch.setattr("cecli.watch.file_events", events)
+    (tmp_path / "src").mkdir()
+    fname = tmp_path / "src" / "a.py"
+    fname.write_text("x = 1\n")
+
+    io = InputOutput(pretty=False, fancy_input=False, yes=False)
+    watcher = FileWatcher(MinimalCoder(io, tmp_path))
+    sub = events.subscribe(root=tmp_path)
+    watcher.start()
+    try:
+        assert wait_for(lambda: events.active)
+        sub.validate(fname)
+        assert sub.is_fresh(fname)
+
+        # Stopping only disarms AI comment handling, the watch keeps publishing
+        watcher.stop()
+        fname.write_text("x = 2\n")
+        assert wait_for(lambda: not sub.is_fresh(fname))
+        assert not watcher.changed_files
+    finally:
+        watcher.close()
+
+    assert not events.active
+    assert Path(watcher.root) == tmp_path
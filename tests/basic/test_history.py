@@ -1,3 +1,4 @@
+import asyncio
 from unittest import TestCase, mock
 
 from cecli.history import ChatSummary
@@ -116,3 +117,74 @@ class TestChatSummary(TestCase):
                 }
             ],
         )
+
+
+class ConcurrentModel:
+    name = "weak-model"
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+
+    def token_count(self, msg):
+        return count(msg)
+
+    async def simple_send_with_retries(self, messages, max_tokens=None):
+        self.requests.append(messages[1]["content"])
+        summary = f"summary {len(self.requests)}"
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return summary
+
+
+def conversation(n, words=10):
+    messages = []
+    for i in range(n):
+        messages.append({"role": "user", "content": " ".join([f"ask{i}"] * words)})
+        messages.append({"role": "assistant", "content": " ".join([f"answer{i}"] * words)})
+    return messages
+
+
+def test_split_chunks_is_token_bounded_and_keeps_exchanges_together():
+    summary = ChatSummary(ConcurrentModel(), chunk_tokens=45)
+    messages = conversation(5)
+    chunks = summary.split_chunks(summary.tokenize(messages))
+
+    assert [msg for chunk in chunks for msg in chunk] == messages
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert all(chunk[-1]["role"] == "assistant" for chunk in chunks)
+
+    big = [{"role": "user", "content": " ".join(["word"] * 100)}] + conversation(1)
+    assert [len(chunk) for chunk in summary.split_chunks(summary.tokenize(big))] == [1, 2]
+
+
+async def test_summarize_as_text_maps_chunks_concurrently_then_reduces():
+    model = ConcurrentModel()
+    summary = ChatSummary(model, chunk_tokens=45, max_parallel=2)
+
+    result = await summary.summarize_as_text(conversation(10), "prompt")
+
+    # 5 chunks, at most 2 in flight, then one request merging their summaries
+    assert len(model.requests) == 6
+    assert model.max_in_flight == 2
+    assert model.requests[-1] == "".join(f"# USER\nsummary {i}\n" for i in range(1, 6))
+    assert result == "summary 6"
+
+    model = ConcurrentModel()
+    summary = ChatSummary(model, chunk_tokens=1000)
+    assert await summary.summarize_as_text(conversation(10), "prompt") == "summary 1"
+
+
+async def test_summarize_keeps_tail_and_summarizes_head_in_chunks():
+    model = ConcurrentModel()
+    summary = ChatSummary(model, max_tokens=100, chunk_tokens=45)
+    messages = conversation(10)
+
+    result = await summary.summarize(messages)
+
+    assert model.max_in_flight > 1
+    assert result[0]["content"].endswith(f"summary {len(model.requests)}")
+    assert result[1:] == messages[-4:]
@@ -0,0 +1,78 @@
+import time
+
+from prompt_toolkit.history import FileHistory
+
+from cecli.helpers.history_writer import HistoryWriter, input_history_entry
+from cecli.io import InputOutput
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_input_history_format_matches_file_history(tmp_path):
+    ours = tmp_path / "ours"
+    theirs = tmp_path / "theirs"
+    writer = HistoryWriter(flush_interval=60)
+    for text in ["first", "multi\nline input", ""]:
+        writer.append(ours, input_history_entry(text), newline="")
+        FileHistory(str(theirs)).append_string(text)
+    writer.close()
+
+    assert list(FileHistory(str(ours)).load_history_strings()) == list(
+        FileHistory(str(theirs)).load_history_strings()
+    )
+
+    def strip_timestamps(data):
+        return [line for line in data.split(b"\n") if not line.startswith(b"# ")]
+
+    assert strip_timestamps(ours.read_bytes()) == strip_timestamps(theirs.read_bytes())
+
+
+def test_flushes_on_interval_size_and_demand(tmp_path):
+    fname = tmp_path / "sub" / "history.md"
+
+    writer = HistoryWriter(flush_interval=60, max_buffer=10)
+    writer.append(fname, "12345\n")
+    time.sleep(0.1)
+    assert not fname.exists()  # Buffered, below both thresholds
+    writer.append(fname, "67890\n")
+    assert wait_for(lambda: fname.exists() and fname.read_text() == "12345\n67890\n")
+
+    writer.append(fname, "a\n")
+    writer.flush(tmp_path / "other.md")
+    assert fname.read_text() == "12345\n67890\n"
+    writer.flush(fname)
+    assert fname.read_text() == "12345\n67890\na\n"
+    writer.close()
+
+    writer = HistoryWriter(flush_interval=0.05)
+    writer.append(fname, "b\n")
+    assert wait_for(lambda: fname.read_text().endswith("a\nb\n"))
+
+    # Appends after close are written immediately
+    writer.close()
+    writer.append(fname, "c\n")
+    assert fname.read_text() == "12345\n67890\na\nb\nc\n"
+
+
+def test_chat_history_is_buffered_until_turn_boundary(tmp_path):
+    fname = tmp_path / "chat.history.md"
+    io = InputOutput(pretty=False, fancy_input=False, yes=True, chat_history_file=fname)
+
+    io.append_chat_history("# header", linebreak=True)
+    io.append_chat_history("quoted", blockquote=True)
+    io.flush_history()
+    assert fname.read_text().endswith("\n# header  \n> quoted\n")
+
+    errors = []
+    io.chat_history_file = tmp_path
+    io._chat_history_error = errors.append
+    io.append_chat_history("lost")
+    io.flush_history()
+    assert len(errors) == 1
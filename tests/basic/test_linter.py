@@ -1,4 +1,7 @@
+import hashlib
 import platform
+import subprocess
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -90,3 +93,86 @@ class TestLinter:
             # The result should contain the error message
             assert result is not None
             assert "Error message" in result.text
+
+    def test_flake8_lint_many_matches_single_runs(self, tmp_path):
+        linter = Linter(encoding="utf-8", root=str(tmp_path))
+        files = []
+        for i in range(3):
+            code = f"def f():\n    return undefined_{i}\n" if i != 1 else "x = 1\n"
+            (tmp_path / f"m{i}.py").write_text(code)
+            files.append((f"m{i}.py", code))
+
+        batched = linter.flake8_lint_many(files)
+
+        for rel_fname, code in files:
+            key = (rel_fname, hashlib.sha1(code.encode()).hexdigest())
+            assert batched[key] == linter.flake8_lint(rel_fname)
+            # The batched result is used instead of running flake8 again
+            linter.flake8_results = batched
+            with patch("subprocess.run", side_effect=AssertionError):
+                assert linter.flake8_lint(rel_fname, code) == batched[key]
+
+        assert batched[("m1.py", hashlib.sha1(b"x = 1\n").hexdigest())] is None
+
+    def test_lint_many_caches_and_reports_new_errors(self, tmp_path):
+        linter = Linter(encoding="utf-8", root=str(tmp_path))
+        fname = str(tmp_path / "mod.py")
+        original = "a = undefined_a\nb = 1\n"
+        Path(fname).write_text(original + "c = undefined_c\n")
+
+        with patch("cecli.linter.tree_context", return_value=""):
+            errors = linter.lint_many([fname])[fname]
+            assert "undefined_a" in errors and "undefined_c" in errors
+
+            # Unchanged content is not linted again
+            with patch.object(linter, "py_lint", side_effect=AssertionError):
+                assert linter.lint_many([fname])[fname] == errors
+
+            # Only errors the edit introduced are reported
+            errors = linter.lint_many([fname], originals={fname: original})[fname]
+            assert "undefined_c" in errors and "undefined_a" not in errors
+            assert linter.lint_many([fname], originals={fname: Path(fname).read_text()}) == {}
+
+    def test_lint_many_lints_originals_in_one_batch(self, tmp_path):
+        linter = Linter(encoding="utf-8", root=str(tmp_path))
+        fnames = []
+        originals = {}
+        for i in range(3):
+            fname = str(tmp_path / f"m{i}.py")
+            originals[fname] = f"a = undefined_{i}\n"
+            Path(fname).write_text(originals[fname] + f"b = new_{i}\n")
+            fnames.append(fname)
+
+        run = subprocess.run
+        with (
+            patch("cecli.linter.tree_context", return_value=""),
+            patch("subprocess.run", side_effect=run) as mock_run,
+        ):
+            errors = linter.lint_many(fnames, originals=originals)
+
+        # One flake8 run for the edited files, one for their originals
+        assert mock_run.call_count == 2
+        for i, fname in enumerate(fnames):
+            assert f"new_{i}" in errors[fname] and f"undefined_{i}" not in errors[fname]
+
+    def test_shifted_errors_are_dropped_and_repeated_ones_kept(self, tmp_path):
+        linter = Linter(encoding="utf-8", root=str(tmp_path))
+        fname = str(tmp_path / "mod.py")
+        original = "a = undefined\n"
+        # The edit adds the same error above the old one, which moves down a line
+        Path(fname).write_text("b = undefined\n" + original)
+
+        with patch("cecli.linter.tree_context", return_value=""):
+            errors = linter.lint_many([fname], originals={fname: original})[fname]
+        assert "mod.py:1:5: F821 undefined name 'undefined'" in errors
+        assert "mod.py:2:" not in errors
+
+    def test_deleting_an_import_reports_its_uses(self, tmp_path):
+        linter = Linter(encoding="utf-8", root=str(tmp_path))
+        fname = str(tmp_path / "mod.py")
+        original = "import os\n\n\ndef cwd():\n    return os.getcwd()\n"
+        Path(fname).write_text(original.replace("import os\n", ""))
+
+        with patch("cecli.linter.tree_context", return_value=""):
+            errors = linter.lint_many([fname], originals={fname: original})[fname]
+        assert "F821 undefined name 'os'" in errors
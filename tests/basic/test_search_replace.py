@@ -0,0 +1,134 @@
+import time
+from unittest.mock import MagicMock
+
+from cecli.coders.search_replace import (
+    StrategyTelemetry,
+    edit_shape,
+    flexible_search_and_replace,
+    method_name,
+    search_and_replace,
+    strategy_telemetry,
+)
+from cecli.coders.udiff_coder import apply_hunk
+from cecli.commands import EditStatsCommand
+
+PLAIN = (False, False, False)
+STRIP_BLANK = (True, False, False)
+
+
+def slow_failure(texts):
+    time.sleep(0.05)
+
+
+def test_flexible_search_and_replace_records_attempts():
+    telemetry = StrategyTelemetry()
+    texts = ["\nfoo\n", "bar\n", "foo\n"]
+
+    # The plain attempt fails on the leading blank line, stripping it succeeds
+    res = flexible_search_and_replace(
+        texts, [(search_and_replace, [PLAIN, STRIP_BLANK])], telemetry=telemetry
+    )
+    assert res == "bar\n"
+
+    stats = telemetry.stats[edit_shape(texts)]
+    assert stats[method_name(search_and_replace, PLAIN)][:2] == [1, 0]
+    assert stats[method_name(search_and_replace, STRIP_BLANK)][:2] == [1, 1]
+    assert "search_and_replace+strip_blank" in telemetry.format_report()
+
+
+def test_adaptive_order_prefers_cheap_successful_methods():
+    telemetry = StrategyTelemetry()
+    texts = ["\nfoo\n", "bar\n", "foo\n"]
+    shape = edit_shape(texts)
+    candidates = [(search_and_replace, STRIP_BLANK), (search_and_replace, PLAIN)]
+
+    # Without any numbers, methods of the same strategy keep their order
+    assert telemetry.order(shape, candidates) == candidates
+
+    for _ in range(3):
+        flexible_search_and_replace(
+            texts,
+            [(slow_failure, [PLAIN]), (search_and_replace, [STRIP_BLANK])],
+            telemetry=telemetry,
+        )
+    candidates = [(slow_failure, PLAIN), (search_and_replace, STRIP_BLANK)]
+    assert telemetry.order(shape, candidates) == candidates[::-1]
+
+    # The telemetry's setting applies unless the caller overrides it
+    telemetry.adaptive = True
+    start = time.monotonic()
+    res = flexible_search_and_replace(
+        texts,
+        [(slow_failure, [PLAIN]), (search_and_replace, [STRIP_BLANK])],
+        telemetry=telemetry,
+    )
+    assert res == "bar\n"
+    assert time.monotonic() - start < 0.05
+
+
+def test_budget_stops_further_attempts():
+    telemetry = StrategyTelemetry()
+    texts = ["foo\n", "bar\n", "foo\n"]
+
+    res = flexible_search_and_replace(
+        texts,
+        [(slow_failure, [PLAIN]), (search_and_replace, [PLAIN])],
+        budget=0.01,
+        telemetry=telemetry,
+    )
+    assert res is None
+    assert method_name(search_and_replace, PLAIN) not in telemetry.stats[edit_shape(texts)]
+
+
+def test_telemetry_persists_across_runs(tmp_path):
+    path = tmp_path / "stats.json"
+    telemetry = StrategyTelemetry(path)
+    telemetry.record("shape", "method", 0.5, True)
+    telemetry.save()
+    assert not path.exists()  # Throttled
+
+    telemetry.save(force=True)
+    assert StrategyTelemetry(path).format_report() == telemetry.format_report()
+
+
+def test_use_path_switches_stats_file(tmp_path):
+    first = StrategyTelemetry(tmp_path / "first.json")
+    first.record("shape", "method", 0.5, True)
+    first.save(force=True)
+
+    telemetry = StrategyTelemetry(tmp_path / "second.json")
+    assert telemetry.stats == {}
+    telemetry.use_path(tmp_path / "first.json")
+    assert telemetry.format_report() == first.format_report()
+
+
+def test_tests_do_not_write_to_the_real_cache(tmp_path_factory):
+    assert str(strategy_telemetry.path).startswith(str(tmp_path_factory.getbasetemp()))
+
+
+async def test_edit_stats_command_shows_the_report():
+    io = MagicMock()
+    await EditStatsCommand.execute(io, None, "")
+    io.tool_output.assert_any_call(strategy_telemetry.format_report())
+
+
+def test_udiff_falls_back_to_the_fuzzier_methods():
+    telemetry = StrategyTelemetry()
+    strategy_telemetry.stats, saved = telemetry.stats, strategy_telemetry.stats
+    try:
+        content = "".join(f"line {i}\n" for i in range(30))
+        # One removed line doesn't match the file, so only a fuzzy method applies the hunk
+        hunk = [" line 3\n"]
+        hunk += [f"-line {i}\n" if i != 9 else "-line nine\n" for i in range(4, 16)]
+        hunk += ["+replaced\n", " line 16\n"]
+
+        res = apply_hunk(content, hunk)
+        methods = set().union(*telemetry.stats.values())
+    finally:
+        strategy_telemetry.stats = saved
+
+    expected = "".join(f"line {i}\n" for i in range(4)) + "replaced\n"
+    expected += "".join(f"line {i}\n" for i in range(16, 30))
+    assert res == expected
+    assert "git_cherry_pick_osr_onto_o" in methods
+    assert "dmp_lines_apply" in methods
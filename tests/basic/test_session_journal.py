@@ -0,0 +1,167 @@
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+from cecli import sessions
+from cecli.coders import Coder
+from cecli.helpers.conversation import ConversationManager, MessageTag
+from cecli.io import InputOutput
+from cecli.models import Model
+from cecli.sessions import SessionManager, journal_path
+from cecli.utils import GitTemporaryDirectory
+
+
+def add(tag, role, content):
+    return ConversationManager.add_message({"role": role, "content": content}, tag=tag)
+
+
+def journal_ops(journal):
+    with open(journal.journal_file, encoding="utf-8") as f:
+        return [json.loads(line)["op"] for line in f]
+
+
+async def make_coder(repo_dir):
+    for name in ["a.py", "b.py"]:
+        Path(repo_dir, name).write_text(f"# {name}\n")
+    io = InputOutput(pretty=False, fancy_input=False, yes=True)
+    coder = await Coder.create(Model("gpt-3.5-turbo"), None, io)
+    coder.args = SimpleNamespace(
+        model=None, weak_model=None, editor_model=None, editor_edit_format=None, verbose=False
+    )
+    coder.abs_fnames.add(os.path.join(coder.root, "a.py"))
+    ConversationManager.clear_tag(MessageTag.DONE)
+    ConversationManager.clear_tag(MessageTag.CUR)
+    return coder, io
+
+
+async def test_autosave_appends_changes_and_load_replays_them():
+    with GitTemporaryDirectory() as repo_dir:
+        coder, io = await make_coder(repo_dir)
+        add(MessageTag.DONE, "user", "Hello")
+        add(MessageTag.DONE, "assistant", "Hi there!")
+
+        journal = SessionManager(coder, io).journal("auto")
+        assert journal.save()
+        snapshot_stat = journal.snapshot_file.stat()
+        assert journal_ops(journal) == ["snapshot"]
+
+        # Later saves only append the changes, the snapshot is left alone
+        add(MessageTag.CUR, "user", "Can you help me?")
+        ConversationManager.clear_tag(MessageTag.DONE)
+        add(MessageTag.DONE, "user", "Hello again")
+        coder.abs_fnames.add(os.path.join(coder.root, "b.py"))
+        coder.abs_fnames.discard(os.path.join(coder.root, "a.py"))
+        coder.auto_lint = not coder.auto_lint
+        assert journal.save()
+        assert journal.save()  # Nothing changed, nothing written
+
+        assert journal.snapshot_file.stat().st_mtime_ns == snapshot_stat.st_mtime_ns
+        assert journal_ops(journal) == [
+            "snapshot",
+            "add",
+            "remove",
+            "remove",
+            "add",
+            "add_file",
+            "drop_file",
+            "meta",
+        ]
+
+        expected_done = coder.done_messages
+        expected_cur = coder.cur_messages
+        expected_lint = coder.auto_lint
+        ConversationManager.reset()
+        coder.abs_fnames = set()
+
+        assert SessionManager(coder, io).load_session("auto")
+        assert coder.done_messages == expected_done
+        assert coder.cur_messages == expected_cur
+        assert {coder.get_rel_fname(f) for f in coder.abs_fnames} == {"b.py"}
+        assert coder.auto_lint == expected_lint
+
+
+async def test_snapshot_compaction_and_stale_journals(monkeypatch):
+    with GitTemporaryDirectory() as repo_dir:
+        coder, io = await make_coder(repo_dir)
+        add(MessageTag.DONE, "user", "Hello")
+        journal = SessionManager(coder, io).journal("auto")
+        journal.save()
+
+        # A journal grown past the snapshot is folded into a new snapshot
+        monkeypatch.setattr(sessions, "SNAPSHOT_MIN_BYTES", 0)
+        add(MessageTag.DONE, "assistant", "x" * 10000)
+        journal.save()
+        assert journal_ops(journal) == ["snapshot", "add"]
+        journal.save()
+        assert journal_ops(journal) == ["snapshot"]
+        data = json.loads(journal.snapshot_file.read_text())
+        assert len(data["chat_history"]["done_messages"]) == 2
+
+        # A torn last record is skipped
+        monkeypatch.setattr(sessions, "SNAPSHOT_MIN_BYTES", 1024 * 1024)
+        add(MessageTag.DONE, "user", "kept")
+        journal.save()
+        with open(journal.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"op": "add", "id": "x", "tag": "done", "mess')
+        manager = SessionManager(coder, io)
+        loaded = manager._read_session_file(journal.snapshot_file)
+        assert loaded["chat_history"]["done_messages"][-1]["content"] == "kept"
+
+        # A regular save replaces the snapshot, which orphans the journal
+        manager.save_session("auto", output=False)
+        assert journal_path(journal.snapshot_file).exists()
+        ConversationManager.clear_tag(MessageTag.DONE)
+        loaded = manager._read_session_file(journal.snapshot_file)
+        assert len(loaded["chat_history"]["done_messages"]) == 3
+
+        # So the next autosave starts over from a new snapshot
+        journal.save()
+        assert journal_ops(journal) == ["snapshot"]
+        assert manager._read_session_file(journal.snapshot_file)["chat_history"] == {
+            "done_messages": [],
+            "cur_messages": [],
+        }
+
+
+async def test_force_updated_message_keeps_its_live_position_after_reload():
+    with GitTemporaryDirectory() as repo_dir:
+        coder, io = await make_coder(repo_dir)
+        manager = SessionManager(coder, io)
+        journal = manager.journal("auto")
+
+        add(MessageTag.CUR, "user", "Do X")
+        add(MessageTag.CUR, "assistant", "Ok.")
+        assert journal.save()
+
+        add(MessageTag.CUR, "user", "more")
+        # Like the "Ok" after shell output, re-adding with force moves the message last
+        ConversationManager.add_message(
+            {"role": "assistant", "content": "Ok."}, tag=MessageTag.CUR, force=True
+        )
+        assert journal.save()
+        assert journal_ops(journal) == ["snapshot", "add", "add"]
+
+        live = [msg["content"] for msg in ConversationManager.get_messages_dict(MessageTag.CUR)]
+        assert live == ["Do X", "more", "Ok."]
+        loaded = manager._read_session_file(journal.snapshot_file)["chat_history"]
+        assert [msg["content"] for msg in loaded["cur_messages"]] == live
+
+
+async def test_snapshot_message_ids_match_the_stored_messages():
+    with GitTemporaryDirectory() as repo_dir:
+        coder, io = await make_coder(repo_dir)
+        add(MessageTag.DONE, "user", "first")
+        add(MessageTag.CUR, "user", "second")
+
+        journal = SessionManager(coder, io).journal("auto")
+        assert journal.save()
+
+        with open(journal.snapshot_file, encoding="utf-8") as f:
+            session_data = json.load(f)
+        for key, tag in sessions.SESSION_TAGS.items():
+            messages = ConversationManager.get_tag_messages(tag)
+            assert session_data["journal"]["message_ids"][key] == [
+                msg.message_id for msg in messages
+            ]
+            assert session_data["chat_history"][key] == [msg.to_dict() for msg in messages]
@@ -120,6 +120,28 @@ These are the main instructions.
         assert "test-skill" not in manager._loaded_skills
         assert manager._loaded_skills == set()
 
+    def test_signature_follows_skill_md_edits(self):
+        """Test that editing a SKILL.md changes the signature and drops the cached skill."""
+        skill_dir = Path(self.temp_dir) / "test-skill"
+        skill_dir.mkdir()
+        skill_md = skill_dir / "SKILL.md"
+        skill_md.write_text("---\nname: test-skill\ndescription: Old\n---\n\nOld steps.\n")
+
+        manager = SkillsManager([self.temp_dir])
+        before = manager.signature()
+        assert manager.get_skill_content("test-skill").metadata.description == "Old"
+        assert manager.signature() == before
+
+        # Editing the file inside the skill directory leaves the directory's mtime alone
+        dir_mtime = os.stat(self.temp_dir).st_mtime_ns
+        skill_md.write_text("---\nname: test-skill\ndescription: New\n---\n\nNew steps.\n")
+        mtime = os.stat(skill_md).st_mtime_ns + 1_000_000_000
+        os.utime(skill_md, ns=(mtime, mtime))
+        assert os.stat(self.temp_dir).st_mtime_ns == dir_mtime
+
+        assert manager.signature() != before
+        assert manager.get_skill_content("test-skill").metadata.description == "New"
+
     def test_skill_summary_loader(self):
         """Test the skill_summary_loader function."""
         # Create a skill directory structure
@@ -0,0 +1,54 @@
+import time
+from types import SimpleNamespace
+
+from cecli.helpers.symbol_index import SymbolIndex, collect_symbols
+
+
+def test_search_ranks_prefix_then_substring_then_fuzzy():
+    index = SymbolIndex(
+        [
+            "get_symbol_completions",
+            "GetSymbol",
+            "symbol_index",
+            "forget",
+            "gsc",
+            "other",
+            "GetSymbol",
+        ]
+    )
+    assert len(index) == 6
+
+    assert index.search("get") == ["get_symbol_completions", "GetSymbol", "forget"]
+    assert index.search("gsc") == ["gsc", "get_symbol_completions"]
+    assert index.search("SYMBOL") == ["symbol_index", "get_symbol_completions", "GetSymbol"]
+    assert index.search("zz") == []
+    assert index.search("", limit=2) == ["forget", "get_symbol_completions"]
+    assert index.search("e", limit=3) == ["forget", "get_symbol_completions", "GetSymbol"]
+
+
+def test_fuzzy_search_does_not_backtrack():
+    index = SymbolIndex(["a" * 5000, "b" * 5000])
+
+    start = time.monotonic()
+    assert index.search("a" * 20 + "c") == []
+    assert index.search("a[]^-\\") == []
+    assert time.monotonic() - start < 1
+
+
+def test_collect_symbols(tmp_path):
+    fname = tmp_path / "code.py"
+    fname.write_text("def compute_total(items):\n    return sum(items)\n")
+
+    coder = SimpleNamespace(
+        get_inchat_relative_files=lambda: ["code.py"],
+        get_all_relative_files=lambda: ["code.py", "other.py"],
+    )
+    symbols = collect_symbols(coder, [str(fname), str(tmp_path / "missing.py")])
+    assert {"code.py", "other.py", "compute_total", "items"} <= symbols
+
+    # With a repo map, its tags are used instead of lexing the file
+    tags = [SimpleNamespace(name="from_tags"), SimpleNamespace(name="x")]
+    coder.repo_map = SimpleNamespace(
+        get_tags=lambda fname, rel_fname: tags, get_rel_fname=lambda fname: "code.py"
+    )
+    assert collect_symbols(coder, [str(fname)]) == {"code.py", "other.py", "from_tags"}
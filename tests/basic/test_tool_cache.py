@@ -0,0 +1,172 @@
+import os
+import time
+from unittest.mock import MagicMock
+
+from cecli.coders import Coder, agent_coder
+from cecli.helpers.tool_cache import (
+    MISS,
+    ToolResultCache,
+    files_signature,
+    mcp_cache_ttl,
+)
+from cecli.io import InputOutput
+from cecli.mcp import McpServerManager
+from cecli.models import Model
+from cecli.utils import GitTemporaryDirectory
+
+
+def test_key_normalizes_argument_order_and_tool_case():
+    key1 = ToolResultCache.make_key("local", "Grep", {"pattern": "x", "directory": "."})
+    key2 = ToolResultCache.make_key("local", "grep", {"directory": ".", "pattern": "x"})
+    assert key1 == key2
+
+
+def test_signature_mismatch_is_a_miss():
+    cache = ToolResultCache()
+    key = ToolResultCache.make_key("local", "grep", {"pattern": "x"})
+    cache.put(key, "result", signature=("head", 1))
+
+    assert cache.get(key, ("head", 1)) == "result"
+    assert cache.get(key, ("head", 2)) is MISS
+    # The stale entry was dropped
+    assert cache.get(key, ("head", 1)) is MISS
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = ToolResultCache()
+    key = ToolResultCache.make_key("search-server", "search", {"q": "x"})
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.put(key, "result", ttl=10)
+    assert cache.get(key) == "result"
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get(key) is MISS
+
+
+def test_invalidate_namespace_and_lru_limit():
+    cache = ToolResultCache(max_entries=2)
+    local_key = ToolResultCache.make_key("local", "ls", {"directory": "."})
+    mcp_key = ToolResultCache.make_key("server", "search", {"q": "x"})
+    cache.put(local_key, "local")
+    cache.put(mcp_key, "remote")
+
+    cache.invalidate("local")
+    assert cache.get(local_key) is MISS
+    assert cache.get(mcp_key) == "remote"
+
+    for i in range(3):
+        cache.put(ToolResultCache.make_key("local", "ls", {"directory": str(i)}), i)
+    assert len(cache) == 2
+
+
+def test_invalidate_paths_only_drops_entries_below_them():
+    cache = ToolResultCache()
+    src_key = ToolResultCache.make_key("local", "grep", {"directory": "src"})
+    docs_key = ToolResultCache.make_key("local", "grep", {"directory": "docs"})
+    git_key = ToolResultCache.make_key("local", "gitlog", {})
+    unknown_key = ToolResultCache.make_key("local", "other", {})
+    cache.put(src_key, "src", paths=["/repo/src"])
+    cache.put(docs_key, "docs", paths=["/repo/docs"])
+    cache.put(git_key, "log", paths=())
+    cache.put(unknown_key, "other")
+
+    cache.invalidate("local", paths={"/repo/src/pkg/a.py"})
+
+    assert cache.get(src_key) is MISS
+    assert cache.get(unknown_key) is MISS
+    assert cache.get(docs_key) == "docs"
+    assert cache.get(git_key) == "log"
+
+    cache.invalidate("local")
+    assert cache.get(docs_key) is MISS
+    assert cache.get(git_key) is MISS
+
+
+async def test_agent_coder_invalidates_only_after_write_tools():
+    with GitTemporaryDirectory():
+        for dirname in ("src", "docs"):
+            os.mkdir(dirname)
+            with open(os.path.join(dirname, "a.py"), "w") as f:
+                f.write("x = 1\n")
+        io = InputOutput(yes=True, pretty=False)
+        coder = await Coder.create(
+            Model("gpt-3.5-turbo"), "agent", io, mcp_manager=McpServerManager([], io)
+        )
+        grep = MagicMock()
+        grep.process_response.side_effect = (
+            lambda coder, params: f"matches in {params['directory']}"
+        )
+
+        def run_grep(directory):
+            params = {"pattern": "x", "directory": directory}
+            entry = coder._get_tool_cache_entry("grep", params)
+            return coder._run_local_tool("grep", grep, params, entry)
+
+        run_grep("src")
+        run_grep("docs")
+        assert grep.process_response.call_count == 2
+
+        # Tools that do not write leave the cache alone
+        coder._run_local_tool("thinking", MagicMock(), {"content": "hmm"})
+        run_grep("src")
+        run_grep("docs")
+        assert grep.process_response.call_count == 2
+
+        # Write tools drop the results read from the directory they edited
+        coder._run_local_tool("replacetext", MagicMock(), {"file_path": "src/a.py"})
+        run_grep("src")
+        run_grep("docs")
+        assert grep.process_response.call_count == 3
+
+
+async def test_agent_coder_keeps_files_signatures_for_the_turn(monkeypatch):
+    with GitTemporaryDirectory():
+        io = InputOutput(yes=True, pretty=False)
+        coder = await Coder.create(
+            Model("gpt-3.5-turbo"), "agent", io, mcp_manager=McpServerManager([], io)
+        )
+        stat_calls = []
+        monkeypatch.setattr(
+            agent_coder,
+            "files_signature",
+            lambda root, files, events=None: stat_calls.append(files) or len(stat_calls),
+        )
+
+        signature = coder._get_tool_cache_signature("files")
+        assert coder._get_tool_cache_signature("files") == signature
+        assert len(stat_calls) == 1
+
+        # Other directories get their own signature
+        coder._get_tool_cache_signature("files", "src")
+        assert len(stat_calls) == 2
+
+        # Write tools and new turns take it again
+        coder._run_local_tool("replacetext", MagicMock(), {"file_path": "a.py"})
+        assert coder._get_tool_cache_signature("files") != signature
+        await coder.preproc_user_input("hi")
+        coder._get_tool_cache_signature("files")
+        assert len(stat_calls) == 4
+
+
+def test_files_signature_changes_with_content(tmp_path):
+    fname = tmp_path / "a.py"
+    fname.write_text("one\n")
+    before = files_signature(str(tmp_path), ["a.py", "missing.py"])
+
+    fname.write_text("one\ntwo\n")
+    os.utime(fname, ns=(before[1] + 1_000_000, before[1] + 1_000_000))
+    after = files_signature(str(tmp_path), ["a.py", "missing.py"])
+
+    assert before[0] == after[0] == 1
+    assert before != after
+
+
+def test_mcp_cache_ttl_opt_in():
+    assert mcp_cache_ttl({"name": "server"}, "search") is None
+    assert mcp_cache_ttl({"cache_tools": ["Search"]}, "search") == 300
+    assert mcp_cache_ttl({"cache_tools": ["search"], "cache_ttl": 5}, "fetch") is None
+    assert mcp_cache_ttl({"cache_tools": True, "cache_ttl": 5}, "fetch") == 5
+    assert mcp_cache_ttl(None, "search") is None
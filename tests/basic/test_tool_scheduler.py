@@ -0,0 +1,103 @@
+import threading
+import time
+
+from cecli.helpers.tool_scheduler import ScheduledCall, ToolScheduler
+
+
+async def test_read_only_calls_run_concurrently_and_keep_order():
+    scheduler = ToolScheduler({"grep"}, max_workers=4)
+    barrier = threading.Barrier(3, timeout=5)
+
+    def make_read(value):
+        def read():
+            # Deadlocks (and times out) unless all three reads run at once
+            barrier.wait()
+            return value
+
+        return read
+
+    calls = [ScheduledCall(make_read(i), read_only=True) for i in range(3)]
+    results = await scheduler.run(calls)
+
+    assert results == [0, 1, 2]
+
+
+async def test_mutating_calls_run_serially_on_the_event_loop_thread():
+    scheduler = ToolScheduler(set(), max_workers=4)
+    events = []
+    threads = set()
+
+    def make_write(name, delay):
+        def write():
+            threads.add(threading.get_ident())
+            events.append(f"{name}-start")
+            time.sleep(delay)
+            events.append(f"{name}-end")
+            return name
+
+        return write
+
+    # Writes to different files still run one after the other
+    calls = [
+        ScheduledCall(make_write("first", 0.05)),
+        ScheduledCall(make_write("second", 0)),
+    ]
+    results = await scheduler.run(calls)
+
+    assert results == ["first", "second"]
+    assert events == ["first-start", "first-end", "second-start", "second-end"]
+    assert threads == {threading.get_ident()}
+
+
+async def test_reads_wait_for_earlier_writes():
+    scheduler = ToolScheduler({"grep"}, max_workers=4)
+    state = {"value": "old"}
+
+    def write():
+        time.sleep(0.05)
+        state["value"] = "new"
+        return "written"
+
+    calls = [
+        ScheduledCall(write),
+        ScheduledCall(lambda: state["value"], read_only=True),
+    ]
+    results = await scheduler.run(calls)
+
+    assert results == ["written", "new"]
+
+
+async def test_exceptions_are_returned_in_place():
+    scheduler = ToolScheduler(set(), max_workers=2)
+
+    def fail():
+        raise ValueError("boom")
+
+    async def async_call():
+        return "async result"
+
+    calls = [
+        ScheduledCall(fail),
+        ScheduledCall(async_call, read_only=True),
+    ]
+    results = await scheduler.run(calls)
+
+    assert isinstance(results[0], ValueError)
+    assert results[1] == "async result"
+
+
+def test_get_file_keys():
+    assert ToolScheduler.get_file_keys({"file_path": "a.py"}, "/repo") == {"/repo/a.py"}
+    assert ToolScheduler.get_file_keys(
+        {"source_file_path": "a.py", "target_file_path": "/abs/b.py"}, "/repo"
+    ) == {"/repo/a.py", "/abs/b.py"}
+    assert ToolScheduler.get_file_keys({"command_string": "ls"}, "/repo") is None
+
+
+def test_schedulers_share_their_thread_pool():
+    first = ToolScheduler({"grep"}, max_workers=3)
+    second = ToolScheduler({"grep"}, max_workers=3)
+
+    # A new coder's scheduler reuses the pool instead of leaving another one behind
+    assert first.executor is second.executor
+    assert ToolScheduler(set(), max_workers=5).executor is not first.executor
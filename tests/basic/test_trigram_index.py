@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cecli.helpers.trigram_index import TrigramIndex, filter_files, required_trigrams
+
+
+def make_index(tmp_path, files):
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+    return TrigramIndex(str(tmp_path), use_memory_cache=True)
+
+
+def test_required_trigrams_for_literals_and_regexes():
+    assert required_trigrams("ab") == set()
+    assert required_trigrams("Abcd") == {"abc", "bcd"}
+    assert required_trigrams(r"def\s+foo_(bar)", regex=True) == {
+        "def",
+        "foo",
+        "oo_",
+        "o_b",
+        "_ba",
+        "bar",
+    }
+    # Alternations and optional parts cannot narrow the candidates
+    assert required_trigrams("foo|bar", regex=True) == set()
+    assert required_trigrams("(?:abc)?de", regex=True) == set()
+    with pytest.raises(Exception):
+        required_trigrams("(unclosed", regex=True)
+
+
+def test_search_filters_candidates_and_verifies(tmp_path):
+    index = make_index(
+        tmp_path,
+        {
+            "a.py": "def foo_bar():\n    pass\n",
+            "b.py": "foo = bar\n",
+            "c.bin": b"def foo_bar\0binary",
+            "d.txt": "DEF FOO_BAR\n",
+        },
+    )
+    files = ["a.py", "b.py", "c.bin", "d.txt"]
+
+    assert [f for f, _ in index.search(files, "foo_bar")] == ["a.py"]
+    assert [f for f, _ in index.search(files, "foo_bar", case_insensitive=True)] == [
+        "a.py",
+        "d.txt",
+    ]
+    assert index.candidates(files, "foo_bar") == ["a.py", "d.txt"]
+    assert [f for f, _ in index.search(files, r"^foo\s*=", regex=True)] == ["b.py"]
+
+
+def test_update_reindexes_only_changed_files(tmp_path):
+    index = make_index(tmp_path, {"a.py": "alpha\n", "b.py": "beta\n"})
+    files = ["a.py", "b.py"]
+    assert [f for f, _ in index.search(files, "gamma")] == []
+
+    path = tmp_path / "b.py"
+    path.write_text("gamma\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert [f for f, _ in index.search(files, "gamma")] == ["b.py"]
+
+    path.unlink()
+    assert [f for f, _ in index.search(files, "gamma")] == []
+    assert len(index) == 1
+
+
+def test_index_persists_between_instances(tmp_path):
+    (tmp_path / "a.py").write_text("persistent content\n")
+    TrigramIndex(str(tmp_path)).update(["a.py"])
+
+    index = TrigramIndex(str(tmp_path))
+    index._index_file = None  # Reading the file again would fail
+    index.update(["a.py"])
+    assert index.candidates(["a.py"], "persistent") == ["a.py"]
+
+
+def test_filter_files_by_directory_and_glob():
+    files = ["setup.py", "src/app.py", "src/app.js", "src/sub/util.py"]
+
+    assert filter_files(files, "src", "*.py") == ["src/app.py", "src/sub/util.py"]
+    assert filter_files(files, ".", "src/*.js") == ["src/app.js"]
+    assert filter_files(files, "src/sub") == ["src/sub/util.py"]
+
+
+def test_lookups_wait_for_a_running_update(tmp_path):
+    index = make_index(tmp_path, {"a.py": "alpha = 1\n"})
+    indexing = threading.Event()
+    release = threading.Event()
+    index_file = index._index_file
+
+    def slow_index_file(abs_fname, size):
+        indexing.set()
+        release.wait(5)
+        return index_file(abs_fname, size)
+
+    index._index_file = slow_index_file
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        update = executor.submit(index.update, ["a.py"])
+        assert indexing.wait(5)
+        lookup = executor.submit(index.candidates, ["a.py"], "alpha")
+        time.sleep(0.05)
+        assert not lookup.done()  # Blocked until the update finishes
+        release.set()
+        update.result()
+        assert lookup.result() == ["a.py"]
@@ -0,0 +1,96 @@
+from rich.console import Console
+from rich.markdown import Markdown
+from rich.padding import Padding
+from rich.table import Table
+from rich.text import Text
+from textual.app import App
+
+from cecli.tui.output_journal import OutputJournal, deserialize, serialize
+from cecli.tui.widgets.output import OutputContainer
+
+
+def make_console():
+    return Console(width=60, color_system="truecolor", force_terminal=True)
+
+
+def render(renderable):
+    console = make_console()
+    with console.capture() as capture:
+        console.print(renderable)
+    return capture.get()
+
+
+def test_entries_round_trip_through_the_journal():
+    console = make_console()
+    table = Table("name")
+    table.add_row("value")
+    entries = [
+        "plain [bold]markup[/bold]",
+        Markdown("# Title\n\n* item"),
+        Text.from_markup("[red]error[/red] in [x] list", style="dim"),
+        Padding(Text("Tool Call • server", style="dim bright_cyan"), (0, 0, 0, 2)),
+        table,
+    ]
+
+    journal = OutputJournal()
+    for entry in entries:
+        journal.append(serialize(entry, console))
+
+    assert len(journal) == len(entries)
+    for index, entry in enumerate(entries):
+        restored = deserialize(journal.read(index))
+        if isinstance(entry, str):
+            assert restored == entry
+        else:
+            assert render(restored) == render(entry)
+
+    journal.clear()
+    assert len(journal) == 0
+    journal.append(serialize("again", console))
+    assert deserialize(journal.read(0)) == "again"
+    journal.close()
+
+
+class OutputApp(App):
+    def compose(self):
+        yield OutputContainer(id="output", max_rendered_lines=100)
+
+
+async def test_output_keeps_a_bounded_window():
+    app = OutputApp()
+    async with app.run_test(size=(80, 20)) as pilot:
+        output = app.query_one(OutputContainer)
+        for i in range(1000):
+            output.write(f"line {i}")
+        await pilot.pause()
+
+        assert len(output.journal) == 1000
+        assert len(output.lines) <= 100
+        assert output.lines[-1].text == "line 999"
+
+        # Scrolling back renders older entries from the journal, keeping the view in place
+        output.auto_scroll = False
+        for _ in range(100):
+            top = output.lines[int(output.scroll_y)].text
+            output.scroll_to(y=0, animate=False)
+            await pilot.pause()
+            if output._window_start == 0:
+                break
+            assert output.lines[int(output.scroll_y)].text != top
+        assert output.lines[0].text == "line 0"
+        assert len(output.lines) <= 100
+
+        # New output is journaled but not rendered while scrolled back
+        output.write("newest")
+        assert len(output.journal) == 1001
+        assert output.lines[-1].text != "newest"
+
+        output.auto_scroll = True
+        output.show_latest()
+        await pilot.pause()
+        assert output.lines[-1].text == "newest"
+        assert output.scroll_y == output.max_scroll_y
+
+        output.clear()
+        assert len(output.journal) == 0
+        assert not output.lines
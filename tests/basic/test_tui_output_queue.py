@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from unittest.mock import MagicMock
+
+from cecli.tui import output_queue as output_queue_module
+from cecli.tui.output_queue import OutputQueue
+from cecli.tui.widgets.output import OutputContainer
+
+
+def drain(q):
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
+
+
+def test_consecutive_text_messages_are_merged():
+    q = OutputQueue()
+    q.put({"type": "start_response"})
+    for word in ["Hello", " ", "world"]:
+        q.put({"type": "stream_chunk", "text": word})
+    q.put({"type": "end_response"})
+    q.put({"type": "output", "text": "a\n", "task_id": "t1"})
+    q.put({"type": "output", "text": "b\n", "task_id": "t1"})
+    q.put({"type": "output", "text": "c\n", "task_id": "t2"})
+
+    assert drain(q) == [
+        {"type": "start_response"},
+        {"type": "stream_chunk", "text": "Hello world"},
+        {"type": "end_response"},
+        {"type": "output", "text": "a\nb\n", "task_id": "t1"},
+        {"type": "output", "text": "c\n", "task_id": "t2"},
+    ]
+
+    # Nothing merges into a message the app already took
+    q.put({"type": "stream_chunk", "text": "x"})
+    assert q.get_nowait() == {"type": "stream_chunk", "text": "x"}
+    q.put({"type": "stream_chunk", "text": "y"})
+    assert drain(q) == [{"type": "stream_chunk", "text": "y"}]
+
+
+def test_merged_text_is_capped(monkeypatch):
+    monkeypatch.setattr(output_queue_module, "MAX_MERGED_TEXT", 10)
+    q = OutputQueue()
+    for _ in range(3):
+        q.put({"type": "stream_chunk", "text": "abcd"})
+    assert [msg["text"] for msg in drain(q)] == ["abcdabcd", "abcd"]
+
+
+def test_backpressure(monkeypatch):
+    monkeypatch.setattr(output_queue_module, "MAX_PUT_WAIT", 0.2)
+    q = OutputQueue(maxsize=2)
+    q.put({"type": "spinner", "action": "start"})
+    q.put({"type": "output", "text": "a"})
+
+    # Text merging into the last message still goes through
+    start = time.monotonic()
+    q.put({"type": "output", "text": "b"})
+    assert time.monotonic() - start < 0.05
+
+    # A full queue makes the worker wait for the app to take a message
+    threading.Timer(0.05, q.get_nowait).start()
+    start = time.monotonic()
+    q.put({"type": "spinner", "action": "start"})
+    assert 0.03 < time.monotonic() - start < 0.2
+
+    # but never forever, and never on the app's own thread
+    start = time.monotonic()
+    q.put({"type": "spinner", "action": "stop"})
+    assert time.monotonic() - start >= 0.15
+
+    q.consumer = threading.current_thread()
+    start = time.monotonic()
+    q.put({"type": "spinner", "action": "start"})
+    assert time.monotonic() - start < 0.05
+    assert q.qsize() == 4
+
+
+def test_merged_cost_reports_update_the_footer_with_the_latest_cost():
+    q = OutputQueue()
+    q.put({"type": "output", "text": "Cost: $0.01 message, $0.10 session.\n"})
+    q.put({"type": "output", "text": "Cost: $0.02 message, $0.12 session.\n"})
+    (merged,) = drain(q)
+
+    container = MagicMock()
+    OutputContainer._check_cost(container, merged["text"])
+
+    (update,) = container.post_message.call_args.args
+    assert update.cost == 0.12
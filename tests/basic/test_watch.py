@@ -1,3 +1,5 @@
+import os
+import time
 from pathlib import Path
 
 from cecli.dump import dump  # noqa
@@ -164,3 +166,105 @@ def test_ai_comment_pattern():
         len(lisp_lines) == lisp_expected
     ), f"Expected {lisp_expected} AI comments in Lisp fixture, found {len(lisp_lines)}"
     assert lisp_has_bang == "!", "Expected at least one bang (!) comment in Lisp fixture"
+
+
+def test_get_ai_comments_cache(tmp_path, monkeypatch):
+    io = InputOutput(pretty=False, fancy_input=False, yes=False)
+    watcher = FileWatcher(MinimalCoder(io))
+    fname = tmp_path / "code.py"
+    fname.write_text("x = 1  # ai!\n")
+
+    scans = []
+    find_ai_comments = watcher.find_ai_comments
+    monkeypatch.setattr(
+        watcher,
+        "find_ai_comments",
+        lambda content: scans.append(content) or find_ai_comments(content),
+    )
+
+    assert watcher.get_ai_comments(str(fname)) == ([1], ["# ai!"], "!")
+    assert watcher.get_ai_comments(str(fname)) == ([1], ["# ai!"], "!")
+    assert len(scans) == 1
+
+    # Rewritten with the same content: read and hashed, but not rescanned
+    os.utime(fname, ns=(0, 0))
+    assert watcher.get_ai_comments(str(fname)) == ([1], ["# ai!"], "!")
+    assert len(scans) == 1
+
+    fname.write_text("x = 1\ny = 2  # ai?\n")
+    assert watcher.get_ai_comments(str(fname)) == ([2], ["# ai?"], "?")
+    assert len(scans) == 2
+
+    fname.unlink()
+    assert watcher.get_ai_comments(str(fname)) == (None, None, None)
+    assert str(fname) not in watcher.ai_comments_cache
+
+
+def test_scan_changes_batches_files_with_ai_comments(tmp_path):
+    io = InputOutput(pretty=False, fancy_input=False, yes=False)
+    watcher = FileWatcher(MinimalCoder(io))
+
+    changes = {}
+    for i in range(20):
+        fname = tmp_path / f"file{i}.py"
+        fname.write_text(f"x = {i}" + ("  # ai!" if i % 5 == 0 else "") + "\n")
+        changes[str(fname)] = "modified"
+    big = tmp_path / "big.py"
+    big.write_text("# ai!\n" + "x = 1\n" * 200_000)
+    changes[str(big)] = "modified"
+    changes[str(tmp_path / "deleted.py")] = "deleted"
+    changes[str(tmp_path)] = "modified"
+
+    found = watcher.scan_changes(changes)
+    assert sorted(found) == sorted(
+        ("modified", str(tmp_path / f"file{i}.py")) for i in range(0, 20, 5)
+    )
+
+    assert watcher.handle_changes(found)
+    assert len(watcher.changed_files) == 4
+
+
+def test_watcher_reports_settled_ai_comments(tmp_path):
+    io = InputOutput(pretty=False, fancy_input=False, yes=False)
+    coder = MinimalCoder(io)
+    coder.root = str(tmp_path)
+    watcher = FileWatcher(coder)
+    watcher.start()
+    try:
+        deadline = time.monotonic() + 10
+        while watcher.watched_roots is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        # A burst of writes is coalesced into one scan of the final contents
+        fname = tmp_path / "code.py"
+        for i in range(5):
+            fname.write_text(f"x = {i}\n")
+        fname.write_text("x = 5  # ai!\n")
+        (tmp_path / "other.py").write_text("y = 1\n")
+
+        while not watcher.changed_files and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert watcher.changed_files == {str(fname)}
+        assert not watcher.armed
+    finally:
+        watcher.close()
+
+
+async def test_graceful_exit_closes_the_watcher(tmp_path):
+    from cecli.main import graceful_exit
+
+    io = InputOutput(pretty=False, fancy_input=False, yes=False)
+    coder = MinimalCoder(io)
+    coder.root = str(tmp_path)
+    coder.mcp_manager = None
+    coder.file_watcher = FileWatcher(coder)
+    coder.file_watcher.start()
+    thread = coder.file_watcher.watcher_thread
+
+    # Disarming between prompts keeps the watch running
+    coder.file_watcher.stop()
+    assert thread.is_alive()
+
+    assert await graceful_exit(coder) == 0
+    assert not thread.is_alive()
+    assert coder.file_watcher.watcher_thread is None
@@ -1,8 +1,18 @@
 import pytest
 
+from cecli.coders.search_replace import strategy_telemetry
 from cecli.models import Model
 
 
+@pytest.fixture(autouse=True, scope="session")
+def search_replace_stats(tmp_path_factory):
+    """Keep the search/replace method stats recorded by tests out of the real cache."""
+    path = strategy_telemetry.path
+    strategy_telemetry.use_path(tmp_path_factory.mktemp("caches") / "search-replace-stats.json")
+    yield strategy_telemetry
+    strategy_telemetry.use_path(path)
+
+
 # Model Fixtures
 @pytest.fixture
 def gpt35_model():
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from cecli.mcp.manager import McpServerManager
+from cecli.mcp.schema_cache import McpSchemaCache
 from cecli.mcp.server import LocalServer, McpServer
 
 
@@ -317,3 +318,73 @@ class TestMcpServerManager:
         servers = list(manager)
 
         assert servers == [mock_server]
+
+    @pytest.mark.asyncio
+    async def test_from_servers_uses_cached_schemas_and_connects_lazily(
+        self, mock_io, mock_tools, tmp_path
+    ):
+        server = MagicMock(spec=McpServer)
+        server.name = "cached-server"
+        server.config = {"name": "cached-server", "command": "my-server"}
+        server.connect = AsyncMock(return_value=MagicMock())
+        schema_cache = McpSchemaCache(tmp_path)
+        schema_cache.save(server, mock_tools)
+
+        with patch("litellm.experimental_mcp_client.load_mcp_tools") as mock_load_tools:
+            mock_load_tools.return_value = mock_tools
+            manager = await McpServerManager.from_servers(
+                servers=[server], io=mock_io, schema_cache=schema_cache
+            )
+
+            assert manager.get_server_tools("cached-server") == mock_tools
+            server.connect.assert_not_called()
+
+            assert await manager.ensure_connected("cached-server")
+            server.connect.assert_called_once()
+            assert server in manager._connected_servers
+
+    @pytest.mark.asyncio
+    async def test_from_servers_connects_uncached_servers_in_background(
+        self, mock_io, mock_tools, tmp_path
+    ):
+        server = MagicMock(spec=McpServer)
+        server.name = "slow-server"
+        server.config = {"name": "slow-server", "command": "my-server"}
+        server.connect = AsyncMock(return_value=MagicMock())
+        schema_cache = McpSchemaCache(tmp_path)
+
+        with patch("litellm.experimental_mcp_client.load_mcp_tools") as mock_load_tools:
+            mock_load_tools.return_value = mock_tools
+            manager = await McpServerManager.from_servers(
+                servers=[server], io=mock_io, schema_cache=schema_cache
+            )
+            assert "slow-server" in manager._connect_tasks
+
+            await manager.wait_for_connections()
+
+        assert server in manager._connected_servers
+        assert schema_cache.load(server) == mock_tools
+
+
+class TestMcpSchemaCache:
+    def test_config_change_invalidates_entry(self, mock_tools, tmp_path):
+        server = MagicMock()
+        server.name = "server"
+        server.config = {"name": "server", "command": "my-server", "args": ["--a"]}
+        schema_cache = McpSchemaCache(tmp_path)
+        schema_cache.save(server, mock_tools)
+
+        assert schema_cache.load(server) == mock_tools
+
+        server.config = {"name": "server", "command": "my-server", "args": ["--b"]}
+        assert schema_cache.load(server) is None
+
+    def test_configs_without_endpoint_are_not_cached(self, mock_tools, tmp_path):
+        server = MagicMock()
+        server.name = "server"
+        server.config = {"name": "server"}
+        schema_cache = McpSchemaCache(tmp_path)
+        schema_cache.save(server, mock_tools)
+
+        assert schema_cache.load(server) is None
+        assert list(tmp_path.iterdir()) == []
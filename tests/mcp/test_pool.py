@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from cecli.mcp.pool import McpSessionPool, get_session_pool
+from cecli.mcp.server import McpServer
+
+
+def make_server(pooled_sessions=()):
+    server = MagicMock()
+    server.name = "search"
+    server.connect = AsyncMock(return_value="primary")
+    server.open_pooled_session = AsyncMock(side_effect=list(pooled_sessions))
+    return server
+
+
+async def run_calls(pool, tool_name, count):
+    active = 0
+    max_active = 0
+    used_sessions = []
+
+    async def call():
+        nonlocal active, max_active
+        async with pool.session(tool_name) as session:
+            used_sessions.append(session)
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(call() for _ in range(count)))
+    return max_active, used_sessions
+
+
+async def test_parallel_safe_calls_are_pipelined():
+    server = make_server()
+    pool = McpSessionPool(server, max_concurrency=3, parallel_tools=["search"])
+
+    max_active, used_sessions = await run_calls(pool, "Search", 10)
+
+    assert max_active == 3
+    assert set(used_sessions) == {"primary"}
+    server.connect.assert_called_once()
+
+
+async def test_undeclared_calls_run_one_at_a_time():
+    server = make_server()
+    pool = McpSessionPool(server, max_concurrency=3, parallel_tools=["search"])
+
+    max_active, _ = await run_calls(pool, "write_file", 4)
+
+    assert max_active == 1
+
+
+async def test_pool_grows_up_to_pool_size():
+    server = make_server(pooled_sessions=["second", "third"])
+    pool = McpSessionPool(server, max_concurrency=4, pool_size=2, parallel_tools=True)
+
+    _, used_sessions = await run_calls(pool, "anything", 4)
+
+    assert set(used_sessions) == {"primary", "second"}
+    server.open_pooled_session.assert_called_once()
+
+
+async def test_concurrent_calls_do_not_overfill_the_pool():
+    server = make_server()
+
+    async def open_slowly():
+        await asyncio.sleep(0.02)
+        return object()
+
+    server.open_pooled_session = AsyncMock(side_effect=open_slowly)
+    pool = McpSessionPool(server, max_concurrency=8, pool_size=3, parallel_tools=True)
+
+    await run_calls(pool, "anything", 8)
+
+    assert len(pool.sessions) == 3
+    assert server.open_pooled_session.call_count == 2
+    server.connect.assert_called_once()
+
+
+async def test_pooled_sessions_are_closed_by_the_task_that_opened_them():
+    server = McpServer({"name": "search", "command": "x"})
+    entered = []
+    exited = []
+
+    async def create_session(exit_stack, errlog_mode="w"):
+        entered.append(asyncio.current_task())
+
+        async def close():
+            exited.append(asyncio.current_task())
+
+        exit_stack.push_async_callback(close)
+        return MagicMock()
+
+    server._create_session = create_session
+
+    # Open from one task and close from another, as tool calls and shutdown do
+    session = await asyncio.create_task(server.open_pooled_session())
+    assert session is not None
+    await asyncio.create_task(server._close_pooled_sessions())
+
+    assert len(entered) == 1
+    assert exited == entered
+
+
+def test_get_session_pool_reads_server_config():
+    server = McpServer(
+        {"name": "search", "command": "x", "max_concurrency": 2, "parallel_tools": ["find"]}
+    )
+
+    pool = get_session_pool(server)
+
+    assert pool is server.session_pool
+    assert pool.max_concurrency == 2
+    assert pool.is_parallel_safe("Find")
+    assert not pool.is_parallel_safe("write")
+
+    fallback = get_session_pool(MagicMock())
+    assert fallback.max_concurrency == 4
+    assert not fallback.is_parallel_safe("find")
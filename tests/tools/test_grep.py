@@ -4,6 +4,7 @@ from unittest.mock import Mock
 
 import pytest
 
+from cecli.helpers.trigram_index import TrigramIndex
 from cecli.tools import grep
 
 
@@ -50,3 +51,31 @@ def test_dash_prefixed_pattern_is_searched_literally(search_term, tmp_path, monk
     assert "Found matches" in result
     assert search_term in result
     coder.io.tool_error.assert_not_called()
+
+
+def test_search_index_formats_matches_with_context(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("one\ntwo\nneedle\nthree\nfour\nfive\nneedle\n")
+    (tmp_path / "README.md").write_text("needle\n")
+    search_index = TrigramIndex(str(tmp_path), use_memory_cache=True)
+
+    coder = SimpleNamespace(
+        repo=SimpleNamespace(root=str(tmp_path)),
+        io=SimpleNamespace(tool_error=Mock(), tool_output=Mock(), tool_warning=Mock()),
+        get_search_index=lambda: search_index,
+        get_all_relative_files=lambda: ["README.md", "src/app.py"],
+        get_inchat_relative_files=lambda: [],
+        tui=lambda: None,
+    )
+
+    result = grep.Tool.execute(
+        coder, pattern="needle", file_pattern="*.py", context_before=1, context_after=1
+    )
+
+    assert (
+        result
+        == "Found"
+        " matches:\n```text\nsrc/app.py\n2-two\n3:needle\n4-three\n--\n6-five\n7:needle\n```"
+    )
+    assert grep.Tool.execute(coder, pattern="missing") == "No matches found."
+    assert grep.Tool.execute(coder, pattern="(", use_regex=True).startswith("Error: Invalid regex")